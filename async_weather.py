@@ -0,0 +1,167 @@
+import asyncio
+from time import perf_counter
+
+from city_index import city_index_of
+from instrumentation import NULL_TIMER, StageTimer
+from weather_processor import WeatherProcessor
+
+
+async def gather_limited(func, args, concurrency=10, timeout=None):
+    """
+    Awaits func(arg) for every arg with at most `concurrency` calls in flight.
+    Each call is cancelled after `timeout` seconds (None waits forever).
+    Returns a list in input order holding each result or the exception it raised.
+    """
+    if not isinstance(concurrency, int) or concurrency < 1:
+        raise ValueError("concurrency must be a positive integer")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(arg):
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(func(arg), timeout)
+            except Exception as error:
+                return error
+
+    return await asyncio.gather(*(run(arg) for arg in args))
+
+
+class AsyncWeatherFetcher:
+    """
+    Awaitable front for a synchronous fetcher.
+    With offload=True each lookup runs in a worker thread, for fetchers that block.
+    """
+
+    def __init__(self, fetcher, offload=False):
+        self.fetcher = fetcher
+        self.index = city_index_of(fetcher)
+        self.offload = offload
+
+    async def get_chance_of_rain(self, city):
+        return await self._call(self.fetcher.get_chance_of_rain, city)
+
+    async def get_city_temperature_info(self, city):
+        return await self._call(self.fetcher.get_city_temperature_info, city)
+
+    async def get_current_temperature(self, city):
+        return await self._call(self.fetcher.get_current_temperature, city)
+
+    async def _call(self, method, city):
+        if self.offload:
+            return await asyncio.to_thread(method, city)
+        return method(city)
+
+
+class AsyncWeatherProcessor(WeatherProcessor):
+    """
+    WeatherProcessor whose public methods await an async fetcher.
+    Validation, formatting and instrumentation are inherited, so both paths
+    follow the same rules and enable_metrics() records async calls under the
+    same method names and stages.
+    """
+
+    async def get_rain_result(self, city, hour):
+        """Async variant of WeatherProcessor.get_rain_result."""
+        if self.metrics is not None:
+            return await self._measure_async("get_rain_result", self._rain_result_async, (city, hour))
+        return await self._rain_result_async(city, hour)
+
+    async def get_rain_forecast(self, city, hour):
+        """Async variant of WeatherProcessor.get_rain_forecast."""
+        if self.metrics is not None:
+            return await self._measure_async("get_rain_forecast", self._rain_result_async, (city, hour), text=True)
+        return self.format_result(await self.get_rain_result(city, hour))
+
+    async def _rain_result_async(self, city, hour, timer=NULL_TIMER):
+        """Async variant of WeatherProcessor._rain_result."""
+        self._validate_city(city)
+        timer.lap("validate_city")
+        self._validate_hour(hour)
+        timer.lap("validate_hour")
+
+        probabilities = await self.fetcher.get_chance_of_rain(city)
+        timer.lap("fetch")
+        return self._build_rain_result(city, hour, probabilities, timer)
+
+    async def get_rain_results(self, queries, concurrency=10, timeout=None):
+        """Async variant of WeatherProcessor.get_rain_results."""
+        return await self._rain_batch(queries, concurrency, timeout, text=False)
+
+    async def get_rain_forecasts(self, queries, concurrency=10, timeout=None):
+        """
+        Async variant of WeatherProcessor.get_rain_forecasts.
+        Cities are fetched concurrently, at most `concurrency` at a time,
+        and each fetch fails with TimeoutError after `timeout` seconds.
+        """
+        return await self._rain_batch(queries, concurrency, timeout, text=True)
+
+    async def _rain_batch(self, queries, concurrency, timeout, text):
+        metrics = self.metrics
+        if metrics is not None:
+            start = perf_counter()
+        queries = list(queries)
+        results = [None] * len(queries)
+        groups = list(self._group_queries(queries, results).values())
+
+        fetched = await gather_limited(
+            self.fetcher.get_chance_of_rain,
+            [city for city, _ in groups],
+            concurrency,
+            timeout,
+        )
+        for (city, indexes), probabilities in zip(groups, fetched):
+            if isinstance(probabilities, Exception):
+                for i in indexes:
+                    results[i] = probabilities
+                continue
+            self._resolve_queries(queries, indexes, probabilities, results, text)
+
+        if metrics is not None:
+            errors = [result for result in results if isinstance(result, Exception)]
+            method = "get_rain_forecasts" if text else "get_rain_results"
+            metrics.record(method, [], perf_counter() - start, errors)
+        return results
+
+    async def get_temperature_result(self, city):
+        """Async variant of WeatherProcessor.get_temperature_result."""
+        if self.metrics is not None:
+            return await self._measure_async("get_temperature_result", self._temperature_result_async, (city,))
+        return await self._temperature_result_async(city)
+
+    async def get_city_temperature_info(self, city):
+        """Async variant of WeatherProcessor.get_city_temperature_info."""
+        if self.metrics is not None:
+            return await self._measure_async("get_city_temperature_info", self._temperature_result_async, (city,),
+                                             text=True)
+        return self.format_result(await self.get_temperature_result(city))
+
+    async def _temperature_result_async(self, city, timer=NULL_TIMER):
+        """Async variant of WeatherProcessor._temperature_result."""
+        self._validate_city(city)
+        timer.lap("validate_city")
+
+        temp = await self.fetcher.get_current_temperature(city)
+        timer.lap("fetch")
+        return self._build_temperature_result(city, temp, timer)
+
+    async def get_city_temperature_infos(self, cities, concurrency=10, timeout=None):
+        """
+        Gets temperature messages for many cities concurrently.
+        Returns a list in input order holding each message or the exception it raised.
+        """
+        return await gather_limited(self.get_city_temperature_info, list(cities), concurrency, timeout)
+
+    async def _measure_async(self, method, pipeline, args, text=False):
+        """Async variant of WeatherProcessor._measure."""
+        metrics = self.metrics
+        timer = StageTimer()
+        try:
+            result = await pipeline(*args, timer)
+            if text:
+                result = self.format_result(result)
+                timer.lap("format")
+        except Exception as error:
+            metrics.record(method, timer.stages, timer.total(), (error,))
+            raise
+        metrics.record(method, timer.stages, timer.total())
+        return result
@@ -0,0 +1,54 @@
+"""
+Benchmark for bulk password auditing: is_strong_password vs check_passwords,
+with and without a memory-mapped breached-password filter.
+
+Run from the repository root: python benchmarks/bench_password.py [count]
+"""
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from breach_filter import build_breach_filter, open_breach_filter
+from password import SPECIAL_CHARS, check_passwords, is_strong_password
+
+
+def corpus(count, seed=42):
+    """Mix of weak and strong passwords of realistic lengths."""
+    rng = random.Random(seed)
+    alphabets = [string.ascii_lowercase, string.ascii_letters, string.ascii_letters + string.digits,
+                 string.ascii_letters + string.digits + SPECIAL_CHARS]
+    return ["".join(rng.choices(rng.choice(alphabets), k=rng.randint(6, 20))) for _ in range(count)]
+
+
+def timed(name, func, count):
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    print(f"{name:<28} {seconds * 1000:9.1f} ms  {count / seconds:12,.0f} passwords/s")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    passwords = corpus(count)
+    timed("is_strong_password", lambda: [is_strong_password(p) for p in passwords], count)
+    timed("check_passwords", lambda: list(check_passwords(passwords)), count)
+    processes = os.cpu_count() or 1
+    timed(f"check_passwords ({processes} procs)",
+          lambda: list(check_passwords(passwords, processes=processes, chunksize=5000)), count)
+
+    # Half the corpus is "breached", so lookups see both hits and misses
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "breached.bloom")
+        build_breach_filter(passwords[::2], count // 2 + 1, 0.001).save(path)
+        with open_breach_filter(path) as breach_filter:
+            timed("  + breach filter (mmap)", lambda: list(check_passwords(passwords, breach_filter=breach_filter)),
+                  count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Scaling benchmark for ShardedWeatherProcessor.
+
+Serves get_rain_forecasts batches over a synthetic dataset, in-process and
+then sharded over 1, 2, 4, ... worker processes, and reports throughput and
+speedup over one worker. Several client threads keep batches in flight so
+the front end is not idle while the shards work. Expect scaling up to about
+the number of physical cores; beyond that the front end becomes the limit.
+
+Run from the repository root:
+    python benchmarks/bench_sharded.py [--cities N] [--queries N] [--batch N]
+                                       [--max-workers N] [--clients N]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sharded_processor import ShardedWeatherProcessor
+from weather_fetcher import WeatherFetcher
+from weather_processor import WeatherProcessor
+
+
+def build_fetcher(cities):
+    fetcher = WeatherFetcher()
+    for i in range(cities):
+        fetcher.temperatures[f"city{i}"] = i % 45 - 10
+        fetcher.rain_probabilities[f"city{i}"] = [((i * 7 + slot) % 100) / 100 for slot in range(8)]
+    return fetcher
+
+
+def build_batches(cities, queries, batch):
+    step = 7919  # prime stride, so consecutive queries land on different cities
+    all_queries = [(f"City{i * step % cities}", i % 24) for i in range(queries)]
+    return [all_queries[i:i + batch] for i in range(0, queries, batch)]
+
+
+def run(processor, batches, clients):
+    """Splits the batches over client threads; returns queries per second."""
+    shares = [batches[i::clients] for i in range(clients)]
+
+    def client(share):
+        for batch in share:
+            processor.get_rain_forecasts(batch)
+
+    threads = [threading.Thread(target=client, args=(share,)) for share in shares]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    return sum(len(batch) for batch in batches) / seconds
+
+
+def worker_counts(max_workers):
+    counts = []
+    workers = 1
+    while workers < max_workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(max_workers)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cities", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=400_000)
+    parser.add_argument("--batch", type=int, default=2_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--clients", type=int, default=4, help="client threads submitting batches")
+    args = parser.parse_args(argv)
+
+    fetcher = build_fetcher(args.cities)
+    batches = build_batches(args.cities, args.queries, args.batch)
+    print(f"{args.cities} cities, {args.queries} queries in batches of {args.batch}, "
+          f"{args.clients} client threads, {os.cpu_count()} CPUs")
+
+    baseline = run(WeatherProcessor(fetcher), batches, 1)
+    print(f"{'in-process':<14} {baseline:12,.0f} queries/s")
+
+    single = None
+    for workers in worker_counts(args.max_workers):
+        with ShardedWeatherProcessor(fetcher, workers=workers) as processor:
+            # Warm the routing memo and the workers' city indexes
+            run(processor, batches[:len(batches) // 4 or 1], args.clients)
+            throughput = run(processor, batches, args.clients)
+        single = single or throughput
+        label = f"{workers} worker" + ("s" if workers > 1 else "")
+        print(f"{label:<14} {throughput:12,.0f} queries/s  {throughput / single:5.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Micro-benchmark for the per-call work in WeatherProcessor.get_rain_forecast.
+
+Compares the precomputed hour-to-slot table against the min() scan it replaced,
+the bisect rain categorization against the old if/elif chain, and the
+compiled forecast-rule templates against the old f-string chains.
+Also shows structured results against messages, the cost of
+get_rain_forecast with instrumentation enabled, and linear interpolation
+against the nearest slot (per-minute points come from cached grids).
+
+Run from the repository root: python benchmarks/bench_weather_processor.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weather_fetcher import WeatherFetcher
+from weather_processor import WeatherProcessor
+
+NUMBER = 200_000
+
+
+def categorize_with_chain(processor, probability):
+    if probability >= processor.HIGH_RAIN_PROBABILITY:
+        return "high"
+    elif probability >= processor.MODERATE_RAIN_PROBABILITY:
+        return "moderate"
+    elif probability >= processor.LOW_RAIN_PROBABILITY:
+        return "low"
+    return "very low"
+
+
+def temperature_message_with_chain(city, temp):
+    if temp < 0:
+        return f"It's freezing in {city}: {temp}°C"
+    elif temp > 30:
+        return f"It's hot in {city}: {temp}°C"
+    return f"The temperature in {city} is {temp}°C"
+
+
+def report(name, seconds):
+    print(f"{name:<28} {seconds / NUMBER * 1e9:8.1f} ns/call")
+
+
+def main():
+    processor = WeatherProcessor(WeatherFetcher())
+    hours = list(range(24))
+    probabilities = [0.05, 0.3, 0.6, 0.9]
+
+    report("slot search (min)", timeit.timeit(
+        lambda: [processor._search_closest_time_slot(h) for h in hours], number=NUMBER // 24))
+    report("slot table", timeit.timeit(
+        lambda: [processor._find_closest_time_slot(h) for h in hours], number=NUMBER // 24))
+    report("categorize (if/elif)", timeit.timeit(
+        lambda: [categorize_with_chain(processor, p) for p in probabilities], number=NUMBER // 4))
+    report("categorize (bisect)", timeit.timeit(
+        lambda: [processor._categorize_rain_probability(p) for p in probabilities], number=NUMBER // 4))
+    report("rain message (rules)", timeit.timeit(
+        lambda: [processor.rules.format_rain("London", 12, p) for p in probabilities], number=NUMBER // 4))
+    report("temperature msg (if/elif)", timeit.timeit(
+        lambda: [temperature_message_with_chain("London", t) for t in (-5, 12, 35)], number=NUMBER // 3))
+    report("temperature msg (rules)", timeit.timeit(
+        lambda: [processor.rules.format_temperature("London", t) for t in (-5, 12, 35)], number=NUMBER // 3))
+    report("get_rain_forecast", timeit.timeit(
+        lambda: processor.get_rain_forecast("London", 13), number=NUMBER))
+    report("get_rain_result", timeit.timeit(
+        lambda: processor.get_rain_result("London", 13), number=NUMBER))
+    queries = [("London", hour) for hour in hours] * 40
+    report("get_rain_forecasts (per q)", timeit.timeit(
+        lambda: processor.get_rain_forecasts(queries), number=NUMBER // len(queries)))
+    report("get_rain_results (per q)", timeit.timeit(
+        lambda: processor.get_rain_results(queries), number=NUMBER // len(queries)))
+    processor.enable_metrics()
+    report("get_rain_forecast + metrics", timeit.timeit(
+        lambda: processor.get_rain_forecast("London", 13), number=NUMBER))
+    processor.disable_metrics()
+
+    linear = WeatherProcessor(WeatherFetcher(), interpolation="linear")
+    report("get_rain_result (linear)", timeit.timeit(
+        lambda: linear.get_rain_result("London", 13), number=NUMBER))
+    cities = [city for city, _ in queries]
+    minutes = [i % 1440 / 60 for i in range(len(cities))]
+    report("rain points (per q)", timeit.timeit(
+        lambda: linear.get_rain_probabilities(cities, minutes), number=NUMBER // len(queries)))
+
+
+if __name__ == "__main__":
+    main()
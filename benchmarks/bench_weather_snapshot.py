@@ -0,0 +1,68 @@
+"""
+Cold-start benchmark: building WeatherFetcher data vs opening a snapshot.
+
+Writes a synthetic JSONL dataset and its snapshot, then measures how long each
+takes to become ready to serve get_chance_of_rain:
+  - dicts:    parse the JSONL into the fetcher's dicts (today's startup path)
+  - snapshot: open_snapshot and wrap it in a WeatherFetcher
+
+Run from the repository root: python benchmarks/bench_weather_snapshot.py [cities]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weather_fetcher import WeatherFetcher
+from weather_loader import load_weather
+from weather_snapshot import open_snapshot, save_snapshot
+
+
+def write_dataset(path, cities):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(cities):
+            rain = [((i * 7 + slot) % 100) / 100 for slot in range(8)]
+            f.write(json.dumps({"city": f"city{i}", "temperature": i % 45 - 10, "rain": rain}) + "\n")
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    cities = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset = os.path.join(tmp, "weather.jsonl")
+        snapshot = os.path.join(tmp, "weather.snap")
+        write_dataset(dataset, cities)
+
+        def from_dicts():
+            fetcher = WeatherFetcher()
+            load_weather(fetcher, dataset)
+            fetcher.get_chance_of_rain(f"city{cities - 1}")
+            return fetcher
+
+        dict_seconds, fetcher = timed(from_dicts)
+        save_snapshot(fetcher, snapshot)
+        del fetcher
+
+        def from_snapshot():
+            fetcher = WeatherFetcher(store=open_snapshot(snapshot))
+            fetcher.get_chance_of_rain(f"city{cities - 1}")
+            return fetcher
+
+        snapshot_seconds, fetcher = timed(from_snapshot)
+        fetcher.store.close()
+
+    print(f"cities: {cities}")
+    print(f"dicts    {dict_seconds * 1000:10.2f} ms")
+    print(f"snapshot {snapshot_seconds * 1000:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
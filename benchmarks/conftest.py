@@ -0,0 +1,76 @@
+"""
+Shared data for the perf_*.py benchmarks. Kept free of pytest-benchmark
+imports, since a plain pytest run of the repository also loads this file.
+"""
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weather_fetcher import WeatherFetcher
+from weather_store import SLOTS, ColumnarWeatherStore
+
+# Default for --benchmark-compare-fail
+REGRESSION_THRESHOLD = "median:20%"
+
+CITY_COUNTS = [10, 1_000, 100_000, 1_000_000]
+# Lookups per benchmark round, spread over the whole catalog
+LOOKUPS = 1_000
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Runs before pytest-benchmark reads its options; the threshold only applies when comparing
+    if not config.pluginmanager.hasplugin("benchmark") or not config.getoption("benchmark_compare"):
+        return
+    if not config.getoption("benchmark_compare_fail"):
+        from pytest_benchmark.utils import parse_compare_fail
+
+        config.option.benchmark_compare_fail = [parse_compare_fail(REGRESSION_THRESHOLD)]
+
+
+def city_name(i):
+    return f"city{i:07d}"
+
+
+def synthetic_dicts(count, seed=7):
+    """Temperatures and rain probabilities for count cities, sharing a small pool of rows."""
+    rng = random.Random(seed)
+    pool = [[round(rng.random(), 2) for _ in range(SLOTS)] for _ in range(64)]
+    temperatures = {city_name(i): rng.randint(-30, 45) for i in range(count)}
+    rain = {city_name(i): pool[i % len(pool)] for i in range(count)}
+    return temperatures, rain
+
+
+def dict_fetcher(count):
+    fetcher = WeatherFetcher()
+    fetcher.temperatures, fetcher.rain_probabilities = synthetic_dicts(count)
+    return fetcher
+
+
+def columnar_fetcher(count):
+    temperatures, rain = synthetic_dicts(count)
+    return WeatherFetcher(store=ColumnarWeatherStore.from_dicts(temperatures, rain))
+
+
+@pytest.fixture(scope="session")
+def fetchers():
+    """Builds each (backend, city count) fetcher once per session, on first use."""
+    cache = {}
+
+    def get(backend, count):
+        if (backend, count) not in cache:
+            build = dict_fetcher if backend == "dict" else columnar_fetcher
+            cache[(backend, count)] = build(count)
+        return cache[(backend, count)]
+
+    return get
+
+
+def sample_cities(count, lookups=LOOKUPS, seed=11):
+    """Random city names from the catalog, mixed case like user input."""
+    rng = random.Random(seed)
+    return [city_name(rng.randrange(count)).title() for _ in range(lookups)]
@@ -0,0 +1,31 @@
+import random
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from calculate_discount import DISCOUNT_RATES, calculate_discount, calculate_discounts
+
+USER_TYPES = list(DISCOUNT_RATES)
+
+
+def price_list(count, seed=5):
+    rng = random.Random(seed)
+    return [round(rng.uniform(1, 500), 2) for _ in range(count)], [rng.choice(USER_TYPES) for _ in range(count)]
+
+
+@pytest.mark.parametrize("count", [10_000, 100_000])
+def test_calculate_discount_loop(benchmark, count):
+    prices, user_types = price_list(count)
+
+    def run():
+        for price, user_type in zip(prices, user_types):
+            calculate_discount(price, user_type)
+
+    benchmark(run)
+
+
+@pytest.mark.parametrize("count", [100_000, 1_000_000])
+def test_calculate_discounts_bulk(benchmark, count):
+    prices, user_types = price_list(count)
+    benchmark(calculate_discounts, prices, user_types)
@@ -0,0 +1,15 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from greet import greet
+
+NAMES = [f"User {i}" for i in range(1000)] + [None] * 100
+
+
+def test_greet_loop(benchmark):
+    def run():
+        for name in NAMES:
+            greet(name)
+
+    benchmark(run)
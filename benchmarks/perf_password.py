@@ -0,0 +1,52 @@
+import random
+import string
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from password import SPECIAL_CHARS, check_passwords, is_strong_password
+
+COMMON = ["123456", "password", "123456789", "qwerty", "12345678", "111111", "iloveyou", "admin",
+          "welcome", "monkey", "dragon", "letmein", "football", "sunshine", "princess", "abc123"]
+WORDS = ["summer", "winter", "london", "oslo", "coffee", "tiger", "rocket", "garden", "blue", "falcon"]
+
+
+def realistic_corpus(count, seed=3):
+    """
+    Roughly the shape of real password dumps: common passwords, words with
+    digits and symbols appended, random generator output and a little non-ASCII.
+    """
+    rng = random.Random(seed)
+    strong_alphabet = string.ascii_letters + string.digits + SPECIAL_CHARS
+    corpus = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.3:
+            corpus.append(rng.choice(COMMON))
+        elif kind < 0.75:
+            word = rng.choice(WORDS)
+            word = word.title() if rng.random() < 0.6 else word
+            suffix = str(rng.randint(0, 2025)) + (rng.choice(SPECIAL_CHARS) if rng.random() < 0.5 else "")
+            corpus.append(word + suffix)
+        elif kind < 0.97:
+            corpus.append("".join(rng.choices(strong_alphabet, k=rng.randint(10, 24))))
+        else:
+            corpus.append("Пароль" + str(rng.randint(0, 99)) + "!a")
+    return corpus
+
+
+CORPUS = realistic_corpus(10_000)
+
+
+def test_is_strong_password(benchmark):
+    def run():
+        for pwd in CORPUS:
+            is_strong_password(pwd)
+
+    benchmark(run)
+
+
+def test_check_passwords_single_process(benchmark):
+    # No processes: the in-process path, without pool startup or IPC
+    benchmark(lambda: list(check_passwords(CORPUS)))
@@ -0,0 +1,41 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from conftest import CITY_COUNTS, sample_cities
+from weather_processor import WeatherProcessor
+
+BACKENDS = ["dict", "columnar"]
+
+
+@pytest.mark.parametrize("count", CITY_COUNTS)
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_get_rain_forecast(benchmark, fetchers, backend, count):
+    processor = WeatherProcessor(fetchers(backend, count))
+    queries = [(city, i % 24) for i, city in enumerate(sample_cities(count))]
+
+    def run():
+        for city, hour in queries:
+            processor.get_rain_forecast(city, hour)
+
+    benchmark(run)
+
+
+@pytest.mark.parametrize("count", CITY_COUNTS)
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_get_city_temperature_info(benchmark, fetchers, backend, count):
+    processor = WeatherProcessor(fetchers(backend, count))
+    cities = sample_cities(count)
+
+    def run():
+        for city in cities:
+            processor.get_city_temperature_info(city)
+
+    benchmark(run)
+
+
+@pytest.mark.parametrize("count", CITY_COUNTS)
+def test_get_rain_forecasts_bulk(benchmark, fetchers, count):
+    processor = WeatherProcessor(fetchers("dict", count))
+    queries = [(city, i % 24) for i, city in enumerate(sample_cities(count))]
+    benchmark(processor.get_rain_forecasts, queries)
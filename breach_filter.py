@@ -0,0 +1,242 @@
+"""
+Blocked Bloom filter for screening passwords against breached-password lists.
+
+Build offline from a password list (one per line), then open the saved file
+with mmap in the service:
+
+    python breach_filter.py passwords.txt breached.bloom --fpr 0.001
+
+    breached = open_breach_filter("breached.bloom")
+    is_strong_password(pwd, breach_filter=breached)
+
+Each password sets bits in a single 512-bit block, so a lookup hashes once
+and reads one 64-byte block. The block and every bit position come from
+separate bits of one digest, so the positions are independent and the
+sizing model holds. Passwords match exactly (case-sensitive).
+"""
+import argparse
+import hashlib
+import math
+import mmap
+import os
+import struct
+import sys
+
+# File layout (little-endian): a 64-byte header, then `blocks` 64-byte blocks
+MAGIC = b"PWBLOOM\0"
+VERSION = 2
+
+_HEADER = struct.Struct("<8sHH4xQQd")
+_HEADER_SIZE = 64
+BLOCK_BYTES = 64
+BLOCK_BITS = BLOCK_BYTES * 8
+_BIT_MASK = BLOCK_BITS - 1
+_POSITION_BITS = BLOCK_BITS.bit_length() - 1
+
+MAX_HASHES = 16
+# 8 bytes pick the block, then 9 bits per position for up to MAX_HASHES positions
+_DIGEST_SIZE = 8 + math.ceil(MAX_HASHES * _POSITION_BITS / 8)
+
+
+def filter_size(capacity, false_positive_rate):
+    """
+    Returns (blocks, hashes) so that `capacity` entries stay under the false
+    positive rate. Starts from the classic Bloom sizing and grows it until the
+    blocked layout, whose blocks fill unevenly, meets the target too.
+    """
+    if capacity < 1:
+        raise ValueError("capacity must be at least 1")
+    if not 0 < false_positive_rate < 1:
+        raise ValueError("false_positive_rate must be between 0 and 1")
+    bits = -capacity * math.log(false_positive_rate) / math.log(2) ** 2
+    hashes = max(1, min(MAX_HASHES, round(bits / capacity * math.log(2))))
+    blocks = max(1, math.ceil(bits / BLOCK_BITS))
+    while _blocked_false_positive_rate(capacity, blocks, hashes) > false_positive_rate:
+        blocks = math.ceil(blocks * 1.05)
+    return blocks, hashes
+
+
+def _blocked_false_positive_rate(capacity, blocks, hashes):
+    """
+    Expected false positive rate, with the per-block load Poisson distributed.
+    A lookup's positions are drawn independently and may repeat, so the chance
+    that all of them are set is taken exactly (by inclusion-exclusion over the
+    distinct positions) rather than as the mean fill raised to `hashes`.
+    """
+    coefficients = _hit_coefficients(hashes)
+    load = capacity / blocks
+    rate = 0.0
+    # Sum over block loads around the mean; the tails contribute nothing measurable
+    low = max(0, int(load - 10 * math.sqrt(load) - 10))
+    high = int(load + 10 * math.sqrt(load) + 10)
+    log_probability = -load + low * math.log(load) - math.lgamma(low + 1) if load else 0.0
+    for entries in range(low, high + 1):
+        if entries > low:
+            log_probability += math.log(load) - math.log(entries)
+        bits_set = entries * hashes
+        hit = sum(c * (1 - i / BLOCK_BITS) ** bits_set for i, c in enumerate(coefficients))
+        rate += math.exp(log_probability) * hit
+    return rate
+
+
+def _hit_coefficients(hashes):
+    """
+    Returns c so that a lookup hits a block holding m random bit sets with
+    probability sum(c[i] * (1 - i / BLOCK_BITS) ** m).
+    """
+    # Distribution of the number of distinct positions among `hashes` draws
+    distinct = [1.0]
+    for _ in range(hashes):
+        grown = [0.0] * (len(distinct) + 1)
+        for j, probability in enumerate(distinct):
+            grown[j] += probability * j / BLOCK_BITS
+            grown[j + 1] += probability * (BLOCK_BITS - j) / BLOCK_BITS
+        distinct = grown
+    # j given positions are all set with probability sum_i (-1)^i C(j, i) (1 - i/B)^m
+    return [sum(p * (-1) ** i * math.comb(j, i) for j, p in enumerate(distinct) if j >= i)
+            for i in range(hashes + 1)]
+
+
+def _locate(password, blocks, hashes):
+    """Returns (block index, bit mask) for a password."""
+    digest = hashlib.blake2b(password.encode("utf-8", "surrogatepass"), digest_size=_DIGEST_SIZE).digest()
+    block = int.from_bytes(digest[:8], "little") % blocks
+    # Independent positions: double hashing within a block repeats too few bit patterns
+    positions = int.from_bytes(digest[8:], "little")
+    mask = 0
+    for _ in range(hashes):
+        mask |= 1 << (positions & _BIT_MASK)
+        positions >>= _POSITION_BITS
+    return block, mask
+
+
+class BreachFilter:
+    """
+    Bloom filter over breached passwords; `password in filter` is True for
+    every added password and for about false_positive_rate of the others.
+    Built in memory by build_breach_filter(), or memory-mapped read-only by
+    open_breach_filter(). Mapped filters pickle as their path, so they can be
+    handed to check_passwords worker processes.
+    """
+
+    def __init__(self, buffer, blocks, hashes, entries, false_positive_rate, path=None, offset=0):
+        self._buffer = buffer
+        # Where the blocks start in the buffer: after the header in a mapped file
+        self._offset = offset
+        self.blocks = blocks
+        self.hashes = hashes
+        self.entries = entries
+        self.false_positive_rate = false_positive_rate
+        self.path = path
+
+    @classmethod
+    def empty(cls, capacity, false_positive_rate=0.001):
+        """An in-memory filter sized for `capacity` passwords."""
+        blocks, hashes = filter_size(capacity, false_positive_rate)
+        return cls(bytearray(blocks * BLOCK_BYTES), blocks, hashes, 0, false_positive_rate)
+
+    def add(self, password):
+        block, mask = _locate(password, self.blocks, self.hashes)
+        start = self._offset + block * BLOCK_BYTES
+        current = int.from_bytes(self._buffer[start:start + BLOCK_BYTES], "little")
+        self._buffer[start:start + BLOCK_BYTES] = (current | mask).to_bytes(BLOCK_BYTES, "little")
+        self.entries += 1
+
+    def __contains__(self, password):
+        block, mask = _locate(password, self.blocks, self.hashes)
+        start = self._offset + block * BLOCK_BYTES
+        return int.from_bytes(self._buffer[start:start + BLOCK_BYTES], "little") & mask == mask
+
+    def __len__(self):
+        return self.entries
+
+    def __reduce__(self):
+        if self.path is None:
+            raise TypeError("Only filters opened from a file can be pickled")
+        return open_breach_filter, (self.path,)
+
+    def save(self, path):
+        """Writes the filter next to path and moves it into place atomically."""
+        header = _HEADER.pack(MAGIC, VERSION, self.hashes, self.blocks, self.entries, self.false_positive_rate)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(header.ljust(_HEADER_SIZE, b"\0"))
+            f.write(self._buffer[self._offset:])
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def close(self):
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def build_breach_filter(passwords, capacity, false_positive_rate=0.001):
+    """Builds an in-memory BreachFilter from an iterable of passwords."""
+    breach_filter = BreachFilter.empty(capacity, false_positive_rate)
+    for password in passwords:
+        breach_filter.add(password)
+    return breach_filter
+
+
+def build_breach_filter_file(source, path, false_positive_rate=0.001, capacity=None):
+    """
+    Builds a filter from a password list file (UTF-8, one password per line)
+    and saves it to path. Without a capacity, the list is read twice: once to
+    count it. Returns the number of passwords added.
+    """
+    if capacity is None:
+        with open(source, "rb") as f:
+            capacity = sum(1 for line in f if line.rstrip(b"\r\n"))
+    breach_filter = BreachFilter.empty(max(capacity, 1), false_positive_rate)
+    with open(source, encoding="utf-8", errors="surrogateescape", newline="") as f:
+        for line in f:
+            password = line.rstrip("\r\n")
+            if password:
+                breach_filter.add(password)
+    breach_filter.save(path)
+    return breach_filter.entries
+
+
+def open_breach_filter(path):
+    """Maps a saved filter read-only; only the blocks a lookup touches are paged in."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < _HEADER_SIZE:
+            raise ValueError("Not a breach filter")
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, hashes, blocks, entries, false_positive_rate = _HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        buffer.close()
+        raise ValueError("Not a breach filter")
+    if version != VERSION:
+        buffer.close()
+        raise ValueError(f"Unsupported breach filter version {version}")
+    if size != _HEADER_SIZE + blocks * BLOCK_BYTES or not 1 <= hashes <= MAX_HASHES:
+        buffer.close()
+        raise ValueError("Truncated breach filter")
+    return BreachFilter(buffer, blocks, hashes, entries, false_positive_rate, path=os.fspath(path),
+                        offset=_HEADER_SIZE)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a breached-password filter from a password list.")
+    parser.add_argument("source", help="password list, one password per line")
+    parser.add_argument("output", help="filter file to write")
+    parser.add_argument("--fpr", type=float, default=0.001, help="target false positive rate (default 0.001)")
+    parser.add_argument("--capacity", type=int, help="number of passwords, if known (skips counting)")
+    args = parser.parse_args(argv)
+    count = build_breach_filter_file(args.source, args.output, args.fpr, args.capacity)
+    print(f"Added {count} passwords; {os.path.getsize(args.output)} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
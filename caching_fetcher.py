@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import OrderedDict
+
+from city_index import city_index_of
+
+
+class CachingFetcher:
+    """
+    Caches the lookups of a WeatherFetcher (or anything with the same interface).
+    Entries live in a bounded LRU and expire after a per-entry TTL.
+    Safe to share between threads: the cache and its counters are guarded by
+    a lock that is not held while the fetcher runs.
+    """
+
+    # Messages the fetcher raises for cities it does not know
+    UNKNOWN_CITY_MESSAGES = ("Unknown city", "City not found")
+
+    def __init__(self, fetcher, max_entries=1024, ttl=60.0, negative_ttl=None, clock=time.monotonic):
+        """
+        negative_ttl: when set, "Unknown city" errors are cached for that many seconds
+        and re-raised on later lookups instead of asking the fetcher again.
+        """
+        if not isinstance(max_entries, int) or max_entries < 1:
+            raise ValueError("max_entries must be a positive integer")
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+        if negative_ttl is not None and negative_ttl <= 0:
+            raise ValueError("negative_ttl must be positive")
+        self.fetcher = fetcher
+        self.index = city_index_of(fetcher)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        # (kind, city key) -> (expires_at, value, error); most recently used last
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ========== FETCHER INTERFACE ==========
+
+    def get_chance_of_rain(self, city):
+        return self._get("rain", city, self.fetcher.get_chance_of_rain)
+
+    def get_city_temperature_info(self, city):
+        return self._get("temperature", city, self.fetcher.get_city_temperature_info)
+
+    def get_current_temperature(self, city):
+        return self._get("temperature", city, self.fetcher.get_current_temperature)
+
+    # ========== CACHE MANAGEMENT ==========
+
+    def invalidate(self, city):
+        """Drops every cached entry for a city."""
+        key = self.index.key(city)
+        with self._lock:
+            self._entries.pop(("rain", key), None)
+            self._entries.pop(("temperature", key), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Returns the cache counters as a dict."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+            }
+
+    def _get(self, kind, city, fetch):
+        # Same key as the fetcher's, so every spelling of a city shares one entry
+        key = self.index.key(city)
+        # Invalid input is the fetcher's to reject; never cache it
+        if key is None:
+            return fetch(city)
+        key = (kind, key)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value, error = entry
+                if now < expires_at:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                else:
+                    del self._entries[key]
+                    entry = None
+            if entry is None:
+                self.misses += 1
+        if entry is not None:
+            if error is not None:
+                # A fresh instance, so tracebacks don't pile up on the cached one
+                raise type(error)(*error.args)
+            return value
+
+        try:
+            value = fetch(city)
+        except Exception as error:
+            if self.negative_ttl is not None and str(error) in self.UNKNOWN_CITY_MESSAGES:
+                self._store(key, (now + self.negative_ttl, None, error))
+            raise
+        self._store(key, (now + self.ttl, value, None))
+        return value
+
+    def _store(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
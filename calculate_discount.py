@@ -1,14 +1,62 @@
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; calculate_discounts falls back to array('d')
+    np = None
+
+DISCOUNT_RATES = {
+    "regular": 0.05,
+    "premium": 0.10,
+    "vip": 0.25
+}
 
 
 def calculate_discount(price, user_type):
     """Calculate the discounted price based on user type."""
-    DISCOUNT_RATES = {
-        "regular": 0.05,
-        "premium": 0.10,
-        "vip": 0.25
-    }
     if user_type not in DISCOUNT_RATES:
         raise ValueError(f"Invalid user type: {user_type}")
 
     discount = DISCOUNT_RATES[user_type]
-    return price * (1 - discount)
\ No newline at end of file
+    return price * (1 - discount)
+
+
+def calculate_discounts(prices, user_types):
+    """
+    Calculate discounted prices for many line items at once.
+    prices and user_types are equal-length NumPy arrays or Python sequences.
+    Returns (discounted, invalid): discounted is a float64 array (array('d')
+    without numpy) with NaN where the user type is invalid, and invalid is the
+    list of those indexes. Valid entries equal calculate_discount exactly.
+    """
+    if len(prices) != len(user_types):
+        raise ValueError("prices and user_types must have the same length")
+
+    if np is not None:
+        rates = _rates_array(user_types)
+        invalid = np.flatnonzero(np.isnan(rates)).tolist()
+        return np.asarray(prices, dtype=np.float64) * (1 - rates), invalid
+
+    nan = float("nan")
+    discounted = array("d", bytes(8 * len(prices)))
+    invalid = []
+    for i, (price, user_type) in enumerate(zip(prices, user_types)):
+        discount = DISCOUNT_RATES.get(user_type)
+        if discount is None:
+            invalid.append(i)
+            discounted[i] = nan
+        else:
+            discounted[i] = price * (1 - discount)
+    return discounted, invalid
+
+
+def _rates_array(user_types):
+    """Maps user types to discount rates, looking up each distinct type once."""
+    nan = float("nan")
+    try:
+        distinct, inverse = np.unique(np.asarray(user_types), return_inverse=True)
+    except TypeError:
+        # Unsortable mixed types (e.g. None among strings): map item by item
+        return np.fromiter((DISCOUNT_RATES.get(t, nan) for t in user_types), np.float64, len(user_types))
+    table = np.array([DISCOUNT_RATES.get(t, nan) for t in distinct.tolist()], dtype=np.float64)
+    return table[inverse.reshape(-1)]
@@ -0,0 +1,148 @@
+import sys
+import unicodedata
+
+# Raw inputs remembered per index; the memo is cleared when it fills up
+MEMO_SIZE = 4096
+
+
+def normalize_city(city):
+    """
+    Returns the canonical key for a city name: accents stripped, casefolded,
+    whitespace collapsed, and interned. "São Paulo", "SAO  PAULO" and
+    " sao paulo" all become "sao paulo". Returns None for anything that is
+    not a non-blank string.
+    """
+    if not isinstance(city, str):
+        return None
+    if city.isascii():
+        key = " ".join(city.lower().split())
+    else:
+        decomposed = unicodedata.normalize("NFKD", city)
+        stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+        key = " ".join(unicodedata.normalize("NFKC", stripped.casefold()).split())
+    if not key:
+        return None
+    return sys.intern(key)
+
+
+def _write_key(city):
+    key = normalize_city(city)
+    if key is None:
+        raise ValueError("Invalid city")
+    return key
+
+
+class CityDict(dict):
+    """
+    A dict keyed by normalize_city(): every spelling of a city reads and
+    writes the same entry, so d["Zürich"] = 4 is stored under "zurich" and
+    d["new  york"] under "new york". Writing a key that is not a city name
+    raises ValueError.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, data=(), **kwargs):
+        super().__init__()
+        self.update(data, **kwargs)
+
+    def __setitem__(self, city, value):
+        super().__setitem__(_write_key(city), value)
+
+    def __getitem__(self, city):
+        key = normalize_city(city)
+        if key is None:
+            raise KeyError(city)
+        return super().__getitem__(key)
+
+    def __delitem__(self, city):
+        key = normalize_city(city)
+        if key is None:
+            raise KeyError(city)
+        super().__delitem__(key)
+
+    def __contains__(self, city):
+        return super().__contains__(normalize_city(city))
+
+    def get(self, city, default=None):
+        return super().get(normalize_city(city), default)
+
+    def pop(self, city, *default):
+        return super().pop(normalize_city(city), *default)
+
+    def setdefault(self, city, default=None):
+        return super().setdefault(_write_key(city), default)
+
+    def update(self, data=(), **kwargs):
+        items = data.items() if hasattr(data, "items") else data
+        for city, value in items:
+            self[city] = value
+        for city, value in kwargs.items():
+            self[city] = value
+
+    def copy(self):
+        return CityDict(self)
+
+
+class CityIndex:
+    """
+    Resolves raw city input to the canonical key WeatherFetcher stores data under.
+
+    Names are normalized with normalize_city() and then mapped through the alias
+    table ("nyc" -> "new york"). Each raw string seen is memoized, so repeated
+    inputs resolve with a single dict probe and skip normalization entirely.
+    """
+
+    def __init__(self, aliases=None, memo_size=MEMO_SIZE):
+        self._aliases = {}
+        self._memo = {}
+        self.memo_size = memo_size
+        for alias, city in (aliases or {}).items():
+            self.add_alias(alias, city)
+
+    def add_alias(self, alias, city):
+        """Makes alias resolve to the same key as city."""
+        alias_key = normalize_city(alias)
+        city_key = normalize_city(city)
+        if alias_key is None or city_key is None:
+            raise ValueError("Invalid city")
+        # Follow existing aliases so every entry points at a final key
+        city_key = self._aliases.get(city_key, city_key)
+        if city_key == alias_key:
+            raise ValueError(f"Alias {alias!r} cannot point at itself")
+        self._aliases[alias_key] = city_key
+        for other, target in self._aliases.items():
+            if target == alias_key:
+                self._aliases[other] = city_key
+        self._memo.clear()
+
+    @property
+    def aliases(self):
+        """Returns a copy of the alias table, normalized alias -> canonical key."""
+        return dict(self._aliases)
+
+    def key(self, city):
+        """Returns the canonical key for city, or None if it is not a valid city name."""
+        try:
+            return self._memo[city]
+        except (KeyError, TypeError):
+            pass
+        key = normalize_city(city)
+        if key is None:
+            return None
+        key = self._aliases.get(key, key)
+        memo = self._memo
+        if len(memo) >= self.memo_size:
+            memo.clear()
+        memo[city] = key
+        return key
+
+
+def city_index_of(fetcher):
+    """
+    Returns the CityIndex a fetcher resolves cities with, or a new one without
+    aliases. Wrappers key their caches and batches with it, so every spelling
+    the fetcher treats as one city is one key there too.
+    """
+    index = getattr(fetcher, "index", None)
+    return index if isinstance(index, CityIndex) else CityIndex()
@@ -0,0 +1,73 @@
+"""Application logic: one function per command, each returning the text to print."""
+from model import TaskError
+
+
+def add_notes(store, contents):
+    """Adds one or more notes under a single lock and write."""
+    if not contents:
+        raise TaskError("No notes to add")
+    with store.edit() as notes:
+        note_ids = notes.add_many(contents)
+    if len(note_ids) == 1:
+        return f"Added note {note_ids[0]}"
+    return f"Added notes {note_ids[0]}-{note_ids[-1]}"
+
+
+def list_notes(store, completed=None, offset=0, limit=None):
+    """
+    Yields the listing line by line while the file is read, for all notes or
+    only completed (True) / pending (False) ones, paged by offset and limit.
+    """
+    empty = True
+    for note_id, note in store.iter_notes(completed, offset, limit):
+        empty = False
+        yield format_note(note_id, note)
+    if empty:
+        yield "No notes"
+
+
+def show_note(store, note_id):
+    return store.get_note(note_id).content
+
+
+def complete_notes(store, note_ids):
+    """Completes one or more notes under a single lock and write."""
+    with store.edit() as notes:
+        note_ids = existing_ids(notes, note_ids)
+        notes.complete_many(note_ids)
+    if len(note_ids) == 1:
+        return f"Completed note {note_ids[0]}"
+    return f"Completed notes {', '.join(map(str, note_ids))}"
+
+
+def delete_notes(store, note_ids):
+    """Deletes one or more notes (IDs as they were before the command) in one write."""
+    with store.edit() as notes:
+        note_ids = existing_ids(notes, note_ids)
+        notes.delete_many(note_ids)
+    if len(note_ids) == 1:
+        return f"Deleted note {note_ids[0]}"
+    return f"Deleted {len(note_ids)} notes"
+
+
+def existing_ids(notes, note_ids):
+    """
+    Lists the IDs from an iterable, failing at the first one that does not
+    exist, before reading any further: a mistyped range such as 1..4000000000
+    is reported right away instead of being expanded.
+    """
+    ids = []
+    for note_id in note_ids:
+        notes.get(note_id)
+        ids.append(note_id)
+    return ids
+
+
+def purge_notes(store):
+    with store.edit() as notes:
+        notes.purge()
+    return "Deleted all notes"
+
+
+def format_note(note_id, note):
+    return f"{note_id} [{'x' if note.completed else ' '}] {note.content}"
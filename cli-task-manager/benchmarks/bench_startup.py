@@ -0,0 +1,108 @@
+"""
+Wall-clock benchmark for `python main.py <command>` across tasks.md sizes.
+
+Each command runs as a fresh process, the way users invoke it, against a copy
+of a generated tasks.md. The median time minus the time of a bare
+`python -c pass` is the command's overhead, which is checked against a
+regression budget of fixed milliseconds plus milliseconds per 1000 notes.
+
+Run from anywhere: python cli-task-manager/benchmarks/bench_startup.py
+Options: --sizes 0,1000,10000  --repeat 7  --budget-scale 1.5  --no-budget
+Exits with status 1 when a command is over budget.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from storage import TaskStore
+
+MAIN = os.path.join(APP_DIR, "main.py")
+
+# Command name -> (argv, budget: fixed ms, ms per 1000 notes)
+COMMANDS = {
+    "--version": (["--version"], 5, 0),
+    "--help": (["--help"], 40, 0),
+    "list --limit 20": (["list", "--limit", "20"], 50, 0.5),
+    "list": (["list"], 50, 15),
+    "list --completed": (["list", "--completed"], 50, 15),
+    "show last": (["show", "{last}"], 50, 0.5),
+    "add": (["add", "benchmark note"], 60, 20),
+    "complete last": (["complete", "{last}"], 60, 20),
+    "delete 1..10": (["delete", "1..10"], 60, 20),
+}
+
+
+def build_file(path, notes):
+    store = TaskStore(path)
+    with store.edit() as state:
+        state.add_many([f"Note number {i} with some *markdown* text" for i in range(1, notes + 1)])
+    if notes:
+        with store.edit() as state:
+            state.complete_many(list(range(1, notes + 1, 3)))
+
+
+def run_once(argv, cwd):
+    start = time.perf_counter()
+    subprocess.run([sys.executable] + argv, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000
+
+
+def median_ms(argv, cwd, repeat, prepare=None):
+    samples = []
+    for _ in range(repeat):
+        if prepare:
+            prepare()
+        samples.append(run_once(argv, cwd))
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="0,1000,10000", help="comma-separated note counts")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="multiply every budget, for slow machines")
+    parser.add_argument("--no-budget", action="store_true", help="report only, never fail")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    baseline = median_ms(["-c", "pass"], APP_DIR, args.repeat)
+    print(f"interpreter startup: {baseline:.1f} ms (subtracted below)\n")
+    print(f"{'command':<20} {'notes':>8} {'overhead ms':>12} {'budget ms':>10}")
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            original = os.path.join(tmp, f"tasks-{size}.md")
+            build_file(original, size)
+            work = os.path.join(tmp, f"work-{size}")
+            os.mkdir(work)
+            target = os.path.join(work, "tasks.md")
+
+            def prepare():
+                shutil.copyfile(original, target)
+
+            for name, (argv, fixed, per_thousand) in COMMANDS.items():
+                argv = [arg.format(last=max(size, 1)) for arg in argv]
+                overhead = median_ms([MAIN] + argv, work, args.repeat, prepare) - baseline
+                budget = (fixed + per_thousand * size / 1000) * args.budget_scale
+                over = overhead > budget
+                if over:
+                    failures.append((name, size))
+                print(f"{name:<20} {size:>8} {overhead:>12.1f} {budget:>10.1f}{'  OVER BUDGET' if over else ''}")
+
+    if failures and not args.no_budget:
+        print(f"\n{len(failures)} command(s) over budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+Command line parsing and dispatch.
+
+The application and persistence modules are imported inside run(), so
+--help and argument errors never load them. While a daemon is serving
+tasks.md (see daemon.py), commands are sent to it through the thin client
+instead, and its reply is printed as is.
+"""
+import argparse
+import sys
+
+from model import TaskError
+from version import VERSION
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="main.py", description="Manage simple Markdown notes in tasks.md.")
+    parser.add_argument("--version", action="version", version=VERSION)
+    commands = parser.add_subparsers(dest="command", required=True, metavar="command")
+
+    add = commands.add_parser("add", help="add a note, or one note per line of a file")
+    add_source = add.add_mutually_exclusive_group(required=True)
+    add_source.add_argument("content", nargs="?", help="note content (a single line)")
+    add_source.add_argument("--from-file", metavar="PATH", help="add every line of PATH ('-' for stdin)")
+
+    list_ = commands.add_parser("list", help="list notes")
+    status = list_.add_mutually_exclusive_group()
+    status.add_argument("--completed", action="store_true", help="only completed notes")
+    status.add_argument("--pending", action="store_true", help="only pending notes")
+    list_.add_argument("--offset", type=non_negative_int, default=0, help="skip this many matching notes")
+    list_.add_argument("--limit", type=positive_int, help="show at most this many notes")
+
+    show = commands.add_parser("show", help="print a note")
+    show.add_argument("id", type=int)
+
+    complete = commands.add_parser("complete", help="mark notes completed")
+    complete.add_argument("ids", type=id_list, nargs="+", metavar="id", help="note ID or range such as 2..5")
+
+    delete = commands.add_parser("delete", help="delete notes")
+    delete.add_argument("ids", type=id_list, nargs="+", metavar="id", help="note ID or range such as 2..5")
+
+    purge = commands.add_parser("purge", help="delete all notes")
+    purge.add_argument("--force", action="store_true", help="required to confirm the purge")
+
+    daemon = commands.add_parser("daemon", help="serve tasks.md from memory to later commands")
+    daemon.add_argument("--stop", action="store_true", help="stop the running daemon")
+
+    return parser
+
+
+def non_negative_int(text):
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError("must be 0 or more")
+    return value
+
+
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError("must be 1 or more")
+    return value
+
+
+def id_list(text):
+    """Parses an ID ("7") or an inclusive range ("2..40") into a range of IDs."""
+    first, dots, last = text.partition("..")
+    try:
+        first = int(first)
+        last = int(last) if dots else first
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid id: {text}") from None
+    if first > last:
+        raise argparse.ArgumentTypeError(f"invalid range: {text}")
+    # Left lazy: the IDs are only checked against the notes once the file is read
+    return range(first, last + 1)
+
+
+def read_lines(path):
+    """Reads note contents, one per line, from a UTF-8 file or stdin ('-')."""
+    try:
+        if path == "-":
+            # Bytes decoded here, so stdin is UTF-8 whatever the locale says
+            stdin = getattr(sys.stdin, "buffer", sys.stdin)
+            text = stdin.read()
+            if isinstance(text, bytes):
+                text = text.decode("utf-8")
+        else:
+            with open(path, encoding="utf-8", newline="") as f:
+                text = f.read()
+    except UnicodeDecodeError:
+        raise TaskError(f"{'Input' if path == '-' else path} is not valid UTF-8") from None
+    lines = text.split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    return [line[:-1] if line.endswith("\r") else line for line in lines]
+
+
+def flatten_ids(id_lists):
+    """
+    Joins parsed IDs and ranges, dropping repeats but keeping order. Yields
+    lazily, so a range far past the last note fails at its first missing ID.
+    """
+    seen = set()
+    for ids in id_lists:
+        for note_id in ids:
+            if note_id not in seen:
+                seen.add(note_id)
+                yield note_id
+
+
+def run(args, store):
+    """Runs a parsed command and returns its output: a string or an iterable of lines."""
+    import app
+
+    if args.command == "add":
+        if args.from_file is None:
+            contents = [args.content]
+        elif getattr(args, "lines", None) is not None:
+            # Already read by the client that sent the command to the daemon
+            contents = args.lines
+        else:
+            contents = read_lines(args.from_file)
+        return app.add_notes(store, contents)
+    if args.command == "list":
+        completed = True if args.completed else False if args.pending else None
+        return app.list_notes(store, completed, args.offset, args.limit)
+    if args.command == "show":
+        return app.show_note(store, args.id)
+    if args.command == "complete":
+        return app.complete_notes(store, flatten_ids(args.ids))
+    if args.command == "delete":
+        return app.delete_notes(store, flatten_ids(args.ids))
+    if args.command == "purge":
+        if not args.force:
+            raise TaskError("Refusing to purge without --force")
+        return app.purge_notes(store)
+    if args.command == "daemon":
+        import daemon
+
+        return daemon.stop() if args.stop else daemon.serve(store)
+    raise TaskError(f"Unknown command: {args.command}")
+
+
+def main(argv=None, store=None):
+    """Entry point; returns the process exit code."""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    args = build_parser().parse_args(argv)
+    if store is None and args.command != "daemon":
+        from functools import partial
+
+        from client import call_daemon
+
+        read = None
+        if args.command == "add" and args.from_file is not None:
+            read = partial(read_lines, args.from_file)
+        try:
+            reply = call_daemon(argv, read)
+        except TaskError as error:
+            print(error, file=sys.stderr)
+            return 1
+        except OSError as error:
+            print(f"File error: {error.strerror}", file=sys.stderr)
+            return 1
+        if reply is not None:
+            code, out, err = reply
+            sys.stdout.write(out)
+            sys.stderr.write(err)
+            return code
+    return execute(args, store, sys.stdout, sys.stderr)
+
+
+def execute(args, store, out, err):
+    """Runs a parsed command, printing its output to out and any error to err; returns the exit code."""
+    try:
+        if store is None:
+            from storage import TaskStore
+
+            store = TaskStore()
+        output = run(args, store)
+        if isinstance(output, str):
+            print(output, file=out)
+        else:
+            # Streamed output is printed as it is produced
+            for line in output:
+                print(line, file=out)
+    except TaskError as error:
+        print(error, file=err)
+        return 1
+    except OSError as error:
+        print(f"File error: {error.strerror}", file=err)
+        return 1
+    return 0
@@ -0,0 +1,89 @@
+"""
+Thin client for the task daemon (daemon.py), and the wire format both sides use.
+
+A request is the command line plus, for `add --from-file`, the lines the
+client read itself; the reply is the exit code and the exact stdout and
+stderr text the command produced. Each side sends its message and shuts
+down its write end, so a message is everything up to end of stream:
+a sequence of strings, each a 4-byte big-endian length and UTF-8 bytes.
+
+This module runs on every command while a daemon may be listening, so it
+avoids the socket module (and the enum and selectors imports it pulls in)
+in favour of the _socket extension, and avoids json.
+"""
+import os
+
+# storage.FILE_NAME + ".sock", spelled out so the client never imports storage
+SOCKET_PATH = "tasks.md.sock"
+
+_LENGTH_SIZE = 4
+
+
+def call_daemon(argv, read_lines=None, socket_path=SOCKET_PATH):
+    """
+    Runs a command line on the daemon serving socket_path. read_lines, if
+    given, returns the note lines for `add --from-file`; it is only called
+    once a daemon has answered, since the file or stdin is read just once.
+    Returns (exit code, stdout text, stderr text), or None when no daemon
+    is listening, in which case the caller runs the command directly.
+    """
+    if not os.path.exists(socket_path):
+        return None
+    import _socket
+
+    sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    try:
+        try:
+            sock.connect(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            # A socket file left behind by a daemon that is gone
+            return None
+        request = [str(len(argv))] + list(argv)
+        if read_lines is not None:
+            # Read here: the daemon has another working directory and no access to our stdin
+            request += read_lines()
+        sock.sendall(encode(request))
+        sock.shutdown(_socket.SHUT_WR)
+        reply = receive(sock)
+    finally:
+        sock.close()
+    if len(reply) != 3 or not reply[0].lstrip("-").isdigit():
+        from model import TaskError
+
+        raise TaskError("Invalid reply from task daemon")
+    return int(reply[0]), reply[1], reply[2]
+
+
+def encode(strings):
+    parts = []
+    for string in strings:
+        data = string.encode("utf-8", "surrogatepass")
+        parts.append(len(data).to_bytes(_LENGTH_SIZE, "big"))
+        parts.append(data)
+    return b"".join(parts)
+
+
+def decode(data):
+    strings = []
+    position = 0
+    while position < len(data):
+        end = position + _LENGTH_SIZE + int.from_bytes(data[position:position + _LENGTH_SIZE], "big")
+        if end > len(data):
+            raise ValueError("Truncated message")
+        strings.append(data[position + _LENGTH_SIZE:end].decode("utf-8", "surrogatepass"))
+        position = end
+    return strings
+
+
+def receive(sock):
+    """Reads one message: everything the peer sends before shutting down its write end."""
+    chunks = []
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    try:
+        return decode(b"".join(chunks))
+    except (ValueError, UnicodeDecodeError):
+        return []
@@ -0,0 +1,241 @@
+"""
+Opt-in resident daemon: `python main.py daemon` serves tasks.md from memory.
+
+The daemon loads tasks.md once, holds the writer lock for as long as it runs,
+and answers commands sent by the thin client (client.py) over the Unix socket
+tasks.md.sock. Commands run one at a time through the same cli and app code
+as direct mode, against the notes in memory, so their output is byte for
+byte what `python main.py` would print.
+
+Writes use group commit: a command's changes are applied in memory, then a
+committer thread persists everything applied since its last write with a
+single TaskStore.save() (one log append and fsync, or one compaction through
+the atomic replace). A command is answered only once the changes it made or
+read are on disk, so commands arriving together share one write.
+
+`python main.py daemon --stop` asks a running daemon to finish its pending
+writes and exit; so do SIGINT and SIGTERM.
+"""
+import io
+import os
+import signal
+import socket
+import socketserver
+import threading
+from contextlib import contextmanager
+from itertools import islice
+
+import cli
+from client import SOCKET_PATH, call_daemon, encode, receive
+from model import TaskError
+
+
+class ResidentStore:
+    """
+    The TaskStore interface over notes held in memory. edit() only counts the
+    change; the daemon's committer writes it to disk.
+    """
+
+    def __init__(self, notes):
+        self.notes = notes
+        # Incremented by every completed edit
+        self.changes = 0
+
+    @contextmanager
+    def edit(self):
+        yield self.notes
+        self.changes += 1
+
+    def iter_notes(self, completed=None, offset=0, limit=None):
+        if limit is not None and limit <= 0:
+            return
+        matching = (
+            (note_id, note) for note_id, note in enumerate(self.notes.notes, start=1)
+            if completed is None or note.completed == completed
+        )
+        yield from islice(matching, offset, None if limit is None else offset + limit)
+
+    def get_note(self, note_id):
+        return self.notes.get(note_id)
+
+
+class TaskDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Serves commands for one tasks.md. Construct it while holding the store's
+    writer lock; serve() does both.
+    """
+
+    def __init__(self, store, socket_path, commit_delay=0.0):
+        """
+        commit_delay: seconds the committer waits after a change before writing,
+        to gather more changes into the same commit. With the default of 0,
+        commits still group whatever arrives while the previous one is writing.
+        """
+        self.store = store
+        self.commit_delay = commit_delay
+        self.resident = ResidentStore(store.load())
+        self.socket_path = socket_path
+        self._state = threading.Condition()
+        self._committed = 0
+        # Change number -> error message, for changes whose write failed
+        self._failures = {}
+        self._stopping = False
+        # Group commits written so far
+        self.commits = 0
+        self._committer = threading.Thread(target=self._commit_loop, name="task-commit")
+
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, _Handler)
+        finally:
+            os.umask(old_umask)
+        self._committer.start()
+
+    def run(self, argv, lines):
+        """Runs one command line and returns (exit code, stdout, stderr)."""
+        out, err = io.StringIO(), io.StringIO()
+        try:
+            args = cli.build_parser().parse_args(argv)
+        except SystemExit:
+            # The client parses first, so this only happens for hand-made requests
+            return 2, "", "Invalid command\n"
+        if args.command == "daemon":
+            return 1, "", "Daemon already running\n"
+        args.lines = lines
+
+        with self._state:
+            before = self.resident.changes
+            code = cli.execute(args, self.resident, out, err)
+            changed = self.resident.changes != before
+            if changed:
+                self._state.notify_all()
+            # Wait for what this command changed or read to be durable
+            change = self.resident.changes
+            self._state.wait_for(lambda: self._committed >= change)
+            error = self._failures.pop(change, None) if changed else None
+        if error is not None:
+            return 1, "", f"{error}\n"
+        return code, out.getvalue(), err.getvalue()
+
+    def _commit_loop(self):
+        with self._state:
+            while True:
+                self._state.wait_for(lambda: self.resident.changes > self._committed or self._stopping)
+                if self.resident.changes > self._committed:
+                    if self.commit_delay and not self._stopping:
+                        # Releases the lock, so more commands can apply their changes
+                        self._state.wait_for(lambda: self._stopping, timeout=self.commit_delay)
+                    self._commit()
+                elif self._stopping:
+                    return
+
+    def _commit(self):
+        """Writes every change applied since the last commit in one save. Holds the state lock."""
+        target = self.resident.changes
+        try:
+            self.store.save(self.resident.notes)
+        except Exception as error:
+            # Any failure is reported to the commands in this group; the committer
+            # must outlive it, or every later command would wait forever
+            message = _error_message(error)
+            for change in range(self._committed + 1, target + 1):
+                self._failures[change] = message
+            # Memory is ahead of the file now; start again from what is on disk
+            try:
+                self.resident.notes = self.store.load()
+            except Exception:
+                pass
+        self._committed = target
+        self.commits += 1
+        self._state.notify_all()
+
+    def stop(self):
+        """Stops serving from another thread; serve() then finishes pending writes and returns."""
+        threading.Thread(target=self.shutdown).start()
+
+    def server_close(self):
+        # Joins the handler threads, which may still be waiting for a commit
+        super().server_close()
+        with self._state:
+            self._stopping = True
+            self._state.notify_all()
+        self._committer.join()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        message = receive(self.request)
+        if not message or not message[0].isdigit() or int(message[0]) > len(message) - 1:
+            reply = (2, "", "Invalid request\n")
+        else:
+            count = int(message[0])
+            argv, lines = message[1:count + 1], message[count + 1:]
+            if argv == ["daemon", "--stop"]:
+                self.server.stop()
+                reply = (0, "Daemon stopped\n", "")
+            else:
+                reply = self.server.run(argv, lines)
+        code, out, err = reply
+        try:
+            self.request.sendall(encode([str(code), out, err]))
+        except OSError:
+            # The client is gone; the command's changes stand, as they would in direct mode
+            pass
+
+
+def _error_message(error):
+    """The concise message a failed commit is reported with, as cli.execute would print it."""
+    if isinstance(error, TaskError):
+        return str(error)
+    if isinstance(error, OSError):
+        return f"File error: {error.strerror}"
+    return "Failed to save tasks.md"
+
+
+def serve(store, socket_path=None):
+    """Runs the daemon for store until it is stopped. Returns the final message."""
+    socket_path = socket_path or f"{store.path}.sock"
+    if _listening(socket_path):
+        raise TaskError("Daemon already running")
+    with store.locked():
+        # The lock proves no other daemon owns the socket: any file there is stale
+        try:
+            os.unlink(socket_path)
+        except FileNotFoundError:
+            pass
+        server = TaskDaemon(store, socket_path)
+        # Signal handlers can only be set from the main thread
+        handle_signals = threading.current_thread() is threading.main_thread()
+        try:
+            if handle_signals:
+                previous = signal.signal(signal.SIGTERM, signal.default_int_handler)
+            print(f"Serving {store.path} on {socket_path}", flush=True)
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if handle_signals:
+                signal.signal(signal.SIGTERM, previous)
+            server.server_close()
+    return "Daemon stopped"
+
+
+def stop(socket_path=SOCKET_PATH):
+    """Asks the daemon serving socket_path to stop."""
+    reply = call_daemon(["daemon", "--stop"], socket_path=socket_path)
+    if reply is None:
+        raise TaskError("No daemon running")
+    return reply[1].rstrip("\n")
+
+
+def _listening(socket_path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            return False
+    return True
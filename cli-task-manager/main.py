@@ -0,0 +1,24 @@
+"""
+Single entry point: python main.py <command> [options]
+
+Every command is a short-lived process, so imports are kept lazy: --version
+loads nothing beyond this file and version.py, --help only needs argparse,
+and each command imports the application and persistence modules it uses.
+"""
+import sys
+
+
+def main(argv):
+    if argv == ["--version"]:
+        from version import VERSION
+
+        print(VERSION)
+        return 0
+
+    from cli import main as run_cli
+
+    return run_cli(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
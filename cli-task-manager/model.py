@@ -0,0 +1,40 @@
+"""Domain model: notes and the rules their content must follow."""
+
+MAX_CONTENT_LENGTH = 1000
+
+
+class TaskError(Exception):
+    """A user-facing failure. The message is printed as-is, without a traceback."""
+
+
+class Note:
+    """
+    A single note. IDs are not stored: a note's ID is its 1-based position
+    among the live notes. `slot` is the stable position the note was written
+    at in tasks.md, which the operation log refers to.
+    """
+
+    __slots__ = ("slot", "content", "completed")
+
+    def __init__(self, slot, content, completed=False):
+        self.slot = slot
+        self.content = content
+        self.completed = completed
+
+    def __repr__(self):
+        return f"Note(slot={self.slot}, content={self.content!r}, completed={self.completed})"
+
+
+def validate_content(content):
+    """Checks the note content invariants from DESIGN.md section 4.1."""
+    if not isinstance(content, str) or not content.strip():
+        raise TaskError("Note content cannot be empty")
+    if "\n" in content or "\r" in content:
+        raise TaskError("Note content must be a single line")
+    try:
+        content.encode("utf-8")
+    except UnicodeEncodeError:
+        # Lone surrogates, e.g. from command line bytes that are not UTF-8
+        raise TaskError("Note content must be valid UTF-8") from None
+    if len(content) > MAX_CONTENT_LENGTH:
+        raise TaskError(f"Note content exceeds {MAX_CONTENT_LENGTH} characters")
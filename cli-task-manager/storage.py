@@ -0,0 +1,489 @@
+"""
+Persistence layer for tasks.md.
+
+The file holds a compacted snapshot followed by an append-only operation log:
+
+    <!-- tasks.md format 3 rows=0000000002 index=000000000120 -->
+    # Tasks
+
+    - [ ] first note
+    - [x] second note
+    <!-- index -->
+    000000000067
+    000000000083
+    <!-- log -->
+    + third note
+    x 1
+    .
+    - 2
+    .
+
+Every note has a stable slot: snapshot rows are slots 1..n in order, and each
+"+" record takes the next slot. Log records refer to slots, never to IDs, so a
+delete never rewrites the notes after it; IDs are recomputed from the order of
+the live notes when the file is read.
+
+The fixed-width header gives the row count and where the offset index starts.
+The index holds the byte offset of every snapshot row in fixed-width entries,
+so a reader can seek straight to any row, and to the log right after the index.
+
+Commands append their records to the log followed by a "." commit record, in
+one write; records after the last commit record belong to an interrupted
+write and are ignored, so a command's changes apply all or not at all.
+A write that would bring the log to at least COMPACT_MIN_RECORDS records and
+to at least half as many records as there are live notes compacts everything
+into a new snapshot instead, through an atomic temp-file replace. Writers hold
+an exclusive lock on tasks.md.lock for the whole read-modify-write.
+"""
+import os
+import re
+from contextlib import contextmanager
+
+from model import Note, TaskError, validate_content
+
+FILE_NAME = "tasks.md"
+FORMAT_VERSION = 3
+
+HEADER_TEMPLATE = "<!-- tasks.md format {version} rows={rows:010d} index={index:012d} -->\n"
+HEADER_SIZE = len(HEADER_TEMPLATE.format(version=FORMAT_VERSION, rows=0, index=0))
+TITLE = b"# Tasks\n"
+INDEX_MARKER = b"<!-- index -->\n"
+LOG_MARKER = b"<!-- log -->\n"
+# Ends the records of one write in the log
+COMMIT_RECORD = ".\n"
+PENDING_PREFIX = b"- [ ] "
+COMPLETED_PREFIX = b"- [x] "
+INDEX_ENTRY_SIZE = 13
+
+_HEADER_RE = re.compile(rb"<!-- tasks\.md format (\d+) rows=(\d{10}) index=(\d{12}) -->\n")
+_ANY_VERSION_RE = re.compile(rb"<!-- tasks\.md format \d+\b")
+
+# The log is compacted once it has this many records and at least half as many
+# records as there are live notes, which keeps rewrites amortized O(1) per command
+COMPACT_MIN_RECORDS = 64
+
+
+class Notes:
+    """
+    The notes in a tasks.md file, loaded in memory.
+    Mutations update the notes and queue the log records that persist them.
+    """
+
+    def __init__(self, notes, next_slot, log_records):
+        self.notes = notes
+        self.next_slot = next_slot
+        # Records already in the file's log
+        self.log_records = log_records
+        # Content -> note, for O(1) duplicate detection
+        self._by_content = {note.content: note for note in notes}
+        self.pending = []
+        self.purged = False
+        # Set when the file needs a full rewrite before anything can be appended
+        self.needs_compaction = False
+
+    def __len__(self):
+        return len(self.notes)
+
+    def get(self, note_id):
+        """Returns the note with the given ID."""
+        if not 1 <= note_id <= len(self.notes):
+            raise TaskError(f"Note with id {note_id} not found")
+        return self.notes[note_id - 1]
+
+    def add(self, content):
+        """Adds a pending note and returns its ID."""
+        return self.add_many([content])[0]
+
+    def add_many(self, contents):
+        """
+        Adds several notes, returning their IDs. Every content is validated
+        (including duplicates within the batch) before any note is added.
+        """
+        seen = set()
+        for line, content in enumerate(contents, start=1):
+            try:
+                validate_content(content)
+                if content in self._by_content or content in seen:
+                    raise TaskError("Duplicate note content")
+            except TaskError as error:
+                raise TaskError(f"Line {line}: {error}" if len(contents) > 1 else str(error)) from None
+            seen.add(content)
+
+        for content in contents:
+            note = Note(self.next_slot, content)
+            self.next_slot += 1
+            self.notes.append(note)
+            self._by_content[content] = note
+            self.pending.append(f"+ {content}\n")
+        return list(range(len(self.notes) - len(contents) + 1, len(self.notes) + 1))
+
+    def complete(self, note_id):
+        """Marks a note completed. Completing a completed note changes nothing."""
+        self.complete_many([note_id])
+
+    def complete_many(self, note_ids):
+        """Marks several notes completed, after checking that every ID exists."""
+        notes = [self.get(note_id) for note_id in note_ids]
+        for note in notes:
+            if not note.completed:
+                note.completed = True
+                self.pending.append(f"x {note.slot}\n")
+
+    def delete(self, note_id):
+        """Removes a note; the notes after it move up one ID."""
+        note = self.get(note_id)
+        del self.notes[note_id - 1]
+        del self._by_content[note.content]
+        self.pending.append(f"- {note.slot}\n")
+
+    def delete_many(self, note_ids):
+        """
+        Removes several notes, given by their IDs before the deletion. Every ID
+        is checked first, and the remaining notes are renumbered in one pass.
+        """
+        doomed = {self.get(note_id).slot for note_id in note_ids}
+        kept = []
+        for note in self.notes:
+            if note.slot in doomed:
+                del self._by_content[note.content]
+                self.pending.append(f"- {note.slot}\n")
+            else:
+                kept.append(note)
+        self.notes = kept
+
+    def purge(self):
+        """Removes every note."""
+        self.notes = []
+        self._by_content = {}
+        self.pending = []
+        self.purged = True
+
+
+class TaskStore:
+    """Reads and writes tasks.md (by default in the current working directory)."""
+
+    def __init__(self, path=FILE_NAME):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+
+    def load(self):
+        """Reads the whole file into Notes. A missing file means no notes yet."""
+        try:
+            with open(self.path, "rb") as f:
+                return parse(f)
+        except FileNotFoundError:
+            return Notes([], 1, 0)
+
+    def iter_notes(self, completed=None, offset=0, limit=None):
+        """
+        Yields (id, note) pairs in order without loading the file, optionally
+        only completed (True) or pending (False) notes. offset and limit page
+        through the matching notes. Without a status filter, the offset is
+        reached by seeking through the index instead of reading earlier rows.
+        """
+        if limit is not None and limit <= 0:
+            return
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            layout = _Layout.read(f)
+            log = _LogSummary.read(f, layout)
+
+            if completed is None:
+                # Unfiltered: every live note matches, so jump to the first wanted one
+                start_slot = log.slot_for_id(offset + 1)
+                note_id, skip = offset, 0
+            else:
+                start_slot, note_id, skip = 1, 0, offset
+            remaining = limit
+
+            for note in _iter_slots(f, layout, start_slot):
+                if note.slot in log.deleted:
+                    continue
+                note_id += 1
+                if note.slot in log.completed:
+                    note.completed = True
+                if completed is not None and note.completed != completed:
+                    continue
+                if skip:
+                    skip -= 1
+                    continue
+                yield note_id, note
+                if remaining is not None:
+                    remaining -= 1
+                    if not remaining:
+                        return
+
+    def get_note(self, note_id):
+        """Reads one note by ID, seeking to it through the index."""
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            raise TaskError(f"Note with id {note_id} not found") from None
+        with f:
+            layout = _Layout.read(f)
+            log = _LogSummary.read(f, layout)
+            if not 1 <= note_id <= log.live_count:
+                raise TaskError(f"Note with id {note_id} not found")
+            slot = log.slot_for_id(note_id)
+            note = next(_iter_slots(f, layout, slot))
+            note.completed = note.completed or slot in log.completed
+            return note
+
+    @contextmanager
+    def edit(self):
+        """
+        Locks the file, loads it and yields Notes to mutate. If the block
+        completes, the queued changes are written before the lock is released.
+        """
+        with self.locked():
+            notes = self.load()
+            yield notes
+            self.save(notes)
+
+    @contextmanager
+    def locked(self):
+        """Holds the exclusive writer lock; fails immediately if it is taken."""
+        # Imported here: only commands that write need it
+        import fcntl
+
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                raise TaskError("Failed to acquire file lock") from None
+            yield
+        finally:
+            os.close(fd)
+
+    def save(self, notes):
+        """Persists queued changes: appended to the log, or compacted into a new snapshot."""
+        if notes.purged or notes.needs_compaction or not os.path.exists(self.path):
+            self._write_snapshot(notes)
+        elif notes.pending:
+            records = notes.log_records + len(notes.pending)
+            if records >= COMPACT_MIN_RECORDS and records * 2 >= len(notes):
+                self._write_snapshot(notes)
+            else:
+                self._append(notes.pending)
+                notes.log_records = records
+        notes.pending = []
+        notes.purged = False
+        notes.needs_compaction = False
+
+    def _append(self, records):
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+        try:
+            # One write call, so the records land together; the commit record makes them count
+            os.write(fd, ("".join(records) + COMMIT_RECORD).encode("utf-8"))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _write_snapshot(self, notes):
+        rows = [
+            (COMPLETED_PREFIX if note.completed else PENDING_PREFIX) + note.content.encode("utf-8") + b"\n"
+            for note in notes.notes
+        ]
+        position = HEADER_SIZE + len(TITLE) + 1
+        index = bytearray()
+        for row in rows:
+            index += b"%012d\n" % position
+            position += len(row)
+        header = HEADER_TEMPLATE.format(version=FORMAT_VERSION, rows=len(rows), index=position + len(INDEX_MARKER))
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(header.encode("ascii"))
+            f.write(TITLE)
+            f.write(b"\n")
+            f.writelines(rows)
+            f.write(INDEX_MARKER)
+            f.write(index)
+            f.write(LOG_MARKER)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        # Slots are renumbered by the new snapshot
+        for slot, note in enumerate(notes.notes, start=1):
+            note.slot = slot
+        notes.next_slot = len(notes.notes) + 1
+        notes.log_records = 0
+
+
+class _Layout:
+    """Section positions read from the header."""
+
+    def __init__(self, rows, index_offset):
+        self.rows = rows
+        self.index_offset = index_offset
+        self.log_offset = index_offset + rows * INDEX_ENTRY_SIZE
+
+    @classmethod
+    def read(cls, f):
+        """Reads and checks the header; leaves f at the first snapshot row."""
+        header = f.readline()
+        match = _HEADER_RE.fullmatch(header)
+        if match is None or int(match.group(1)) != FORMAT_VERSION:
+            if _ANY_VERSION_RE.match(header):
+                raise TaskError("Unsupported file format version")
+            raise TaskError("Malformed tasks file")
+        if f.readline() != TITLE or f.readline() != b"\n":
+            raise TaskError("Malformed tasks file")
+        return cls(int(match.group(2)), int(match.group(3)))
+
+    def seek_log(self, f):
+        """Moves f to the first log record."""
+        f.seek(self.log_offset)
+        if f.readline() != LOG_MARKER:
+            raise TaskError("Malformed tasks file")
+
+    def seek_row(self, f, slot):
+        """Moves f to a snapshot row using the index."""
+        f.seek(self.index_offset + (slot - 1) * INDEX_ENTRY_SIZE)
+        entry = f.read(INDEX_ENTRY_SIZE)
+        if len(entry) != INDEX_ENTRY_SIZE or not entry[:-1].isdigit():
+            raise TaskError("Malformed tasks file")
+        f.seek(int(entry))
+
+
+class _LogSummary:
+    """What the log changes, without holding the content it adds."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.added = 0
+        self.deleted = set()
+        self.completed = set()
+        self.torn = False
+
+    @property
+    def live_count(self):
+        return self.rows + self.added - len(self.deleted)
+
+    @classmethod
+    def read(cls, f, layout):
+        log = cls(layout.rows)
+        layout.seek_log(f)
+        for op, arg in _iter_log(f, log):
+            if op == "+":
+                log.added += 1
+            elif op == "x":
+                log.completed.add(arg)
+            else:
+                log.deleted.add(arg)
+        return log
+
+    def slot_for_id(self, note_id):
+        """Maps an ID to its slot by stepping over the deleted slots before it."""
+        slot = note_id
+        for deleted in sorted(self.deleted):
+            if deleted > slot:
+                break
+            slot += 1
+        return slot
+
+
+def _iter_log(f, log):
+    """
+    Yields the committed (op, arg) log records; arg is the content for "+" and
+    a slot otherwise. Records are held back until their commit record is read.
+    """
+    next_slot = log.rows + 1
+    deleted = set()
+    batch = []
+    commit = COMMIT_RECORD.encode()
+    for line in f:
+        if line == commit:
+            yield from batch
+            batch = []
+            continue
+        if not line.endswith(b"\n"):
+            # A torn append from an interrupted write
+            break
+        op, _, arg = line[:-1].partition(b" ")
+        if op == b"+":
+            next_slot += 1
+            batch.append(("+", _decode(arg)))
+        elif op in (b"x", b"-") and arg.isdigit() and 0 < int(arg) < next_slot and int(arg) not in deleted:
+            slot = int(arg)
+            if op == b"-":
+                deleted.add(slot)
+            batch.append((op.decode(), slot))
+        else:
+            raise TaskError("Malformed tasks file")
+    else:
+        if not batch:
+            return
+    # Records without a commit record after them: the command never completed
+    log.torn = True
+
+
+def _iter_slots(f, layout, start_slot):
+    """Yields notes from start_slot on: snapshot rows first, then the log's additions."""
+    slot = start_slot
+    if slot <= layout.rows:
+        layout.seek_row(f, slot)
+        while slot <= layout.rows:
+            yield _parse_note_line(f.readline(), slot)
+            slot += 1
+
+    layout.seek_log(f)
+    added_slot = layout.rows
+    for op, arg in _iter_log(f, _LogSummary(layout.rows)):
+        if op == "+":
+            added_slot += 1
+            if added_slot >= start_slot:
+                yield Note(added_slot, arg)
+
+
+def parse(f):
+    """Parses a whole tasks.md file into Notes, replaying the log over the snapshot."""
+    layout = _Layout.read(f)
+    slots = {}
+    for slot in range(1, layout.rows + 1):
+        slots[slot] = _parse_note_line(f.readline(), slot)
+    if f.readline() != INDEX_MARKER or f.tell() != layout.index_offset:
+        raise TaskError("Malformed tasks file")
+
+    layout.seek_log(f)
+    log = _LogSummary(layout.rows)
+    next_slot = layout.rows + 1
+    log_records = 0
+    for op, arg in _iter_log(f, log):
+        if op == "+":
+            slots[next_slot] = Note(next_slot, arg)
+            next_slot += 1
+        elif op == "x":
+            slots[arg].completed = True
+        else:
+            del slots[arg]
+        log_records += 1
+
+    # dicts keep insertion order, which is slot order
+    notes = Notes(list(slots.values()), next_slot, log_records)
+    # Appending after a torn record would glue onto it, so rewrite instead
+    notes.needs_compaction = log.torn
+    return notes
+
+
+def _parse_note_line(line, slot):
+    if not line.endswith(b"\n"):
+        raise TaskError("Malformed tasks file")
+    if line.startswith(PENDING_PREFIX):
+        completed = False
+    elif line.startswith(COMPLETED_PREFIX):
+        completed = True
+    else:
+        raise TaskError("Malformed tasks file")
+    return Note(slot, _decode(line[len(PENDING_PREFIX):-1]), completed)
+
+
+def _decode(raw):
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        raise TaskError("Tasks file is not valid UTF-8") from None
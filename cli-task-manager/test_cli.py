@@ -0,0 +1,158 @@
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import unittest.mock
+
+from cli import VERSION, main
+from storage import TaskStore
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = TaskStore(os.path.join(self.tmp.name, "tasks.md"))
+
+    def run_cli(self, *argv):
+        out, err = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            try:
+                code = main(list(argv), store=self.store)
+            except SystemExit as exit:
+                code = exit.code
+        return code, out.getvalue(), err.getvalue()
+
+    def test_add_and_list(self):
+        self.assertEqual(self.run_cli("add", "Buy milk"), (0, "Added note 1\n", ""))
+        self.run_cli("add", "Write **report**")
+        self.run_cli("complete", "2")
+        self.assertEqual(self.run_cli("list")[1], "1 [ ] Buy milk\n2 [x] Write **report**\n")
+        self.assertEqual(self.run_cli("list", "--completed")[1], "2 [x] Write **report**\n")
+        self.assertEqual(self.run_cli("list", "--pending")[1], "1 [ ] Buy milk\n")
+
+    def test_list_paging(self):
+        for i in range(1, 6):
+            self.run_cli("add", f"note {i}")
+        self.run_cli("complete", "4")
+        self.assertEqual(self.run_cli("list", "--offset", "1", "--limit", "2")[1], "2 [ ] note 2\n3 [ ] note 3\n")
+        self.assertEqual(self.run_cli("list", "--pending", "--offset", "3")[1], "5 [ ] note 5\n")
+        self.assertEqual(self.run_cli("list", "--offset", "9")[1], "No notes\n")
+        self.assertNotEqual(self.run_cli("list", "--limit", "0")[0], 0)
+        self.assertNotEqual(self.run_cli("list", "--offset", "-1")[0], 0)
+
+    def test_add_from_file(self):
+        path = os.path.join(self.tmp.name, "notes.txt")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write("first\nsecond\r\n  third  \n")
+        self.run_cli("add", "zero")
+        self.assertEqual(self.run_cli("add", "--from-file", path), (0, "Added notes 2-4\n", ""))
+        self.assertEqual(self.run_cli("list")[1], "1 [ ] zero\n2 [ ] first\n3 [ ] second\n4 [ ]   third  \n")
+
+    def test_add_from_stdin(self):
+        with unittest.mock.patch("sys.stdin", io.StringIO("a\nb\n")):
+            self.assertEqual(self.run_cli("add", "--from-file", "-"), (0, "Added notes 1-2\n", ""))
+
+    def test_add_from_input_that_is_not_utf8(self):
+        path = os.path.join(self.tmp.name, "notes.txt")
+        with open(path, "wb") as f:
+            f.write(b"caf\xe9\n")
+        self.assertEqual(self.run_cli("add", "--from-file", path), (1, "", f"{path} is not valid UTF-8\n"))
+        stdin = io.TextIOWrapper(io.BytesIO(b"caf\xc3\xa9\n"), encoding="latin-1")
+        with unittest.mock.patch("sys.stdin", stdin):
+            self.assertEqual(self.run_cli("add", "--from-file", "-"), (0, "Added note 1\n", ""))
+        stdin = io.TextIOWrapper(io.BytesIO(b"caf\xe9\n"), encoding="latin-1")
+        with unittest.mock.patch("sys.stdin", stdin):
+            self.assertEqual(self.run_cli("add", "--from-file", "-"), (1, "", "Input is not valid UTF-8\n"))
+        self.assertEqual(self.run_cli("list")[1], "1 [ ] café\n")
+
+    def test_add_batch_is_validated_up_front(self):
+        path = os.path.join(self.tmp.name, "notes.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("fine\nalso fine\nfine\n")
+        self.assertEqual(self.run_cli("add", "--from-file", path), (1, "", "Line 3: Duplicate note content\n"))
+        self.assertEqual(self.run_cli("list")[1], "No notes\n")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("")
+        self.assertEqual(self.run_cli("add", "--from-file", path), (1, "", "No notes to add\n"))
+        self.assertNotEqual(self.run_cli("add", "x", "--from-file", path)[0], 0)
+
+    def test_complete_many(self):
+        for i in range(1, 6):
+            self.run_cli("add", f"note {i}")
+        self.assertEqual(self.run_cli("complete", "2", "4..5", "2"), (0, "Completed notes 2, 4, 5\n", ""))
+        self.assertEqual(self.run_cli("list", "--completed")[1], "2 [x] note 2\n4 [x] note 4\n5 [x] note 5\n")
+        self.assertEqual(self.run_cli("complete", "1", "9"), (1, "", "Note with id 9 not found\n"))
+        self.assertEqual(self.run_cli("list", "--completed", "--limit", "1")[1], "2 [x] note 2\n")
+
+    def test_delete_range(self):
+        for i in range(1, 11):
+            self.run_cli("add", f"note {i}")
+        self.assertEqual(self.run_cli("delete", "2..4", "9"), (0, "Deleted 4 notes\n", ""))
+        self.assertEqual(self.run_cli("list")[1], "".join(
+            f"{i} [ ] note {n}\n" for i, n in enumerate([1, 5, 6, 7, 8, 10], start=1)))
+        self.assertEqual(self.run_cli("delete", "5..7"), (1, "", "Note with id 7 not found\n"))
+        self.assertEqual(self.run_cli("complete", "1..4000000000"), (1, "", "Note with id 7 not found\n"))
+        self.assertEqual(len(self.store.load()), 6)
+        self.assertNotEqual(self.run_cli("delete", "4..2")[0], 0)
+        self.assertNotEqual(self.run_cli("delete", "a..b")[0], 0)
+
+    def test_list_empty(self):
+        self.assertEqual(self.run_cli("list"), (0, "No notes\n", ""))
+
+    def test_show(self):
+        self.run_cli("add", "# Heading")
+        self.assertEqual(self.run_cli("show", "1"), (0, "# Heading\n", ""))
+        self.assertEqual(self.run_cli("show", "2"), (1, "", "Note with id 2 not found\n"))
+
+    def test_delete_reindexes(self):
+        for content in ("a", "b", "c"):
+            self.run_cli("add", content)
+        self.assertEqual(self.run_cli("delete", "1"), (0, "Deleted note 1\n", ""))
+        self.assertEqual(self.run_cli("list")[1], "1 [ ] b\n2 [ ] c\n")
+
+    def test_complete_is_idempotent(self):
+        self.run_cli("add", "a")
+        self.assertEqual(self.run_cli("complete", "1")[0], 0)
+        self.assertEqual(self.run_cli("complete", "1"), (0, "Completed note 1\n", ""))
+
+    def test_errors_are_concise(self):
+        self.run_cli("add", "a")
+        self.assertEqual(self.run_cli("add", "a"), (1, "", "Duplicate note content\n"))
+        self.assertEqual(self.run_cli("add", "  "), (1, "", "Note content cannot be empty\n"))
+        # Command line bytes that are not UTF-8 arrive as lone surrogates
+        self.assertEqual(self.run_cli("add", "bad\udcff"), (1, "", "Note content must be valid UTF-8\n"))
+        self.assertEqual(self.run_cli("list")[1], "1 [ ] a\n")
+
+    def test_purge_requires_force(self):
+        self.run_cli("add", "a")
+        self.assertEqual(self.run_cli("purge"), (1, "", "Refusing to purge without --force\n"))
+        self.assertEqual(self.run_cli("purge", "--force"), (0, "Deleted all notes\n", ""))
+        self.assertEqual(self.run_cli("list")[1], "No notes\n")
+
+    def test_version(self):
+        self.assertEqual(self.run_cli("--version"), (0, f"{VERSION}\n", ""))
+
+    def test_entry_point_imports_lazily(self):
+        main_py = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+        def loaded(*argv):
+            result = subprocess.run([sys.executable, "-X", "importtime", main_py, *argv],
+                                    capture_output=True, text=True, cwd=self.tmp.name)
+            imported = {line.rsplit("|", 1)[-1].strip() for line in result.stderr.splitlines()}
+            return sorted(imported & {"argparse", "app", "storage"})
+
+        self.assertEqual(loaded("--version"), [])
+        self.assertEqual(loaded("--help"), ["argparse"])
+
+    def test_usage_errors(self):
+        self.assertNotEqual(self.run_cli()[0], 0)
+        self.assertNotEqual(self.run_cli("show", "one")[0], 0)
+        self.assertNotEqual(self.run_cli("list", "--completed", "--pending")[0], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
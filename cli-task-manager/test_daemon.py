@@ -0,0 +1,196 @@
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from client import call_daemon
+from daemon import ResidentStore, TaskDaemon, serve, stop
+from model import TaskError
+from storage import TaskStore
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+
+class TestResidentStore(unittest.TestCase):
+    def test_reads_match_the_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = TaskStore(os.path.join(tmp, "tasks.md"))
+            with store.edit() as notes:
+                notes.add_many([f"note {i}" for i in range(1, 11)])
+                notes.complete_many([2, 5, 6])
+                notes.delete_many([3])
+            resident = ResidentStore(store.load())
+            for completed in (None, True, False):
+                for offset, limit in ((0, None), (2, 3), (8, None), (0, 0), (20, 1)):
+                    self.assertEqual(
+                        [(i, n.content, n.completed) for i, n in resident.iter_notes(completed, offset, limit)],
+                        [(i, n.content, n.completed) for i, n in store.iter_notes(completed, offset, limit)],
+                    )
+            self.assertEqual(resident.get_note(4).content, store.get_note(4).content)
+            with self.assertRaises(TaskError):
+                resident.get_note(10)
+
+
+class TestTaskDaemon(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = TaskStore(os.path.join(self.tmp.name, "tasks.md"))
+        self.socket_path = os.path.join(self.tmp.name, "tasks.md.sock")
+
+    def start(self, **options):
+        lock = self.store.locked()
+        lock.__enter__()
+        server = TaskDaemon(self.store, self.socket_path, **options)
+        thread = threading.Thread(target=server.serve_forever, args=(0.05,))
+        thread.start()
+
+        def close():
+            server.shutdown()
+            thread.join()
+            server.server_close()
+            lock.__exit__(None, None, None)
+
+        self.addCleanup(close)
+        return server
+
+    def call(self, *argv):
+        return call_daemon(list(argv), socket_path=self.socket_path)
+
+    def test_commands_and_persistence(self):
+        self.start()
+        self.assertEqual(self.call("add", "first"), (0, "Added note 1\n", ""))
+        self.assertEqual(call_daemon(["add", "--from-file", "unused"], lambda: ["second", "third"],
+                                     self.socket_path), (0, "Added notes 2-3\n", ""))
+        self.assertEqual(self.call("complete", "2"), (0, "Completed note 2\n", ""))
+        self.assertEqual(self.call("add", "first"), (1, "", "Duplicate note content\n"))
+        self.assertEqual(self.call("list", "--pending"), (0, "1 [ ] first\n3 [ ] third\n", ""))
+        self.assertEqual(self.call("show", "7"), (1, "", "Note with id 7 not found\n"))
+        self.assertEqual(self.call("daemon"), (1, "", "Daemon already running\n"))
+        # Every answered write is already on disk
+        self.assertEqual([(n.content, n.completed) for n in self.store.load().notes],
+                         [("first", False), ("second", True), ("third", False)])
+
+    def test_holds_the_writer_lock(self):
+        self.start()
+        with self.assertRaises(TaskError):
+            with self.store.edit():
+                pass
+
+    def test_concurrent_writes_share_a_commit(self):
+        server = self.start(commit_delay=0.5)
+        replies = []
+        threads = [threading.Thread(target=lambda i=i: replies.append(self.call("add", f"note {i}")))
+                   for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(code for code, _, _ in replies), [0] * 10)
+        self.assertEqual(server.commits, 1)
+        self.assertEqual(len(self.store.load()), 10)
+
+    def test_failed_commit_is_reported_and_memory_reloaded(self):
+        server = self.start()
+        self.call("add", "kept")
+        save = self.store.save
+
+        def failing_save(notes):
+            raise OSError(28, "No space left on device")
+
+        self.store.save = failing_save
+        self.assertEqual(self.call("add", "lost"), (1, "", "File error: No space left on device\n"))
+        self.store.save = save
+        self.assertEqual(self.call("list"), (0, "1 [ ] kept\n", ""))
+        self.assertEqual(server.resident.changes, 2)
+
+    def test_unexpected_commit_error_keeps_the_daemon_serving(self):
+        self.start()
+        self.call("add", "kept")
+        save = self.store.save
+
+        def failing_save(notes):
+            raise UnicodeEncodeError("utf-8", "bad\udcff", 3, 4, "surrogates not allowed")
+
+        self.store.save = failing_save
+        self.assertEqual(self.call("add", "lost"), (1, "", "Failed to save tasks.md\n"))
+        self.store.save = save
+        self.assertEqual(self.call("list"), (0, "1 [ ] kept\n", ""))
+        self.assertEqual(self.call("add", "saved"), (0, "Added note 2\n", ""))
+        self.assertEqual(len(self.store.load()), 2)
+
+    def test_stale_socket_falls_back(self):
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.socket_path)
+        stale.close()
+        self.assertIsNone(self.call("list"))
+        self.assertIsNone(call_daemon(["list"], socket_path=os.path.join(self.tmp.name, "missing.sock")))
+        with self.assertRaises(TaskError):
+            stop(self.socket_path)
+
+    def test_serve_replaces_stale_socket_and_refuses_a_second_daemon(self):
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.socket_path)
+        stale.close()
+        result = []
+        thread = threading.Thread(target=lambda: result.append(serve(self.store, self.socket_path)))
+        thread.start()
+        for _ in range(200):
+            if self.call("list") is not None:
+                break
+            time.sleep(0.01)
+        with self.assertRaises(TaskError) as context:
+            serve(self.store, self.socket_path)
+        self.assertEqual(str(context.exception), "Daemon already running")
+        self.assertEqual(stop(self.socket_path), "Daemon stopped")
+        thread.join()
+        self.assertEqual(result, ["Daemon stopped"])
+        self.assertFalse(os.path.exists(self.socket_path))
+
+
+class TestDaemonEndToEnd(unittest.TestCase):
+    def test_output_is_byte_identical_to_direct_mode(self):
+        with tempfile.TemporaryDirectory() as served, tempfile.TemporaryDirectory() as direct:
+            notes_file = os.path.join(direct, "notes.txt")
+            with open(notes_file, "w", encoding="utf-8") as f:
+                f.write("b\nc *md*\nd\n")
+
+            daemon = subprocess.Popen([sys.executable, MAIN, "daemon"], cwd=served,
+                                      stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            try:
+                self.assertEqual(daemon.stdout.readline(), "Serving tasks.md on tasks.md.sock\n")
+                commands = [
+                    ["add", "a"], ["add", "a"], ["add", "--from-file", notes_file], ["complete", "2", "3..4"],
+                    ["list"], ["list", "--completed", "--offset", "1"], ["show", "3"], ["delete", "1", "9"],
+                    ["delete", "2"], ["list", "--pending"], ["purge"], ["purge", "--force"], ["add", "é ünïcode"], ["list"],
+                ]
+                for argv in commands:
+                    outputs = [subprocess.run([sys.executable, MAIN] + argv, cwd=cwd, capture_output=True)
+                               for cwd in (served, direct)]
+                    through_daemon, without_daemon = [(r.returncode, r.stdout, r.stderr) for r in outputs]
+                    self.assertEqual(through_daemon, without_daemon, argv)
+                stopped = subprocess.run([sys.executable, MAIN, "daemon", "--stop"], cwd=served,
+                                         capture_output=True, text=True)
+                self.assertEqual(stopped.stdout, "Daemon stopped\n")
+                self.assertEqual(daemon.wait(timeout=10), 0)
+            finally:
+                if daemon.poll() is None:
+                    daemon.kill()
+                    daemon.wait()
+                daemon.stdout.close()
+                daemon.stderr.close()
+
+            files = []
+            for cwd in (served, direct):
+                with open(os.path.join(cwd, "tasks.md"), "rb") as f:
+                    files.append(f.read())
+            self.assertEqual(files[0], files[1])
+            self.assertFalse(os.path.exists(os.path.join(served, "tasks.md.sock")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,280 @@
+import os
+import random
+import tempfile
+import unittest
+
+import storage
+from model import MAX_CONTENT_LENGTH, TaskError
+from storage import TaskStore
+
+
+class TestTaskStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "tasks.md")
+        self.store = TaskStore(self.path)
+
+    def contents(self):
+        return [(note.content, note.completed) for note in self.store.load().notes]
+
+    def read(self):
+        with open(self.path, encoding="utf-8") as f:
+            return f.read()
+
+    def test_missing_file_has_no_notes(self):
+        self.assertEqual(len(self.store.load()), 0)
+
+    def test_add_complete_delete_round_trip(self):
+        with self.store.edit() as notes:
+            self.assertEqual(notes.add("first"), 1)
+            self.assertEqual(notes.add("  second *markdown*  "), 2)
+            notes.add("third")
+        with self.store.edit() as notes:
+            notes.complete(2)
+            notes.complete(2)
+            notes.delete(1)
+        self.assertEqual(self.contents(), [("  second *markdown*  ", True), ("third", False)])
+
+    def test_mutations_append_to_the_log(self):
+        with self.store.edit() as notes:
+            notes.add("first")
+        snapshot = self.read()
+        with self.store.edit() as notes:
+            notes.add("second")
+            notes.delete(1)
+        self.assertEqual(self.read(), snapshot + "+ second\n- 1\n.\n")
+
+    def test_duplicates_are_rejected_until_deleted(self):
+        with self.store.edit() as notes:
+            notes.add("same")
+            with self.assertRaisesRegex(TaskError, "Duplicate note content"):
+                notes.add("same")
+            notes.add("Same")
+        with self.store.edit() as notes:
+            notes.delete(1)
+            self.assertEqual(notes.add("same"), 2)
+
+    def test_content_validation(self):
+        with self.store.edit() as notes:
+            for content in ("", "   ", "two\nlines", "carriage\rreturn", "x" * (MAX_CONTENT_LENGTH + 1)):
+                with self.assertRaises(TaskError):
+                    notes.add(content)
+
+    def test_unknown_id(self):
+        with self.store.edit() as notes:
+            notes.add("only")
+            for note_id in (0, 2, -1):
+                with self.assertRaisesRegex(TaskError, f"Note with id {note_id} not found"):
+                    notes.delete(note_id)
+
+    def test_failed_edit_writes_nothing(self):
+        with self.store.edit() as notes:
+            notes.add("kept")
+        before = self.read()
+        with self.assertRaises(TaskError):
+            with self.store.edit() as notes:
+                notes.add("dropped")
+                notes.complete(9)
+        self.assertEqual(self.read(), before)
+
+    def test_log_is_compacted_into_snapshot(self):
+        for i in range(storage.COMPACT_MIN_RECORDS + 5):
+            with self.store.edit() as notes:
+                notes.add(f"note {i}")
+        text = self.read()
+        log = text.split(storage.LOG_MARKER.decode())[1]
+        self.assertLess(log.count("\n"), storage.COMPACT_MIN_RECORDS)
+        self.assertEqual(len(self.store.load()), storage.COMPACT_MIN_RECORDS + 5)
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+    def test_matches_reference_model_under_random_operations(self):
+        rng = random.Random(7)
+        expected = []
+        for step in range(400):
+            with self.store.edit() as notes:
+                action = rng.random()
+                if action < 0.5 or not expected:
+                    notes.add(f"note {step}")
+                    expected.append([f"note {step}", False])
+                elif action < 0.75:
+                    i = rng.randrange(len(expected))
+                    notes.complete(i + 1)
+                    expected[i][1] = True
+                else:
+                    i = rng.randrange(len(expected))
+                    notes.delete(i + 1)
+                    del expected[i]
+        self.assertEqual(self.contents(), [tuple(e) for e in expected])
+
+    def test_batch_operations_write_once(self):
+        with self.store.edit() as notes:
+            notes.add_many([f"note {i}" for i in range(10)])
+        snapshot = self.read()
+        with self.store.edit() as notes:
+            notes.complete_many([1, 3])
+            notes.delete_many([2, 3, 9])
+            self.assertEqual([n.content for n in notes.notes][:3], ["note 0", "note 3", "note 4"])
+        self.assertEqual(self.read(), snapshot + "x 1\nx 3\n- 2\n- 3\n- 9\n.\n")
+        self.assertEqual(len(self.store.load()), 7)
+
+    def test_batch_validation_is_all_or_nothing(self):
+        with self.store.edit() as notes:
+            notes.add("existing")
+            with self.assertRaisesRegex(TaskError, "Line 2: Duplicate note content"):
+                notes.add_many(["new", "existing"])
+            with self.assertRaisesRegex(TaskError, "Line 2: Note content cannot be empty"):
+                notes.add_many(["new", ""])
+            with self.assertRaises(TaskError):
+                notes.delete_many([1, 2])
+            self.assertEqual([n.content for n in notes.notes], ["existing"])
+            self.assertEqual(notes.pending, ["+ existing\n"])
+
+    def test_purge(self):
+        with self.store.edit() as notes:
+            notes.add("a")
+            notes.add("b")
+        with self.store.edit() as notes:
+            notes.purge()
+        self.assertEqual(self.contents(), [])
+        self.assertNotIn("+", self.read())
+
+    def test_lock_is_exclusive(self):
+        with self.store.locked():
+            with self.assertRaisesRegex(TaskError, "Failed to acquire file lock"):
+                with self.store.edit():
+                    pass
+        with self.store.edit() as notes:
+            notes.add("after")
+
+    def test_torn_append_is_ignored_and_rewritten(self):
+        with self.store.edit() as notes:
+            notes.add("whole")
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("+ half writ")
+        self.assertEqual(self.contents(), [("whole", False)])
+        with self.store.edit() as notes:
+            notes.add("next")
+        self.assertEqual(self.contents(), [("whole", False), ("next", False)])
+        self.assertNotIn("half", self.read())
+
+    def test_uncommitted_records_are_ignored(self):
+        with self.store.edit() as notes:
+            notes.add("whole")
+        with self.store.edit() as notes:
+            notes.add_many(["a", "b", "c"])
+        data = open(self.path, "rb").read()
+        self.assertTrue(data.endswith(b"+ a\n+ b\n+ c\n.\n"))
+        # Cut anywhere inside the batch, complete lines included, and none of it counts
+        for cut in range(1, len(b"+ a\n+ b\n+ c\n.\n") + 1):
+            self.write_raw(data[:-cut])
+            self.assertEqual(self.contents(), [("whole", False)])
+            self.assertEqual([n.content for _, n in self.store.iter_notes()], ["whole"])
+        with self.store.edit() as notes:
+            notes.add("next")
+        self.assertEqual(self.contents(), [("whole", False), ("next", False)])
+        self.assertNotIn("+ a", self.read())
+
+    def write_raw(self, data):
+        with open(self.path, "wb") as f:
+            f.write(data)
+
+    def empty_file(self):
+        header = storage.HEADER_TEMPLATE.format(version=storage.FORMAT_VERSION, rows=0,
+                                                index=storage.HEADER_SIZE + 9 + len(storage.INDEX_MARKER))
+        return header.encode() + storage.TITLE + b"\n" + storage.INDEX_MARKER + storage.LOG_MARKER
+
+    def test_unsupported_version(self):
+        for header in (b"<!-- tasks.md format 1 -->\n", b"<!-- tasks.md format 2 rows=0000000000 index=000000000082 -->\n"):
+            self.write_raw(header + b"# Tasks\n\n<!-- log -->\n")
+            for read in (self.store.load, lambda: list(self.store.iter_notes())):
+                with self.assertRaisesRegex(TaskError, "Unsupported file format version"):
+                    read()
+
+    def test_malformed_files(self):
+        with self.store.edit() as notes:
+            notes.add("one")
+        valid = open(self.path, "rb").read()
+        bad_files = [
+            b"hello\n",
+            valid.replace(b"- [ ] one", b"- [?] one"),
+            valid.replace(storage.INDEX_MARKER, b""),
+            valid.replace(b"rows=0000000001", b"rows=0000000002"),
+            self.empty_file() + b"x 1\n.\n",
+            self.empty_file() + b"+ a\n- 1\n- 1\n.\n",
+            self.empty_file() + b"? 1\n.\n",
+        ]
+        for data in bad_files:
+            self.write_raw(data)
+            with self.assertRaisesRegex(TaskError, "Malformed tasks file"):
+                self.store.load()
+            with self.assertRaisesRegex(TaskError, "Malformed tasks file"):
+                list(self.store.iter_notes())
+
+    def test_empty_file_layout(self):
+        self.write_raw(self.empty_file())
+        self.assertEqual(len(self.store.load()), 0)
+
+    def test_invalid_utf8(self):
+        self.write_raw(self.empty_file() + b"+ \xff\xfe\n.\n")
+        with self.assertRaisesRegex(TaskError, "UTF-8"):
+            self.store.load()
+
+
+class TestStreamingReads(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = TaskStore(os.path.join(self.tmp.name, "tasks.md"))
+        # A snapshot of 100 notes, then a log that completes, deletes and adds
+        with self.store.edit() as notes:
+            for i in range(100):
+                notes.add(f"note {i}")
+        with self.store.edit() as notes:
+            for note_id in (3, 10, 50):
+                notes.complete(note_id)
+            for note_id in (1, 20, 20, 97):
+                notes.delete(note_id)
+            notes.add("added one")
+            notes.complete(len(notes))
+            notes.add("added two")
+            notes.delete(len(notes) - 1)
+            notes.add("added three")
+        self.expected = [(i, note.content, note.completed) for i, note in enumerate(self.store.load().notes, start=1)]
+
+    def listed(self, **kwargs):
+        return [(i, note.content, note.completed) for i, note in self.store.iter_notes(**kwargs)]
+
+    def test_log_is_not_compacted_in_fixture(self):
+        self.assertGreater(self.store.load().log_records, 0)
+
+    def test_iter_notes_matches_full_load(self):
+        self.assertEqual(self.listed(), self.expected)
+        self.assertEqual(self.listed(completed=True), [e for e in self.expected if e[2]])
+        self.assertEqual(self.listed(completed=False), [e for e in self.expected if not e[2]])
+
+    def test_paging(self):
+        for offset in (0, 1, 17, 94, 95, 96, 200):
+            for limit in (None, 1, 5):
+                end = None if limit is None else offset + limit
+                self.assertEqual(self.listed(offset=offset, limit=limit), self.expected[offset:end])
+        pending = [e for e in self.expected if not e[2]]
+        self.assertEqual(self.listed(completed=False, offset=10, limit=3), pending[10:13])
+
+    def test_get_note_matches_full_load(self):
+        for note_id, content, completed in self.expected:
+            note = self.store.get_note(note_id)
+            self.assertEqual((note.content, note.completed), (content, completed))
+        for note_id in (0, len(self.expected) + 1):
+            with self.assertRaisesRegex(TaskError, "not found"):
+                self.store.get_note(note_id)
+
+    def test_missing_file(self):
+        store = TaskStore(os.path.join(self.tmp.name, "other.md"))
+        self.assertEqual(list(store.iter_notes()), [])
+        with self.assertRaises(TaskError):
+            store.get_note(1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,3 @@
+"""Application version, kept in its own module so --version imports nothing else."""
+
+VERSION = "1.0.0"
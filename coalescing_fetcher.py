@@ -0,0 +1,110 @@
+import asyncio
+import threading
+
+from city_index import city_index_of
+
+
+class _Call:
+    """A fetch in flight that other threads can wait on."""
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class CoalescingFetcher:
+    """
+    Single-flight wrapper around a fetcher for threaded callers.
+    While a lookup for a city is in flight, other threads asking for the same
+    city wait for its result instead of calling the fetcher again.
+    """
+
+    def __init__(self, fetcher):
+        self.fetcher = fetcher
+        self.index = city_index_of(fetcher)
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        # Lookups served by another caller's fetch
+        self.coalesced = 0
+
+    def get_chance_of_rain(self, city):
+        return self._fetch("rain", city, self.fetcher.get_chance_of_rain)
+
+    def get_city_temperature_info(self, city):
+        return self._fetch("temperature", city, self.fetcher.get_city_temperature_info)
+
+    def get_current_temperature(self, city):
+        return self._fetch("temperature", city, self.fetcher.get_current_temperature)
+
+    def _fetch(self, kind, city, fetch):
+        key = self.index.key(city)
+        # Invalid input is the fetcher's to reject
+        if key is None:
+            return fetch(city)
+        key = (kind, key)
+        with self._lock:
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                # The leader's own exception, with its attributes and cause
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fetch(city)
+            return call.value
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+
+
+class AsyncCoalescingFetcher:
+    """
+    Single-flight wrapper around an async fetcher for asyncio tasks.
+    Concurrent lookups of the same city await one shared fetch task.
+    """
+
+    def __init__(self, fetcher):
+        self.fetcher = fetcher
+        self.index = city_index_of(fetcher)
+        self._in_flight = {}
+        # Lookups served by another caller's fetch
+        self.coalesced = 0
+
+    async def get_chance_of_rain(self, city):
+        return await self._fetch("rain", city, self.fetcher.get_chance_of_rain)
+
+    async def get_city_temperature_info(self, city):
+        return await self._fetch("temperature", city, self.fetcher.get_city_temperature_info)
+
+    async def get_current_temperature(self, city):
+        return await self._fetch("temperature", city, self.fetcher.get_current_temperature)
+
+    async def _fetch(self, kind, city, fetch):
+        key = self.index.key(city)
+        if key is None:
+            return await fetch(city)
+        key = (kind, key)
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch(city))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # Shielded, so one cancelled caller does not cancel the fetch for the others
+        return await asyncio.shield(task)
@@ -0,0 +1,190 @@
+import math
+import threading
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; grids fall back to lists
+    np = None
+
+HOURS_PER_DAY = 24
+
+# How a grid fills the hours between time slots:
+#   nearest  the closest slot's value, first slot on ties, no wraparound (WeatherProcessor's default)
+#   step     the value of the latest slot at or before the time; before the first slot, the last slot's
+#   linear   straight lines between neighbouring slots, from the last slot to the first slot of the next day
+METHODS = ("nearest", "step", "linear")
+
+
+class ForecastGrid:
+    """
+    Rain probabilities over a whole day at a fixed resolution, interpolated
+    between the forecast time slots.
+
+    Every grid point is (left slot, right slot, weight), computed once here,
+    so a curve is one vectorized blend of two columns of the probabilities.
+    Curves are cached per probabilities row in a bounded LRU: cities with the
+    same forecast share one curve, and changed data gets a new one.
+    Curves are read-only numpy arrays (lists without numpy). A grid may be
+    shared across threads.
+    """
+
+    def __init__(self, time_slots, method="linear", steps_per_hour=1, cache_size=1024):
+        if method not in METHODS:
+            raise ValueError(f"Unknown interpolation method {method!r}; expected one of {', '.join(METHODS)}")
+        if isinstance(steps_per_hour, bool) or not isinstance(steps_per_hour, int) or steps_per_hour < 1:
+            raise ValueError("steps_per_hour must be a positive integer")
+        if not isinstance(cache_size, int) or cache_size < 1:
+            raise ValueError("cache_size must be a positive integer")
+        slots = list(time_slots)
+        if not slots or any(not 0 <= slot < HOURS_PER_DAY for slot in slots):
+            raise ValueError("Time slots must be hours between 0 and 24")
+        if any(a >= b for a, b in zip(slots, slots[1:])):
+            raise ValueError("Time slots must be in ascending order")
+
+        self.time_slots = tuple(slots)
+        self.method = method
+        self.steps_per_hour = steps_per_hour
+        self.points = HOURS_PER_DAY * steps_per_hour
+        self.cache_size = cache_size
+        self._left, self._right, self._weight = _plan(self.time_slots, method, steps_per_hour)
+        if np is not None:
+            self._left = np.array(self._left, dtype=np.intp)
+            self._right = np.array(self._right, dtype=np.intp)
+            self._weight = np.array(self._weight)
+        # Probabilities tuple -> curve; most recently used last
+        self._curves = OrderedDict()
+        self._lock = threading.Lock()
+
+    def times(self):
+        """Returns the hour of every grid point: 0, 1/steps_per_hour, ..., 24 - 1/steps_per_hour."""
+        times = [i / self.steps_per_hour for i in range(self.points)]
+        return np.array(times) if np is not None else times
+
+    def curve(self, probabilities):
+        """Returns the day's curve for one city's slot probabilities."""
+        key = tuple(probabilities)
+        with self._lock:
+            curve = self._curves.get(key)
+            if curve is not None:
+                self._curves.move_to_end(key)
+                return curve
+        curve = self._build([key])[0]
+        with self._lock:
+            self._remember(key, curve)
+        return curve
+
+    def curves(self, rows):
+        """
+        Returns the curves for many rows of slot probabilities as a
+        len(rows) x points array (a list of lists without numpy).
+        Rows missing from the cache are built together in one pass; a batch
+        may hold more distinct rows than the cache keeps.
+        """
+        keys = [tuple(row) for row in rows]
+        # The curves for this call, independent of what the cache evicts meanwhile
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key not in found:
+                    curve = self._curves.get(key)
+                    if curve is not None:
+                        self._curves.move_to_end(key)
+                        found[key] = curve
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+        if missing:
+            built = self._build(missing)
+            found.update(zip(missing, built))
+            with self._lock:
+                for key, curve in zip(missing, built):
+                    self._remember(key, curve)
+        curves = [found[key] for key in keys]
+        if np is None:
+            return [list(curve) for curve in curves]
+        if not curves:
+            return np.empty((0, self.points))
+        return np.stack(curves)
+
+    def values(self, rows, row_of, hours):
+        """
+        Returns rows[row_of[i]] at hours[i] for every i, as a float array (a
+        list without numpy). Points are blended straight from the rows, with
+        no curve built or cached, so memory grows with the points asked for
+        rather than with rows x grid points. Values equal the curves'.
+        """
+        left, right, weight = self._left, self._right, self._weight
+        if np is None:
+            indexes = [self.index(hour) for hour in hours]
+            return [rows[row][left[i]] * (1 - weight[i]) + rows[row][right[i]] * weight[i]
+                    for row, i in zip(row_of, indexes)]
+        indexes = self.index(hours)
+        matrix = np.array(rows, dtype=float).reshape(len(rows), len(self.time_slots))
+        row_of = np.asarray(row_of, dtype=np.intp)
+        weight = weight[indexes]
+        return matrix[row_of, left[indexes]] * (1 - weight) + matrix[row_of, right[indexes]] * weight
+
+    def value(self, probabilities, hour):
+        """Returns the probability at one hour (rounded to the grid resolution) as a float."""
+        return float(self.curve(probabilities)[self.index(hour)])
+
+    def index(self, hours):
+        """
+        Maps hours in [0, 24) to grid point indexes, rounding to the nearest
+        point; a time that rounds up to 24:00 wraps to 0:00.
+        Accepts a number or, with numpy, an array.
+        """
+        if np is not None and not isinstance(hours, (int, float, str)) and hours is not None:
+            hours = np.asarray(hours, dtype=float)
+            if not np.all((hours >= 0) & (hours < HOURS_PER_DAY)):
+                raise ValueError(f"Hours must be between 0 and {HOURS_PER_DAY}")
+            return np.floor(hours * self.steps_per_hour + 0.5).astype(np.intp) % self.points
+        if isinstance(hours, bool) or not isinstance(hours, (int, float)) or not 0 <= hours < HOURS_PER_DAY:
+            raise ValueError(f"Hours must be between 0 and {HOURS_PER_DAY}")
+        return math.floor(hours * self.steps_per_hour + 0.5) % self.points
+
+    def _build(self, keys):
+        left, right, weight = self._left, self._right, self._weight
+        if np is None:
+            return [
+                tuple(row[l] * (1 - w) + row[r] * w for l, r, w in zip(left, right, weight))
+                for row in keys
+            ]
+        matrix = np.array(keys, dtype=float)
+        grid = matrix[:, left] * (1 - weight) + matrix[:, right] * weight
+        grid.flags.writeable = False
+        return list(grid)
+
+    def _remember(self, key, curve):
+        """Caches a curve, evicting the least recently used. Holds the lock."""
+        self._curves[key] = curve
+        self._curves.move_to_end(key)
+        if len(self._curves) > self.cache_size:
+            self._curves.popitem(last=False)
+
+
+def _plan(slots, method, steps_per_hour):
+    """Returns (left, right, weight) lists: each grid point is left * (1 - weight) + right * weight."""
+    count = len(slots)
+    left, right, weight = [], [], []
+    for point in range(HOURS_PER_DAY * steps_per_hour):
+        time = point / steps_per_hour
+        if method == "nearest":
+            nearest = min(range(count), key=lambda i: abs(slots[i] - time))
+            left.append(nearest)
+            right.append(nearest)
+            weight.append(0.0)
+            continue
+        # Latest slot at or before the time, wrapping to the previous day's last slot
+        before = max((i for i in range(count) if slots[i] <= time), default=count - 1)
+        after = (before + 1) % count
+        if method == "step" or count == 1:
+            left.append(before)
+            right.append(before)
+            weight.append(0.0)
+            continue
+        start = slots[before] if slots[before] <= time else slots[before] - HOURS_PER_DAY
+        end = slots[after] if slots[after] > start else slots[after] + HOURS_PER_DAY
+        left.append(before)
+        right.append(after)
+        weight.append((time - start) / (end - start))
+    return left, right, weight
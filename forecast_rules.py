@@ -0,0 +1,172 @@
+import math
+from bisect import bisect_right
+from string import Formatter
+
+_CONVERSIONS = {"s": str, "r": repr, "a": ascii}
+
+# Template fields and every kind of value they take, used to check templates when compiling them
+_SAMPLES = {"city": ("",), "time": (0,), "percent": (0.0, 0), "temp": (0, 0.0)}
+_RAIN_FIELDS = ("city", "time", "percent")
+_TEMPERATURE_FIELDS = ("city", "temp")
+
+
+class ForecastRules:
+    """
+    Declarative forecast rules, validated and compiled once.
+
+    rain_levels and temperature_levels are ascending tables of
+    (operator, threshold, value) rows. The first row has operator None and
+    covers everything below the next threshold; each later row starts a band
+    with ">=" (the threshold belongs to the band) or ">" (it does not).
+    Rain values are level labels substituted for {level} in rain_template;
+    temperature values are message templates, and temperature_bands names
+    the temperature levels in structured results ("band0", "band1", ... by default).
+
+    Template fields:
+      rain_template             {level}, {city}, {time}, {percent}
+      temperature templates     {city}, {temp}
+      temperature_unavailable   {city}
+
+    Each band compiles to one threshold for bisect_right (">" thresholds are
+    nudged to the next float up) and one template function with the label
+    baked in. Invalid tables and templates raise ValueError or TypeError here,
+    never per request.
+    Use a separate instance per region and pass it to WeatherProcessor(rules=...).
+    Instances pickle as their definition and are recompiled when loaded.
+    """
+
+    def __init__(self, rain_levels, temperature_levels,
+                 rain_template="There's a {level} chance of rain in {city} around {time}:00 "
+                               "({percent:.0f}% probability).",
+                 temperature_unavailable="Temperature data for {city} not available.",
+                 temperature_bands=None):
+        rain_levels = [tuple(level) for level in rain_levels]
+        temperature_levels = [tuple(level) for level in temperature_levels]
+        rain_thresholds, labels = _compile_levels(rain_levels, "rain_levels")
+        for label in labels:
+            if not isinstance(label, str):
+                raise TypeError("Rain level labels must be strings")
+        temperature_thresholds, templates = _compile_levels(temperature_levels, "temperature_levels")
+        if temperature_bands is None:
+            temperature_bands = [f"band{i}" for i in range(len(templates))]
+        temperature_bands = tuple(temperature_bands)
+        if len(temperature_bands) != len(templates):
+            raise ValueError("temperature_bands must name every temperature level")
+        if not all(isinstance(band, str) for band in temperature_bands):
+            raise TypeError("Temperature band names must be strings")
+
+        self.rain_labels = tuple(labels)
+        self._rain_thresholds = rain_thresholds
+        self._rain_templates = tuple(
+            _compile_template(rain_template, "rain_template", _RAIN_FIELDS, level=label) for label in labels
+        )
+        self.temperature_bands = temperature_bands
+        self._temperature_thresholds = temperature_thresholds
+        self._temperature_templates = tuple(
+            _compile_template(template, "temperature template", _TEMPERATURE_FIELDS) for template in templates
+        )
+        self._temperature_unavailable = _compile_template(temperature_unavailable, "temperature_unavailable", ("city",))
+        # Compiled functions cannot be pickled; rebuild from the definition instead
+        self._definition = (rain_levels, temperature_levels, rain_template, temperature_unavailable, temperature_bands)
+
+    def __reduce__(self):
+        return ForecastRules, self._definition
+
+    def rain_level(self, probability):
+        """Returns the label of the band the probability falls in."""
+        return self.rain_labels[bisect_right(self._rain_thresholds, probability)]
+
+    def format_rain(self, city, closest_time, probability):
+        """Returns the rain forecast message for a slot's probability."""
+        template = self._rain_templates[bisect_right(self._rain_thresholds, probability)]
+        return template(city, closest_time, probability * 100)
+
+    def temperature_band(self, temp):
+        """Returns the name of the band the temperature falls in."""
+        return self.temperature_bands[bisect_right(self._temperature_thresholds, temp)]
+
+    def format_temperature(self, city, temp):
+        """Returns the temperature message, or the unavailable message when temp is None."""
+        if temp is None:
+            return self._temperature_unavailable(city)
+        return self._temperature_templates[bisect_right(self._temperature_thresholds, temp)](city, temp)
+
+
+def _compile_levels(levels, name):
+    """Validates a level table and returns (bisect thresholds, values)."""
+    levels = [tuple(level) for level in levels]
+    if not levels:
+        raise ValueError(f"{name} cannot be empty")
+    if any(len(level) != 3 for level in levels):
+        raise ValueError(f"{name} rows must be (operator, threshold, value)")
+    if levels[0][:2] != (None, None):
+        raise ValueError(f"The first row of {name} must have no operator or threshold")
+
+    thresholds = []
+    for operator, threshold, _ in levels[1:]:
+        if operator not in (">=", ">"):
+            raise ValueError(f"Invalid operator in {name}: {operator!r}")
+        if isinstance(threshold, bool) or not isinstance(threshold, (int, float)):
+            raise TypeError(f"Thresholds in {name} must be numbers")
+        if not math.isfinite(threshold):
+            raise ValueError(f"Thresholds in {name} must be finite")
+        # x > t is x >= the next float after t, so every band can use bisect_right
+        bound = math.nextafter(threshold, math.inf) if operator == ">" else threshold
+        if thresholds and bound <= thresholds[-1]:
+            raise ValueError(f"Thresholds in {name} must be in ascending order")
+        thresholds.append(bound)
+    return tuple(thresholds), [value for _, _, value in levels]
+
+
+def _compile_template(template, name, fields, **baked):
+    """
+    Compiles a str.format-style template into a function of the given fields,
+    called positionally, with the baked values formatted in ahead of time.
+    The template is rewritten with positional fields, so the function is the
+    bound str.format of the result and no field is looked up by name per call.
+    Every field is checked with each kind of value it can take, so a template
+    that is accepted here formats every request.
+    """
+    if not isinstance(template, str):
+        raise TypeError(f"{name} must be a string")
+    try:
+        parsed = list(Formatter().parse(template))
+    except ValueError as error:
+        raise ValueError(f"Invalid {name} {template!r}: {error}") from None
+
+    parts = []
+    for literal, field, spec, conversion in parsed:
+        parts.append(_escape(literal))
+        if field is None:
+            continue
+        if field not in fields and field not in baked:
+            raise ValueError(f"Invalid {name} {template!r}: unknown field {{{field}}}")
+        if conversion is not None and conversion not in _CONVERSIONS:
+            raise ValueError(f"Invalid {name} {template!r}: unknown conversion !{conversion}")
+        if "{" in spec or "}" in spec:
+            raise ValueError(f"Invalid {name} {template!r}: nested fields are not supported")
+        if field in baked:
+            value = baked[field]
+            if conversion:
+                value = _CONVERSIONS[conversion](value)
+            try:
+                parts.append(_escape(format(value, spec)))
+            except (ValueError, TypeError) as error:
+                raise ValueError(f"Invalid {name} {template!r}: {error}") from None
+        else:
+            parts.append("{" + str(fields.index(field)) + (f"!{conversion}" if conversion else "")
+                         + (f":{spec}" if spec else "") + "}")
+
+    function = "".join(parts).format
+    defaults = [_SAMPLES[field][0] for field in fields]
+    for position, field in enumerate(fields):
+        for sample in _SAMPLES[field]:
+            try:
+                function(*defaults[:position], sample, *defaults[position + 1:])
+            except (ValueError, TypeError) as error:
+                raise ValueError(f"Invalid {name} {template!r}: {error}") from None
+    return function
+
+
+def _escape(text):
+    return text.replace("{", "{{").replace("}", "}}")
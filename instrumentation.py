@@ -0,0 +1,158 @@
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+# Histogram upper bounds in seconds, from 1µs to 1s
+DEFAULT_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+                   1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; the last bucket counts everything above the bounds."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def cumulative(self):
+        """Returns [(upper bound, observations <= bound)], ending with (inf, count)."""
+        total = 0
+        out = []
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            out.append((bound, total))
+        return out
+
+
+class Metrics:
+    """
+    Call counts, error counts by exception type and per-stage latency
+    histograms for WeatherProcessor. Attach with processor.enable_metrics();
+    one Metrics can be shared by several processors and threads.
+
+    hook: optional profiling callback receiving (method, stages, total seconds, errors)
+    after every recorded call, where stages is a list of (stage, seconds).
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, hook=None):
+        self.buckets = tuple(buckets)
+        self.hook = hook
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._calls = {}
+            self._errors = {}
+            self._histograms = {}
+
+    def record(self, method, stages, total, errors=()):
+        """Records one call: its stage timings, total time and any exceptions it produced."""
+        with self._lock:
+            self._calls[method] = self._calls.get(method, 0) + 1
+            for error in errors:
+                key = (method, type(error).__name__)
+                self._errors[key] = self._errors.get(key, 0) + 1
+            for stage, seconds in stages:
+                self._histogram(method, stage).observe(seconds)
+            self._histogram(method, "total").observe(total)
+        if self.hook is not None:
+            self.hook(method, stages, total, errors)
+
+    def _histogram(self, method, stage):
+        histogram = self._histograms.get((method, stage))
+        if histogram is None:
+            histogram = self._histograms[(method, stage)] = Histogram(self.buckets)
+        return histogram
+
+    # ========== EXPORT ==========
+
+    def snapshot(self):
+        """
+        Returns a plain dict:
+        {"calls": {method: n}, "errors": {method: {type: n}},
+         "stages": {method: {stage: {"count", "sum", "buckets": {bound: cumulative count}}}}}
+        """
+        with self._lock:
+            errors = {}
+            for (method, error_type), count in self._errors.items():
+                errors.setdefault(method, {})[error_type] = count
+            stages = {}
+            for (method, stage), histogram in self._histograms.items():
+                stages.setdefault(method, {})[stage] = {
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "buckets": dict(histogram.cumulative()),
+                }
+            return {"calls": dict(self._calls), "errors": errors, "stages": stages}
+
+    def to_prometheus(self, prefix="weather_processor"):
+        """Returns the metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_calls_total Calls to each public method.",
+            f"# TYPE {prefix}_calls_total counter",
+        ]
+        for method, count in sorted(snapshot["calls"].items()):
+            lines.append(f'{prefix}_calls_total{{method="{method}"}} {count}')
+
+        lines += [
+            f"# HELP {prefix}_errors_total Exceptions raised or returned, by type.",
+            f"# TYPE {prefix}_errors_total counter",
+        ]
+        for method, errors in sorted(snapshot["errors"].items()):
+            for error_type, count in sorted(errors.items()):
+                lines.append(f'{prefix}_errors_total{{method="{method}",type="{error_type}"}} {count}')
+
+        lines += [
+            f"# HELP {prefix}_stage_seconds Time spent in each stage of a call.",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        for method, stages in sorted(snapshot["stages"].items()):
+            for stage, histogram in sorted(stages.items()):
+                labels = f'method="{method}",stage="{stage}"'
+                for bound, count in histogram["buckets"].items():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{prefix}_stage_seconds_bucket{{{labels},le="{le}"}} {count}')
+                lines.append(f"{prefix}_stage_seconds_sum{{{labels}}} {histogram['sum']!r}")
+                lines.append(f"{prefix}_stage_seconds_count{{{labels}}} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+
+class StageTimer:
+    """Collects (stage, seconds) laps for one call."""
+
+    __slots__ = ("stages", "start", "last")
+
+    def __init__(self):
+        self.stages = []
+        self.start = self.last = perf_counter()
+
+    def lap(self, stage):
+        now = perf_counter()
+        self.stages.append((stage, now - self.last))
+        self.last = now
+
+    def total(self):
+        return perf_counter() - self.start
+
+
+class NullTimer:
+    """StageTimer stand-in for uninstrumented calls: laps cost one no-op call and are dropped."""
+
+    __slots__ = ()
+
+    def lap(self, stage):
+        pass
+
+
+NULL_TIMER = NullTimer()
@@ -15,7 +15,8 @@
 # Example improved code:
 MIN_LENGTH = 8
 SPECIAL_CHARS = "@#_!-?$%&()[]{}"
-def is_strong_password(pwd):
+BREACHED_MESSAGE = "Password appears in a list of breached passwords"
+def is_strong_password(pwd, breach_filter=None):
     """
     Returns a list of password rule violations. If the list is empty, the password is strong.
      - At least MIN_LENGTH characters
@@ -23,6 +24,7 @@ def is_strong_password(pwd):
      - Contains at least one lowercase letter
      - Contains at least one digit
      - Contains at least one special character from SPECIAL_CHARS
+     - With a breach_filter (see breach_filter.py), not in the breached-password list
     """
     errors = []
     if len(pwd) < MIN_LENGTH:
@@ -35,4 +37,83 @@ def is_strong_password(pwd):
         errors.append("Password does not contain a digit")
     if not any(c in SPECIAL_CHARS for c in pwd):
         errors.append(f"Password does not contain a special character. You need to use at least one of the following characters: {SPECIAL_CHARS}")
+    if breach_filter is not None and pwd in breach_filter:
+        errors.append(BREACHED_MESSAGE)
     return errors
+
+
+# ========== BULK CHECKING ==========
+# check_passwords returns the same violation lists as is_strong_password,
+# classifying every character once instead of scanning the password per rule.
+
+SPECIAL_CHARS_SET = frozenset(SPECIAL_CHARS)
+
+TOO_SHORT_MESSAGE = f"Password is too short. You need at least {MIN_LENGTH} characters"
+NO_UPPERCASE_MESSAGE = "Password does not contain an uppercase letter"
+NO_LOWERCASE_MESSAGE = "Password does not contain a lowercase letter"
+NO_DIGIT_MESSAGE = "Password does not contain a digit"
+NO_SPECIAL_MESSAGE = f"Password does not contain a special character. You need to use at least one of the following characters: {SPECIAL_CHARS}"
+
+_UPPER, _LOWER, _DIGIT, _SPECIAL = 1, 2, 4, 8
+_ALL_CLASSES = _UPPER | _LOWER | _DIGIT | _SPECIAL
+
+
+def _char_classes(c):
+    """Character class bits, using the same tests as is_strong_password."""
+    return ((_UPPER if c.isupper() else 0)
+            | (_LOWER if c.islower() else 0)
+            | (_DIGIT if c.isdigit() else 0)
+            | (_SPECIAL if c in SPECIAL_CHARS_SET else 0))
+
+
+# Precomputed for ASCII; other characters are classified on the fly
+_ASCII_CLASSES = {chr(i): _char_classes(chr(i)) for i in range(128)}
+
+
+def _check_password(pwd, breach_filter=None):
+    seen = 0
+    classes = _ASCII_CLASSES
+    for c in pwd:
+        bits = classes.get(c)
+        seen |= _char_classes(c) if bits is None else bits
+        if seen == _ALL_CLASSES:
+            break
+    if seen == _ALL_CLASSES and len(pwd) >= MIN_LENGTH:
+        if breach_filter is not None and pwd in breach_filter:
+            return [BREACHED_MESSAGE]
+        return []
+
+    errors = []
+    if len(pwd) < MIN_LENGTH:
+        errors.append(TOO_SHORT_MESSAGE)
+    if not seen & _UPPER:
+        errors.append(NO_UPPERCASE_MESSAGE)
+    if not seen & _LOWER:
+        errors.append(NO_LOWERCASE_MESSAGE)
+    if not seen & _DIGIT:
+        errors.append(NO_DIGIT_MESSAGE)
+    if not seen & _SPECIAL:
+        errors.append(NO_SPECIAL_MESSAGE)
+    if breach_filter is not None and pwd in breach_filter:
+        errors.append(BREACHED_MESSAGE)
+    return errors
+
+
+def check_passwords(passwords, processes=None, chunksize=1000, breach_filter=None):
+    """
+    Checks many passwords, yielding one violation list per password in input order.
+    Results are streamed, so the input can be a generator of any size.
+    With processes set, the work is spread over a multiprocessing pool of that size;
+    a breach_filter must then be one opened from a file, which workers map themselves.
+    """
+    if not processes:
+        for pwd in passwords:
+            yield _check_password(pwd, breach_filter)
+        return
+
+    from functools import partial
+    from multiprocessing import Pool
+
+    check = partial(_check_password, breach_filter=breach_filter) if breach_filter is not None else _check_password
+    with Pool(processes) as pool:
+        yield from pool.imap(check, passwords, chunksize)
@@ -0,0 +1,314 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from city_index import city_index_of, normalize_city
+from snapshot_fetcher import SnapshotFetcher, _check_data
+from weather_fetcher import WeatherFetcher
+
+
+class Freshness:
+    """How current one city's data is, as reported by RefreshingFetcher.freshness()."""
+
+    __slots__ = ("city", "age", "stale", "refreshing", "accesses", "error")
+
+    def __init__(self, city, age, stale, refreshing, accesses, error):
+        self.city = city
+        # Seconds since the last successful refresh
+        self.age = age
+        self.stale = stale
+        self.refreshing = refreshing
+        # Lookups since the last successful refresh
+        self.accesses = accesses
+        # Message of the last failed refresh, None once a refresh succeeds
+        self.error = error
+
+    def __repr__(self):
+        return (f"Freshness(city={self.city!r}, age={self.age:.1f}, stale={self.stale}, "
+                f"refreshing={self.refreshing}, accesses={self.accesses}, error={self.error!r})")
+
+
+class RefreshingFetcher:
+    """
+    Serves city weather from memory and keeps it current in the background
+    (stale-while-revalidate).
+
+    Each city is refreshed from the source every `interval` seconds by a
+    scheduler thread. Lookups never wait for a refresh: a stale city keeps
+    being served while its refresh is in flight, and a failed refresh keeps
+    the previous data and is retried after `retry_interval`. When more
+    cities are due than fit in one batch, the ones looked up most since
+    their last refresh go first.
+    Only a city's very first lookup fetches from the source on the request
+    path, and concurrent first lookups wait for that one fetch; warm()
+    loads known cities ahead of time. A city the source fails to load is
+    remembered as missing for `miss_ttl` seconds, doubling with every
+    further failure up to `interval`, and lookups of it fail from memory
+    until then.
+
+    Data lives in a SnapshotFetcher, so lookups are lock-free across threads.
+    """
+
+    # Cities remembered as missing; the oldest are forgotten beyond this
+    MAX_MISSING = 10000
+
+    def __init__(self, source, interval=60.0, retry_interval=None, batch_size=100, workers=4,
+                 miss_ttl=None, clock=time.monotonic):
+        """miss_ttl: first wait before loading a missing city again; retry_interval by default."""
+        self.source = source
+        # Cities are tracked under the source's keys, so its spellings and aliases share one entry
+        self.index = city_index_of(source)
+        self.interval = interval
+        # Wait before retrying a city whose refresh failed
+        self.retry_interval = interval if retry_interval is None else retry_interval
+        self.batch_size = batch_size
+        self.miss_ttl = self.retry_interval if miss_ttl is None else miss_ttl
+        self._clock = clock
+        self._data = SnapshotFetcher()
+        self._fetched_at = {}
+        self._due_at = {}
+        self._accesses = {}
+        self._errors = {}
+        # Key of a city that never loaded -> (time to try again, failed loads in a row)
+        self._missing = {}
+        # Key -> Event set once the key's refresh in flight finishes
+        self._refreshing = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self.workers = workers
+        # Started on first use and shut down by stop()
+        self._executor = None
+        # Successful and failed city refreshes
+        self.refreshes = 0
+        self.failures = 0
+
+    # ========== LOOKUPS ==========
+
+    def get_chance_of_rain(self, city):
+        return self._data.get_chance_of_rain(self._touch(city))
+
+    def get_city_temperature_info(self, city):
+        return self._data.get_city_temperature_info(self._touch(city))
+
+    def get_current_temperature(self, city):
+        return self._data.get_current_temperature(self._touch(city))
+
+    def _touch(self, city):
+        """
+        Counts a lookup and loads the city if this is its first one.
+        Returns the city's key, or city itself if it is invalid.
+        """
+        key = self.index.key(city)
+        # Invalid input is the data's to reject
+        if key is None:
+            return city
+        if key in self._fetched_at:
+            self._accesses[key] = self._accesses.get(key, 0) + 1
+        elif key in self._missing and self._clock() < self._missing[key][0]:
+            # Known to be missing; the data raises without asking the source again
+            pass
+        else:
+            # Joins a load already in flight rather than missing the city
+            self._refresh([key], wait=True)
+        return key
+
+    # ========== FRESHNESS ==========
+
+    def freshness(self, city):
+        """Returns a Freshness for the city, or None if it was never loaded."""
+        key = self.index.key(city)
+        fetched_at = self._fetched_at.get(key)
+        if fetched_at is None:
+            return None
+        age = self._clock() - fetched_at
+        return Freshness(key, age, age >= self.interval, key in self._refreshing,
+                         self._accesses.get(key, 0), self._errors.get(key))
+
+    def freshness_report(self):
+        """Returns a Freshness for every loaded city, oldest data first."""
+        report = [self.freshness(key) for key in list(self._fetched_at)]
+        return sorted(report, key=lambda freshness: freshness.age, reverse=True)
+
+    # ========== REFRESHING ==========
+
+    def warm(self, cities):
+        """Loads cities from the source now, so their first lookups are served from memory."""
+        keys = [self.index.key(city) for city in cities]
+        self._refresh([key for key in keys if key is not None])
+
+    def refresh_due(self):
+        """
+        Refreshes up to batch_size due cities, most looked-up first.
+        The scheduler thread calls this; it can also be driven by hand.
+        Returns the number of cities it tried to refresh.
+        """
+        now = self._clock()
+        with self._lock:
+            due = [key for key, due_at in self._due_at.items()
+                   if now >= due_at and key not in self._refreshing]
+        due.sort(key=lambda key: self._accesses.get(key, 0), reverse=True)
+        return self._refresh(due[:self.batch_size])
+
+    def start(self):
+        """Starts the scheduler thread."""
+        if self._thread is not None:
+            raise RuntimeError("Refresh scheduler already running")
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="weather-refresh", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops the scheduler thread after its current batch and the refresh worker threads."""
+        if self._thread is not None:
+            self._stopping.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.clear()
+            if self.refresh_due() >= self.batch_size:
+                # More cities may be due; keep going
+                continue
+            self._wake.wait(self._seconds_until_due())
+
+    def _seconds_until_due(self):
+        with self._lock:
+            next_due = min(self._due_at.values(), default=None)
+        if next_due is None:
+            return self.interval
+        return max(0.0, next_due - self._clock())
+
+    def _refresh(self, keys, wait=False):
+        """
+        Refreshes the keys no other thread is refreshing; with wait=True, then
+        also waits for the others' refreshes to finish. Returns the number of
+        keys refreshed here.
+        """
+        with self._lock:
+            in_flight = [self._refreshing[key] for key in keys if key in self._refreshing] if wait else []
+            keys = [key for key in dict.fromkeys(keys) if key not in self._refreshing]
+            for key in keys:
+                self._refreshing[key] = threading.Event()
+        try:
+            if self.workers > 1 and len(keys) > 1:
+                rows = list(self._pool().map(self._fetch, keys))
+            else:
+                rows = [self._fetch(key) for key in keys]
+            self._apply(rows)
+        finally:
+            with self._lock:
+                for key in keys:
+                    self._refreshing.pop(key).set()
+        for done in in_flight:
+            done.wait()
+        return len(keys)
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def _fetch(self, key):
+        """Fetches one city; returns (key, temperatures, rain, error) ready for SnapshotFetcher.update()."""
+        temperatures, rain, errors = {}, {}, []
+        try:
+            temperatures[key] = self.source.get_current_temperature(key)
+        except Exception as error:
+            errors.append(str(error))
+        try:
+            rain[key] = self.source.get_chance_of_rain(key)
+        except Exception as error:
+            errors.append(str(error))
+        try:
+            temperatures, rain = _check_data(temperatures, rain)
+        except (ValueError, TypeError) as error:
+            return key, {}, {}, str(error)
+        if not temperatures and not rain:
+            return key, {}, {}, "; ".join(errors)
+        # A missing half keeps whatever was served before
+        return key, temperatures, rain, None
+
+    def _apply(self, rows):
+        temperatures, rain, refreshed = {}, {}, []
+        now = self._clock()
+        with self._lock:
+            for key, city_temperatures, city_rain, error in rows:
+                if error is not None:
+                    self.failures += 1
+                    # Known cities keep their data; ones that never loaded back off
+                    if key in self._fetched_at:
+                        self._errors[key] = error
+                        self._due_at[key] = now + self.retry_interval
+                    else:
+                        self._remember_missing(key, now)
+                    continue
+                temperatures.update(city_temperatures)
+                rain.update(city_rain)
+                refreshed.append(key)
+            # Publish the data before the bookkeeping that tells lookups the city is loaded
+            if refreshed:
+                self._data.update(temperatures, rain)
+            for key in refreshed:
+                self._missing.pop(key, None)
+                self._fetched_at[key] = now
+                self._due_at[key] = now + self.interval
+                self._accesses[key] = 0
+                self._errors.pop(key, None)
+            self.refreshes += len(refreshed)
+
+    def _remember_missing(self, key, now):
+        """Backs off loading a city that never loaded. Holds the lock."""
+        _, failures = self._missing.pop(key, (None, 0))
+        wait = min(self.miss_ttl * 2 ** min(failures, 32), max(self.interval, self.miss_ttl))
+        self._missing[key] = (now + wait, failures + 1)
+        while len(self._missing) > self.MAX_MISSING:
+            del self._missing[next(iter(self._missing))]
+
+
+class LocalWeatherSource(WeatherFetcher):
+    """
+    In-process stand-in for a remote weather source, for development and tests.
+    Lookups sleep for `latency` seconds and are counted in `fetches`; set_city()
+    changes what later lookups return.
+    """
+
+    def __init__(self, latency=0.0, store=None):
+        super().__init__(store)
+        self.latency = latency
+        self.fetches = 0
+
+    def set_city(self, city, temperature=None, probabilities=None):
+        key = normalize_city(city)
+        if temperature is not None:
+            self.temperatures[key] = temperature
+        if probabilities is not None:
+            self.rain_probabilities[key] = probabilities
+
+    def get_chance_of_rain(self, city):
+        self._wait()
+        return super().get_chance_of_rain(city)
+
+    def get_city_temperature_info(self, city):
+        self._wait()
+        return super().get_city_temperature_info(city)
+
+    def _wait(self):
+        self.fetches += 1
+        if self.latency:
+            time.sleep(self.latency)
@@ -0,0 +1,301 @@
+import multiprocessing
+import os
+import threading
+import zlib
+
+from city_index import CityIndex, normalize_city
+from weather_fetcher import WeatherFetcher
+from weather_processor import WeatherProcessor
+
+# Raw city inputs whose shard is remembered; the memo is cleared when it fills up
+_MEMO_SIZE = 4096
+
+# Methods a shard worker will run
+_METHODS = frozenset({
+    "get_rain_forecast", "get_rain_result", "get_rain_forecasts", "get_rain_results",
+    "get_city_temperature_info", "get_temperature_result",
+})
+
+
+def shard_of(key, shards):
+    """
+    Returns the shard for a normalize_city() key. Uses CRC-32 rather than
+    hash(), which is salted differently in every process.
+    """
+    return zlib.crc32(key.encode("utf-8", "surrogatepass")) % shards
+
+
+class ShardedWeatherProcessor:
+    """
+    WeatherProcessor spread over worker processes, one shard of the cities each.
+
+    Cities are partitioned by shard_of(normalized name). Each worker runs a
+    WeatherProcessor over only its shard's data, and this front end routes
+    every call to the worker owning the city over a pipe. A batch is split
+    by shard, sent to all its shards before waiting on any, and reassembled
+    in input order, so the shards work on it in parallel.
+
+    Results and exceptions are the same as WeatherProcessor's over the full
+    fetcher. The data is copied into the workers at startup; later changes
+    to the fetcher are not seen. Workers start with "forkserver" where the
+    platform has it and "spawn" elsewhere, so each holds only its own shard
+    in memory. A forked worker would inherit the whole of this process,
+    fetcher included.
+
+    Calls are safe from several threads: each shard serves one request at a
+    time, and calls for different shards run concurrently.
+    """
+
+    def __init__(self, fetcher, workers=None, rules=None, start_method=None):
+        """
+        fetcher: WeatherFetcher whose dicts (and store, if any) are partitioned.
+        workers: number of shard processes; os.cpu_count() by default.
+        start_method: multiprocessing start method; "forkserver" where available, else "spawn".
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if not isinstance(workers, int) or workers < 1:
+            raise ValueError("workers must be a positive integer")
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self.workers = workers
+        self.start_method = start_method
+        index = getattr(fetcher, "index", None)
+        aliases = index.aliases if index is not None else {}
+        self._index = CityIndex(aliases)
+        self._shard_memo = {}
+
+        parts = _partition(fetcher, workers)
+        # Cities held by each shard
+        self.shard_sizes = [len(temperatures.keys() | rain.keys()) for temperatures, rain in parts]
+
+        context = multiprocessing.get_context(start_method)
+        self._connections = []
+        self._locks = []
+        self._processes = []
+        try:
+            for shard, (temperatures, rain) in enumerate(parts):
+                connection, child_connection = context.Pipe()
+                process = context.Process(
+                    target=_serve_shard, args=(child_connection, temperatures, rain, aliases, rules),
+                    name=f"weather-shard-{shard}", daemon=True,
+                )
+                process.start()
+                child_connection.close()
+                self._connections.append(connection)
+                self._locks.append(threading.Lock())
+                self._processes.append(process)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        """Stops the workers."""
+        for connection, lock in zip(self._connections, self._locks):
+            with lock:
+                try:
+                    connection.send(None)
+                except (OSError, ValueError):
+                    pass
+                connection.close()
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self._connections = []
+        self._locks = []
+        self._processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ========== PUBLIC API METHODS ==========
+    # Same signatures and results as WeatherProcessor
+
+    def get_rain_forecast(self, city, hour):
+        return self._call(city, "get_rain_forecast", (city, hour))
+
+    def get_rain_result(self, city, hour):
+        return self._call(city, "get_rain_result", (city, hour))
+
+    def get_city_temperature_info(self, city):
+        return self._call(city, "get_city_temperature_info", (city,))
+
+    def get_temperature_result(self, city):
+        return self._call(city, "get_temperature_result", (city,))
+
+    def get_rain_forecasts(self, queries):
+        """
+        Gets rain forecasts for many (city, hour) queries, each shard answering
+        its cities in parallel. Returns a list in input order holding each
+        forecast message or the exception that query raised.
+        """
+        return self._rain_batch(queries, "get_rain_forecasts")
+
+    def get_rain_results(self, queries):
+        """Like get_rain_forecasts, but successful queries yield RainForecast results."""
+        return self._rain_batch(queries, "get_rain_results")
+
+    def get_city_temperature_infos(self, cities):
+        """
+        Gets temperature messages for many cities, each shard answering its
+        cities in parallel. Returns a list in input order holding each message
+        or the exception that city raised.
+        """
+        return self._temperature_batch(cities, "get_city_temperature_info")
+
+    def get_temperature_results(self, cities):
+        """Like get_city_temperature_infos, but successful cities yield TemperatureInfo results."""
+        return self._temperature_batch(cities, "get_temperature_result")
+
+    # ========== ROUTING ==========
+
+    def _shard(self, city):
+        try:
+            return self._shard_memo[city]
+        except (KeyError, TypeError):
+            pass
+        key = self._index.key(city)
+        # Invalid cities go to shard 0, which raises the usual error for them
+        shard = 0 if key is None else shard_of(key, self.workers)
+        if key is not None:
+            memo = self._shard_memo
+            if len(memo) >= _MEMO_SIZE:
+                memo.clear()
+            memo[city] = shard
+        return shard
+
+    def _call(self, city, method, args):
+        shard = self._shard(city)
+        result = self._exchange({shard: (method, [args])})[shard][0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _rain_batch(self, queries, method):
+        queries = list(queries)
+        groups = {}
+        for i, query in enumerate(queries):
+            try:
+                city, _ = query
+            except (TypeError, ValueError):
+                # Shard 0 reports the malformed query for this item
+                city = None
+            groups.setdefault(self._shard(city), []).append(i)
+        # One call per shard: the worker's processor groups its queries by city
+        replies = self._exchange({
+            shard: (method, [([queries[i] for i in indexes],)]) for shard, indexes in groups.items()
+        })
+        results = [None] * len(queries)
+        for shard, indexes in groups.items():
+            shard_results = replies[shard][0]
+            if isinstance(shard_results, Exception):
+                raise shard_results
+            for i, result in zip(indexes, shard_results):
+                results[i] = result
+        return results
+
+    def _temperature_batch(self, cities, method):
+        cities = list(cities)
+        groups = {}
+        for i, city in enumerate(cities):
+            groups.setdefault(self._shard(city), []).append(i)
+        replies = self._exchange({
+            shard: (method, [(cities[i],) for i in indexes]) for shard, indexes in groups.items()
+        })
+        results = [None] * len(cities)
+        for shard, indexes in groups.items():
+            for i, result in zip(indexes, replies[shard]):
+                results[i] = result
+        return results
+
+    def _exchange(self, requests):
+        """
+        Sends {shard: (method, [args, ...])} and returns {shard: [result or exception, ...]}.
+        Every request is sent before any reply is read, so the shards work in parallel.
+        """
+        if not self._connections:
+            raise ValueError("ShardedWeatherProcessor is closed")
+        # Lock in shard order so concurrent batches cannot deadlock
+        shards = sorted(requests)
+        for shard in shards:
+            self._locks[shard].acquire()
+        try:
+            sent = []
+            error = None
+            for shard in shards:
+                try:
+                    self._connections[shard].send(requests[shard])
+                except Exception as send_error:
+                    error = send_error
+                    break
+                sent.append(shard)
+            # Collect every reply that is owed, even after a failed send, to keep the pipes in step
+            replies = {}
+            for shard in sent:
+                try:
+                    replies[shard] = self._connections[shard].recv()
+                except EOFError:
+                    error = RuntimeError(f"Weather shard {shard} exited")
+            if error is not None:
+                raise error
+            return replies
+        finally:
+            for shard in shards:
+                self._locks[shard].release()
+
+
+def _partition(fetcher, shards):
+    """Splits a fetcher's data into [(temperatures, rain_probabilities)] per shard."""
+    parts = [({}, {}) for _ in range(shards)]
+    store = getattr(fetcher, "store", None)
+    if store is not None and hasattr(store, "cities"):
+        for key in store.cities():
+            temperatures, rain = parts[shard_of(key, shards)]
+            temperature = store.get_temperature(key)
+            if temperature is not None:
+                temperatures[key] = temperature
+            probabilities = store.get_rain(key)
+            if probabilities is not None:
+                rain[key] = probabilities
+    for city, temperature in fetcher.temperatures.items():
+        key = normalize_city(city)
+        if key is not None:
+            parts[shard_of(key, shards)][0][key] = temperature
+    for city, probabilities in fetcher.rain_probabilities.items():
+        key = normalize_city(city)
+        if key is not None:
+            parts[shard_of(key, shards)][1][key] = probabilities
+    return parts
+
+
+def _serve_shard(connection, temperatures, rain_probabilities, aliases, rules):
+    """Worker loop: answers (method, [args, ...]) requests until it receives None or the pipe closes."""
+    fetcher = WeatherFetcher(aliases=aliases)
+    fetcher.temperatures = temperatures
+    fetcher.rain_probabilities = rain_probabilities
+    processor = WeatherProcessor(fetcher, rules)
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        method, calls = request
+        if method not in _METHODS:
+            connection.send([ValueError(f"Unknown method {method!r}")] * len(calls))
+            continue
+        function = getattr(processor, method)
+        results = []
+        for args in calls:
+            try:
+                results.append(function(*args))
+            except Exception as error:
+                results.append(error)
+        connection.send(results)
+    connection.close()
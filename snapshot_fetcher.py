@@ -0,0 +1,156 @@
+import threading
+from types import MappingProxyType
+
+from city_index import CityIndex, normalize_city
+from weather_processor import ValidatedRainProbabilities, validate_rain_probabilities
+from weather_store import SLOTS
+
+
+class WeatherView:
+    """
+    An immutable view of all city data, with the WeatherFetcher lookup methods.
+    Rain probabilities are kept as tuples and handed out as fresh lists,
+    so nothing a reader does can change the view other readers see.
+    Safe to share between threads without locks.
+    """
+
+    __slots__ = ("temperatures", "rain_probabilities", "version", "_index")
+
+    def __init__(self, temperatures, rain_probabilities, version, index=None):
+        # Keys are normalized and values validated by SnapshotFetcher before this
+        self.temperatures = MappingProxyType(temperatures)
+        self.rain_probabilities = MappingProxyType(rain_probabilities)
+        self.version = version
+        # Resolves lookups like WeatherFetcher's, aliases included; shared by a fetcher's views
+        self._index = CityIndex() if index is None else index
+
+    def __repr__(self):
+        return f"WeatherView(version={self.version}, cities={len(self.temperatures.keys() | self.rain_probabilities.keys())})"
+
+    def get_chance_of_rain(self, city):
+        key = self._index.key(city)
+        if key is None:
+            raise Exception("Invalid city")
+        probabilities = self.rain_probabilities.get(key)
+        if probabilities is None:
+            raise Exception("Unknown city")
+        return ValidatedRainProbabilities(probabilities)
+
+    def get_city_temperature_info(self, city):
+        key = self._index.key(city)
+        if key is None:
+            raise Exception("Invalid city")
+        temperature = self.temperatures.get(key)
+        if temperature is None:
+            raise Exception("City not found")
+        return temperature
+
+    def get_current_temperature(self, city):
+        # Name used by WeatherProcessor
+        return self.get_city_temperature_info(city)
+
+
+class SnapshotFetcher:
+    """
+    Copy-on-write fetcher for processors shared between threads.
+
+    Readers look up cities in the current WeatherView without taking a lock.
+    publish() and update() build a complete new view off to the side and swap
+    it in with a single reference assignment, so a reader sees either the old
+    data or the new data for every city, never a mix.
+    Writers are serialized with a lock that readers never touch.
+
+    Lookups on the fetcher read whichever view is current at that moment.
+    To read several values from the same data, take snapshot() once and
+    use the returned view (WeatherProcessor.get_rain_forecasts does this).
+    """
+
+    def __init__(self, temperatures=None, rain_probabilities=None, aliases=None):
+        """aliases: optional {alias: city} table, as for WeatherFetcher."""
+        self._write_lock = threading.Lock()
+        self.index = CityIndex(aliases)
+        self._view = WeatherView(*_check_data(temperatures or {}, rain_probabilities or {}), version=0,
+                                 index=self.index)
+
+    @classmethod
+    def from_fetcher(cls, fetcher):
+        """Builds a SnapshotFetcher from the dicts and aliases of a WeatherFetcher."""
+        index = getattr(fetcher, "index", None)
+        return cls(fetcher.temperatures, fetcher.rain_probabilities,
+                   aliases=index.aliases if index is not None else None)
+
+    def add_alias(self, alias, city):
+        """Makes lookups of alias return city's data, in the current view and later ones."""
+        self.index.add_alias(alias, city)
+
+    def snapshot(self):
+        """Returns the current WeatherView."""
+        return self._view
+
+    @property
+    def version(self):
+        """Incremented by every publish() or update()."""
+        return self._view.version
+
+    def publish(self, temperatures, rain_probabilities):
+        """
+        Replaces all city data. The data is validated first; on error
+        the current view stays in place. Returns the new view.
+        """
+        temperatures, rain_probabilities = _check_data(temperatures, rain_probabilities)
+        with self._write_lock:
+            self._view = WeatherView(temperatures, rain_probabilities, self._view.version + 1, self.index)
+            return self._view
+
+    def update(self, temperatures=None, rain_probabilities=None, remove=()):
+        """
+        Changes some cities and keeps the rest: the given values replace the
+        current ones and cities in remove are dropped. Returns the new view.
+        """
+        changed_temperatures, changed_rain = _check_data(temperatures or {}, rain_probabilities or {})
+        removed = {normalize_city(city) for city in remove}
+        with self._write_lock:
+            current = self._view
+            new_temperatures = {k: v for k, v in current.temperatures.items() if k not in removed}
+            new_rain = {k: v for k, v in current.rain_probabilities.items() if k not in removed}
+            new_temperatures.update(changed_temperatures)
+            new_rain.update(changed_rain)
+            self._view = WeatherView(new_temperatures, new_rain, current.version + 1, self.index)
+            return self._view
+
+    def get_chance_of_rain(self, city):
+        return self._view.get_chance_of_rain(city)
+
+    def get_city_temperature_info(self, city):
+        return self._view.get_city_temperature_info(city)
+
+    def get_current_temperature(self, city):
+        return self._view.get_current_temperature(city)
+
+
+def _check_data(temperatures, rain_probabilities):
+    """Validates city data and returns private copies keyed by normalize_city()."""
+    checked_temperatures = {}
+    for city, temperature in temperatures.items():
+        key = _key(city)
+        if temperature is None:
+            continue
+        if isinstance(temperature, bool) or not isinstance(temperature, (int, float)):
+            raise TypeError(f"Temperature for {city} must be a number")
+        checked_temperatures[key] = temperature
+
+    checked_rain = {}
+    for city, probabilities in rain_probabilities.items():
+        key = _key(city)
+        if isinstance(probabilities, tuple):
+            probabilities = list(probabilities)
+        validate_rain_probabilities(probabilities, SLOTS)
+        checked_rain[key] = tuple(probabilities)
+    return checked_temperatures, checked_rain
+
+
+def _key(city):
+    key = normalize_city(city)
+    if key is None:
+        raise ValueError("Invalid city")
+    return key
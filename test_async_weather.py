@@ -0,0 +1,122 @@
+import asyncio
+import unittest
+
+from async_weather import AsyncWeatherFetcher, AsyncWeatherProcessor, gather_limited
+from weather_fetcher import WeatherFetcher
+from weather_processor import WeatherProcessor
+
+
+class SlowFetcher:
+    """Async fetcher that records how many lookups overlap."""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+
+    async def get_chance_of_rain(self, city):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay if city != "Slowtown" else 1)
+        finally:
+            self.in_flight -= 1
+        return [0.1, 0.2, 0.15, 0.25, 0.05, 0.12, 0.33, 0.85]
+
+
+class TestAsyncWeatherProcessor(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.sync_processor = WeatherProcessor(WeatherFetcher())
+        self.processor = AsyncWeatherProcessor(AsyncWeatherFetcher(WeatherFetcher()))
+
+    async def test_rain_forecast_matches_sync_processor(self):
+        for hour in (0, 6, 18, 23):
+            self.assertEqual(
+                await self.processor.get_rain_forecast("London", hour),
+                self.sync_processor.get_rain_forecast("London", hour),
+            )
+
+    async def test_temperature_info_matches_sync_processor(self):
+        for city in ("London", "Oslo"):
+            self.assertEqual(
+                await self.processor.get_city_temperature_info(city),
+                self.sync_processor.get_city_temperature_info(city),
+            )
+
+    async def test_structured_results_match_sync_processor(self):
+        self.assertEqual(await self.processor.get_rain_result("London", 7),
+                         self.sync_processor.get_rain_result("London", 7))
+        self.assertEqual(await self.processor.get_temperature_result("Oslo"),
+                         self.sync_processor.get_temperature_result("Oslo"))
+        queries = [("London", 6), ("Atlantis", 3)]
+        results = await self.processor.get_rain_results(queries)
+        self.assertEqual(results[0], self.sync_processor.get_rain_results(queries)[0])
+        self.assertIsInstance(results[1], Exception)
+
+    async def test_shared_validation(self):
+        with self.assertRaises(TypeError):
+            await self.processor.get_rain_forecast(123, 6)
+        with self.assertRaises(ValueError):
+            await self.processor.get_rain_forecast("London", 24)
+        with self.assertRaises(Exception):
+            await self.processor.get_rain_forecast("Atlantis", 6)
+
+    async def test_offloaded_fetcher(self):
+        processor = AsyncWeatherProcessor(AsyncWeatherFetcher(WeatherFetcher(), offload=True))
+        self.assertIn("20°C", await processor.get_city_temperature_info("London"))
+
+    async def test_rain_forecasts_match_sync_batch(self):
+        queries = [("London", 6), ("Atlantis", 3), ("LONDON", 21), ("London", -1)]
+        results = await self.processor.get_rain_forecasts(queries)
+        expected = self.sync_processor.get_rain_forecasts(queries)
+        self.assertEqual(results[0], expected[0])
+        self.assertEqual(results[2], expected[2])
+        self.assertIsInstance(results[1], Exception)
+        self.assertIsInstance(results[3], ValueError)
+
+    async def test_rain_forecasts_respect_concurrency_limit(self):
+        fetcher = SlowFetcher()
+        processor = AsyncWeatherProcessor(fetcher)
+        queries = [(f"City{i}", 21) for i in range(10)] + [("City0", 3)]
+        results = await processor.get_rain_forecasts(queries, concurrency=3)
+        self.assertEqual(fetcher.calls, 10)
+        self.assertEqual(fetcher.max_in_flight, 3)
+        self.assertIn("high chance of rain in City9", results[9])
+
+    async def test_rain_forecasts_timeout_is_reported_per_city(self):
+        processor = AsyncWeatherProcessor(SlowFetcher())
+        results = await processor.get_rain_forecasts([("Slowtown", 6), ("Quicktown", 6)], timeout=0.1)
+        self.assertIsInstance(results[0], asyncio.TimeoutError)
+        self.assertIn("Quicktown", results[1])
+
+    async def test_temperature_infos(self):
+        results = await self.processor.get_city_temperature_infos(["Oslo", "Atlantis", "London"])
+        self.assertIn("freezing", results[0])
+        self.assertIsInstance(results[1], Exception)
+        self.assertIn("20°C", results[2])
+
+    async def test_metrics_record_async_calls(self):
+        metrics = self.processor.enable_metrics()
+        await self.processor.get_rain_forecast("London", 6)
+        await self.processor.get_temperature_result("Oslo")
+        with self.assertRaises(Exception):
+            await self.processor.get_city_temperature_info("Atlantis")
+        await self.processor.get_rain_results([("London", 6), ("London", 24)])
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["calls"], {"get_rain_forecast": 1, "get_temperature_result": 1,
+                                             "get_city_temperature_info": 1, "get_rain_results": 1})
+        self.assertEqual(snapshot["errors"], {"get_city_temperature_info": {"Exception": 1},
+                                              "get_rain_results": {"ValueError": 1}})
+        self.assertEqual(set(snapshot["stages"]["get_rain_forecast"]),
+                         {"validate_city", "validate_hour", "fetch", "validate_probabilities", "slot_lookup",
+                          "categorize", "format", "total"})
+
+    async def test_gather_limited_rejects_bad_concurrency(self):
+        with self.assertRaises(ValueError):
+            await gather_limited(asyncio.sleep, [0], concurrency=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
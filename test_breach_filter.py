@@ -0,0 +1,98 @@
+import os
+import pickle
+import random
+import string
+import tempfile
+import unittest
+
+from breach_filter import (BreachFilter, build_breach_filter, build_breach_filter_file, filter_size,
+                           open_breach_filter)
+from password import BREACHED_MESSAGE, check_passwords, is_strong_password
+
+BREACHED = ["123456", "password", "P@ssw0rd", "Summer2024!", "Tr0ub4dor&3", "Ωmega_2024"]
+
+
+def random_words(count, length, seed):
+    rng = random.Random(seed)
+    return ["".join(rng.choices(string.ascii_letters + string.digits, k=length)) for _ in range(count)]
+
+
+class TestBreachFilter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        words = random_words(20_000, 10, seed=1)
+        others = random_words(200_000, 11, seed=2)
+        # About 2000 and 200 expected false positives: the margin covers sampling noise, not a model error
+        for target in (0.01, 0.001):
+            breach_filter = build_breach_filter(words, len(words), false_positive_rate=target)
+            self.assertTrue(all(word in breach_filter for word in words))
+            rate = sum(other in breach_filter for other in others) / len(others)
+            self.assertLess(rate, target * 1.2)
+
+    def test_add_writes_after_the_offset(self):
+        empty = BreachFilter.empty(10)
+        shifted = BreachFilter(bytearray(64) + empty._buffer, empty.blocks, empty.hashes, 0, 0.001, offset=64)
+        shifted.add("hunter2")
+        self.assertIn("hunter2", shifted)
+        self.assertEqual(bytes(shifted._buffer[:64]), bytes(64))
+
+    def test_size_follows_false_positive_rate(self):
+        loose, strict = filter_size(100_000, 0.01), filter_size(100_000, 0.0001)
+        self.assertLess(loose[0], strict[0])
+        self.assertLess(loose[1], strict[1])
+        for capacity, rate in ((0, 0.01), (10, 0), (10, 1)):
+            with self.assertRaises(ValueError):
+                filter_size(capacity, rate)
+
+    def test_file_round_trip_with_mmap(self):
+        source = self.path("breached.txt")
+        with open(source, "w", encoding="utf-8", newline="") as f:
+            f.write("\r\n".join(BREACHED) + "\n\n")
+        self.assertEqual(build_breach_filter_file(source, self.path("breached.bloom")), len(BREACHED))
+
+        with open_breach_filter(self.path("breached.bloom")) as breach_filter:
+            self.assertEqual((len(breach_filter), breach_filter.false_positive_rate), (len(BREACHED), 0.001))
+            self.assertTrue(all(password in breach_filter for password in BREACHED))
+            self.assertNotIn("password ", breach_filter)
+            copy = pickle.loads(pickle.dumps(breach_filter))
+            self.assertIn("Ωmega_2024", copy)
+            copy.close()
+
+    def test_rejects_bad_files(self):
+        build_breach_filter(BREACHED, 10).save(self.path("good.bloom"))
+        with open(self.path("good.bloom"), "rb") as f:
+            data = f.read()
+        for name, content in (("short", b"PWBLOOM"), ("magic", b"X" + data[1:]), ("truncated", data[:-1])):
+            with open(self.path(name), "wb") as f:
+                f.write(content)
+            with self.assertRaises(ValueError):
+                open_breach_filter(self.path(name))
+        with self.assertRaises(TypeError):
+            pickle.dumps(BreachFilter.empty(10))
+
+    def test_password_checks_report_breaches(self):
+        build_breach_filter(BREACHED, 100).save(self.path("breached.bloom"))
+        breach_filter = open_breach_filter(self.path("breached.bloom"))
+        self.addCleanup(breach_filter.close)
+
+        self.assertEqual(is_strong_password("Tr0ub4dor&3", breach_filter=breach_filter), [BREACHED_MESSAGE])
+        self.assertEqual(is_strong_password("Tr0ub4dor&3x", breach_filter=breach_filter), [])
+        errors = is_strong_password("password", breach_filter=breach_filter)
+        self.assertEqual(errors[-1], BREACHED_MESSAGE)
+        self.assertEqual(errors[:-1], is_strong_password("password"))
+
+        corpus = BREACHED + ["Tr0ub4dor&3x", "short"]
+        expected = [is_strong_password(p, breach_filter=breach_filter) for p in corpus]
+        self.assertEqual(list(check_passwords(corpus, breach_filter=breach_filter)), expected)
+        self.assertEqual(list(check_passwords(corpus * 5, processes=2, chunksize=3, breach_filter=breach_filter)),
+                         expected * 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
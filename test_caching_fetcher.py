@@ -0,0 +1,132 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from caching_fetcher import CachingFetcher
+from weather_fetcher import WeatherFetcher
+from weather_processor import WeatherProcessor
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCachingFetcher(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.inner = MagicMock(wraps=WeatherFetcher())
+        self.fetcher = CachingFetcher(self.inner, max_entries=2, ttl=10, clock=self.clock)
+
+    def test_repeated_lookups_hit_cache(self):
+        first = self.fetcher.get_chance_of_rain("London")
+        second = self.fetcher.get_chance_of_rain("LONDON")
+        self.assertEqual(first, second)
+        self.assertEqual(self.inner.get_chance_of_rain.call_count, 1)
+        self.assertEqual((self.fetcher.hits, self.fetcher.misses), (1, 1))
+
+    def test_rain_and_temperature_are_cached_separately(self):
+        self.fetcher.get_chance_of_rain("London")
+        self.assertEqual(self.fetcher.get_city_temperature_info("London"), 20)
+        self.assertEqual(self.fetcher.misses, 2)
+
+    def test_entries_expire_after_ttl(self):
+        self.fetcher.get_city_temperature_info("Oslo")
+        self.clock.now = 9.9
+        self.fetcher.get_city_temperature_info("Oslo")
+        self.clock.now = 10
+        self.fetcher.get_city_temperature_info("Oslo")
+        self.assertEqual(self.inner.get_city_temperature_info.call_count, 2)
+        self.assertEqual(self.fetcher.stats(), {"hits": 1, "misses": 2, "evictions": 0, "size": 1})
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.fetcher.get_city_temperature_info("Oslo")
+        self.fetcher.get_city_temperature_info("London")
+        self.fetcher.get_city_temperature_info("Oslo")  # London is now the oldest
+        self.fetcher.get_chance_of_rain("London")
+        self.assertEqual(self.fetcher.evictions, 1)
+        self.fetcher.get_city_temperature_info("Oslo")
+        self.assertEqual(self.inner.get_city_temperature_info.call_count, 2)
+
+    def test_unknown_city_is_not_cached_by_default(self):
+        for _ in range(2):
+            with self.assertRaises(Exception):
+                self.fetcher.get_chance_of_rain("Atlantis")
+        self.assertEqual(self.inner.get_chance_of_rain.call_count, 2)
+
+    def test_negative_caching_of_unknown_city(self):
+        fetcher = CachingFetcher(self.inner, ttl=10, negative_ttl=5, clock=self.clock)
+        for _ in range(3):
+            with self.assertRaisesRegex(Exception, "Unknown city"):
+                fetcher.get_chance_of_rain("Atlantis")
+        self.assertEqual(self.inner.get_chance_of_rain.call_count, 1)
+        self.clock.now = 5
+        with self.assertRaises(Exception):
+            fetcher.get_chance_of_rain("Atlantis")
+        self.assertEqual(self.inner.get_chance_of_rain.call_count, 2)
+
+    def test_invalid_city_is_passed_through(self):
+        with self.assertRaises(Exception):
+            self.fetcher.get_chance_of_rain("  ")
+        self.assertEqual(self.fetcher.stats()["size"], 0)
+
+    def test_spellings_and_aliases_share_one_entry(self):
+        inner = WeatherFetcher(aliases={"Londres": "London"})
+        inner.temperatures["São Paulo"] = 25
+        fetcher = CachingFetcher(inner, clock=self.clock)
+        for city in ("São Paulo", "sao  paulo", " SAO PAULO", "London", "londres", "LONDON "):
+            fetcher.get_city_temperature_info(city)
+        self.assertEqual((fetcher.hits, fetcher.misses), (4, 2))
+        fetcher.invalidate("Londres")
+        self.assertEqual(fetcher.stats()["size"], 1)
+
+    def test_invalidate(self):
+        self.fetcher.get_chance_of_rain("London")
+        self.fetcher.invalidate("London")
+        self.fetcher.get_chance_of_rain("London")
+        self.assertEqual(self.inner.get_chance_of_rain.call_count, 2)
+
+    def test_invalid_configuration(self):
+        with self.assertRaises(ValueError):
+            CachingFetcher(self.inner, max_entries=0)
+        with self.assertRaises(ValueError):
+            CachingFetcher(self.inner, ttl=0)
+
+    def test_shared_across_threads(self):
+        inner = WeatherFetcher()
+        for i in range(8):
+            inner.temperatures[f"city{i}"] = i
+        # A tiny cache with an instant TTL, so threads keep expiring and evicting the same keys
+        fetcher = CachingFetcher(inner, max_entries=3, ttl=1e-6)
+        errors = []
+
+        def work(offset):
+            try:
+                for i in range(2000):
+                    self.assertEqual(fetcher.get_current_temperature(f"city{(offset + i) % 8}"), (offset + i) % 8)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        stats = fetcher.stats()
+        self.assertEqual(stats["hits"] + stats["misses"], 8 * 2000)
+        self.assertLessEqual(stats["size"], 3)
+
+    def test_works_behind_weather_processor(self):
+        processor = WeatherProcessor(self.fetcher)
+        self.assertIn("20°C", processor.get_city_temperature_info("London"))
+        processor.get_rain_forecast("London", 6)
+        processor.get_rain_forecast("London", 9)
+        self.assertEqual(self.inner.get_chance_of_rain.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
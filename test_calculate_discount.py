@@ -1,5 +1,8 @@
+import math
 import unittest
-from calculate_discount import calculate_discount
+
+import calculate_discount as discount_module
+from calculate_discount import calculate_discount, calculate_discounts
 
 class TestCalculateDiscount(unittest.TestCase):
     def test_regular_discount(self):
@@ -23,5 +26,48 @@ class TestCalculateDiscount(unittest.TestCase):
             calculate_discount(100, "guest")
 
 
+class TestCalculateDiscounts(unittest.TestCase):
+    PRICES = [100, 200, 400, 0, 19.99, 1e9 + 0.01, 7]
+    USER_TYPES = ["regular", "premium", "vip", "regular", "vip", "premium", "guest"]
+
+    def check(self):
+        discounted, invalid = calculate_discounts(self.PRICES, self.USER_TYPES)
+        self.assertEqual(invalid, [6])
+        for i in range(6):
+            self.assertEqual(float(discounted[i]), calculate_discount(self.PRICES[i], self.USER_TYPES[i]))
+        self.assertTrue(math.isnan(discounted[6]))
+
+    def test_matches_scalar_function_bit_for_bit(self):
+        self.check()
+
+    def test_without_numpy(self):
+        numpy = discount_module.np
+        discount_module.np = None
+        try:
+            self.check()
+        finally:
+            discount_module.np = numpy
+
+    def test_mixed_invalid_types(self):
+        discounted, invalid = calculate_discounts([10, 10, 10], [None, "vip", 3])
+        self.assertEqual(invalid, [0, 2])
+        self.assertEqual(float(discounted[1]), calculate_discount(10, "vip"))
+
+    def test_length_mismatch(self):
+        with self.assertRaises(ValueError):
+            calculate_discounts([1, 2], ["vip"])
+
+    @unittest.skipIf(discount_module.np is None, "numpy not installed")
+    def test_numpy_arrays(self):
+        np = discount_module.np
+        prices = np.linspace(0, 1000, 10_001)
+        user_types = np.array(["regular", "premium", "vip", "staff"] * 2500 + ["vip"])
+        discounted, invalid = calculate_discounts(prices, user_types)
+        self.assertEqual(discounted.dtype, np.float64)
+        self.assertEqual(len(invalid), 2500)
+        for i in (0, 1, 2, 5001, 10_000):
+            self.assertEqual(discounted[i], calculate_discount(float(prices[i]), str(user_types[i])))
+
+
 if __name__ == '__main__':
     unittest.main()
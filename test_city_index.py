@@ -0,0 +1,88 @@
+import pickle
+import unittest
+
+from city_index import CityDict, CityIndex, normalize_city
+
+
+class TestNormalizeCity(unittest.TestCase):
+    def test_case_accents_and_whitespace_fold_to_one_key(self):
+        for name in ("São Paulo", "sao paulo", "SAO  PAULO", " São Paulo "):
+            self.assertEqual(normalize_city(name), "sao paulo")
+
+    def test_casefold_and_compatibility_forms(self):
+        self.assertEqual(normalize_city("Straße"), "strasse")
+        self.assertEqual(normalize_city("Ｋöln"), "koln")
+        self.assertEqual(normalize_city("Москва"), "москва")
+
+    def test_keys_are_interned(self):
+        self.assertIs(normalize_city("Lon" + "don!"), normalize_city("LONDON!"))
+
+    def test_invalid_input_returns_none(self):
+        for value in ("", "   ", None, 42, ["london"]):
+            self.assertIsNone(normalize_city(value))
+
+
+class TestCityIndex(unittest.TestCase):
+    def test_aliases_resolve_to_the_canonical_key(self):
+        index = CityIndex({"NYC": "New York", "Big Apple": "new york"})
+        self.assertEqual(index.key("nyc"), "new york")
+        self.assertEqual(index.key("big  apple"), "new york")
+        self.assertEqual(index.key("Boston"), "boston")
+
+    def test_alias_chains_are_flattened(self):
+        index = CityIndex()
+        index.add_alias("Bombay", "Mumbai")
+        index.add_alias("Mumbai", "Mumbai City")
+        self.assertEqual(index.key("Bombay"), "mumbai city")
+        self.assertEqual(index.aliases, {"bombay": "mumbai city", "mumbai": "mumbai city"})
+
+    def test_new_alias_replaces_memoized_key(self):
+        index = CityIndex()
+        self.assertEqual(index.key("LA"), "la")
+        index.add_alias("LA", "Los Angeles")
+        self.assertEqual(index.key("LA"), "los angeles")
+
+    def test_invalid_aliases(self):
+        index = CityIndex()
+        with self.assertRaises(ValueError):
+            index.add_alias("", "Oslo")
+        with self.assertRaises(ValueError):
+            index.add_alias("Oslo", "OSLO")
+
+    def test_invalid_input_returns_none(self):
+        index = CityIndex()
+        for value in ("", " ", None, 7, ["oslo"]):
+            self.assertIsNone(index.key(value))
+
+    def test_memo_is_bounded(self):
+        index = CityIndex(memo_size=10)
+        for i in range(100):
+            self.assertEqual(index.key(f"City{i}"), f"city{i}")
+        self.assertLessEqual(len(index._memo), 10)
+
+
+class TestCityDict(unittest.TestCase):
+    def test_keys_are_normalized_on_write_and_read(self):
+        cities = CityDict({"Zürich": 4}, Oslo=-5)
+        cities["new  york"] = 12
+        cities.update([("SÃO PAULO", 25)])
+        self.assertEqual(dict(cities), {"zurich": 4, "oslo": -5, "new york": 12, "sao paulo": 25})
+        self.assertEqual((cities["zürich"], cities.get("NEW YORK"), cities.get(None, 0)), (4, 12, 0))
+        self.assertEqual(cities.setdefault("OSLO", 0), -5)
+        self.assertEqual(cities.pop("São Paulo"), 25)
+        del cities["Oslo"]
+        self.assertNotIn("oslo", cities)
+        self.assertEqual(pickle.loads(pickle.dumps(cities)), cities)
+        self.assertIsInstance(cities.copy(), CityDict)
+
+    def test_invalid_keys(self):
+        cities = CityDict()
+        for key in ("", None, 7):
+            with self.assertRaises(ValueError):
+                cities[key] = 1
+            with self.assertRaises(KeyError):
+                cities[key]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from coalescing_fetcher import AsyncCoalescingFetcher, CoalescingFetcher
+from weather_processor import WeatherProcessor
+
+
+class BlockingFetcher:
+    """Fetcher whose lookups block until released."""
+
+    def __init__(self, error=None):
+        self.release = threading.Event()
+        self.calls = 0
+        self.error = error
+
+    def get_chance_of_rain(self, city):
+        self.calls += 1
+        self.release.wait(5)
+        if isinstance(self.error, Exception):
+            raise self.error
+        if self.error:
+            raise Exception(self.error)
+        return [0.1, 0.2, 0.15, 0.25, 0.05, 0.12, 0.33, 0.85]
+
+
+class UpstreamError(Exception):
+    def __init__(self, *, status):
+        super().__init__(f"Upstream returned {status}")
+        self.status = status
+
+
+class TestCoalescingFetcher(unittest.TestCase):
+    def run_threads(self, fetcher, cities):
+        results = [None] * len(cities)
+
+        def worker(i, city):
+            try:
+                results[i] = fetcher.get_chance_of_rain(city)
+            except Exception as error:
+                results[i] = error
+
+        threads = [threading.Thread(target=worker, args=(i, c)) for i, c in enumerate(cities)]
+        for thread in threads:
+            thread.start()
+        return threads, results
+
+    def wait_for_waiters(self, fetcher, count):
+        for _ in range(500):
+            if fetcher.coalesced == count:
+                return
+            time.sleep(0.01)
+
+    def test_concurrent_lookups_share_one_fetch(self):
+        inner = BlockingFetcher()
+        fetcher = CoalescingFetcher(inner)
+        threads, results = self.run_threads(fetcher, ["London", "LONDON", "london", "London"])
+        self.wait_for_waiters(fetcher, 3)
+        inner.release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(inner.calls, 1)
+        self.assertEqual(fetcher.coalesced, 3)
+        self.assertTrue(all(r == results[0] for r in results))
+
+    def test_errors_reach_every_waiter(self):
+        inner = BlockingFetcher(error="Unknown city")
+        fetcher = CoalescingFetcher(inner)
+        threads, results = self.run_threads(fetcher, ["Atlantis"] * 3)
+        self.wait_for_waiters(fetcher, 2)
+        inner.release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(inner.calls, 1)
+        for result in results:
+            self.assertEqual(str(result), "Unknown city")
+
+    def test_waiters_get_the_leaders_exception(self):
+        try:
+            try:
+                raise TimeoutError("read timed out")
+            except TimeoutError as cause:
+                raise UpstreamError(status=503) from cause
+        except UpstreamError as error:
+            leader_error = error
+        inner = BlockingFetcher(error=leader_error)
+        fetcher = CoalescingFetcher(inner)
+        threads, results = self.run_threads(fetcher, ["Atlantis"] * 3)
+        self.wait_for_waiters(fetcher, 2)
+        inner.release.set()
+        for thread in threads:
+            thread.join()
+        for result in results:
+            self.assertIs(result, leader_error)
+            self.assertEqual(result.status, 503)
+            self.assertIsInstance(result.__cause__, TimeoutError)
+
+    def test_sequential_lookups_fetch_again(self):
+        inner = BlockingFetcher()
+        inner.release.set()
+        fetcher = CoalescingFetcher(inner)
+        processor = WeatherProcessor(fetcher)
+        processor.get_rain_forecast("London", 3)
+        processor.get_rain_forecast("London", 6)
+        self.assertEqual(inner.calls, 2)
+        self.assertEqual(fetcher.coalesced, 0)
+
+
+class SlowAsyncFetcher:
+    def __init__(self):
+        self.calls = 0
+
+    async def get_chance_of_rain(self, city):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if city == "Atlantis":
+            raise Exception("Unknown city")
+        return [0.1] * 8
+
+
+class TestAsyncCoalescingFetcher(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_tasks_share_one_fetch(self):
+        inner = SlowAsyncFetcher()
+        fetcher = AsyncCoalescingFetcher(inner)
+        results = await asyncio.gather(*(fetcher.get_chance_of_rain(c) for c in ["Paris", "PARIS", "Paris", "Rome"]))
+        self.assertEqual(inner.calls, 2)
+        self.assertEqual(fetcher.coalesced, 2)
+        self.assertEqual(results[0], [0.1] * 8)
+        await fetcher.get_chance_of_rain("Paris")
+        self.assertEqual(inner.calls, 3)
+
+    async def test_errors_reach_every_task(self):
+        fetcher = AsyncCoalescingFetcher(SlowAsyncFetcher())
+        results = await asyncio.gather(*(fetcher.get_chance_of_rain("Atlantis") for _ in range(3)), return_exceptions=True)
+        self.assertTrue(all(str(r) == "Unknown city" for r in results))
+        self.assertEqual(fetcher.coalesced, 2)
+
+    async def test_cancelled_caller_does_not_cancel_shared_fetch(self):
+        inner = SlowAsyncFetcher()
+        fetcher = AsyncCoalescingFetcher(inner)
+        first = asyncio.ensure_future(fetcher.get_chance_of_rain("Oslo"))
+        second = asyncio.ensure_future(fetcher.get_chance_of_rain("Oslo"))
+        await asyncio.sleep(0)
+        first.cancel()
+        self.assertEqual(await second, [0.1] * 8)
+        self.assertEqual(inner.calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import threading
+import unittest
+
+import forecast_grid
+from forecast_grid import ForecastGrid
+
+SLOTS = [0, 3, 6, 9, 12, 15, 18, 21]
+PROBABILITIES = [0.1, 0.4, 0.7, 1.0, 0.5, 0.2, 0.0, 0.3]
+
+
+class TestForecastGrid(unittest.TestCase):
+    def check(self):
+        linear = ForecastGrid(SLOTS, "linear")
+        curve = [float(p) for p in linear.curve(PROBABILITIES)]
+        self.assertEqual(len(curve), 24)
+        # The slots themselves are exact
+        self.assertEqual(curve[::3], PROBABILITIES)
+        self.assertAlmostEqual(curve[4], 0.5)
+        self.assertAlmostEqual(curve[14], 0.3)
+        # Wraparound: 21h (0.3) to the next day's 0h (0.1)
+        self.assertAlmostEqual(curve[22], 0.3 - 0.2 / 3)
+        self.assertAlmostEqual(curve[23], 0.3 - 0.4 / 3)
+
+        step = [float(p) for p in ForecastGrid(SLOTS, "step").curve(PROBABILITIES)]
+        self.assertEqual(step, [p for p in PROBABILITIES for _ in range(3)])
+
+        nearest = [float(p) for p in ForecastGrid(SLOTS, "nearest").curve(PROBABILITIES)]
+        # Ties go to the earlier slot and 23h stays on 21h, like WeatherProcessor
+        self.assertEqual(nearest[1:3], [0.1, 0.4])
+        self.assertEqual(nearest[23], 0.3)
+
+        minutes = ForecastGrid(SLOTS, "linear", steps_per_hour=60)
+        self.assertAlmostEqual(minutes.value(PROBABILITIES, 1.5), 0.25)
+        self.assertAlmostEqual(minutes.value(PROBABILITIES, 22.5), 0.2)
+        self.assertEqual(minutes.index(23.999), 0)
+        self.assertEqual(float(minutes.times()[90]), 1.5)
+
+        rows = [PROBABILITIES, [0.5] * 8, PROBABILITIES]
+        fresh = ForecastGrid(SLOTS, "linear", steps_per_hour=60)
+        hours = [0, 1.5, 22.5, 23.999, 7.25]
+        points = [float(p) for p in fresh.values(rows, [0, 1, 2, 0, 2], hours)]
+        self.assertEqual(points, [float(minutes.value(rows[row], hour)) for row, hour in zip([0, 1, 2, 0, 2], hours)])
+        self.assertEqual(len(fresh._curves), 0)
+        self.assertEqual(list(fresh.values([], [], [])), [])
+
+        curves = linear.curves(rows)
+        self.assertEqual([len(row) for row in curves], [24, 24, 24])
+        self.assertEqual([float(p) for p in curves[0]], curve)
+        self.assertEqual([float(p) for p in curves[1]], [0.5] * 24)
+
+    def test_grids(self):
+        self.check()
+
+    def test_without_numpy(self):
+        numpy = forecast_grid.np
+        forecast_grid.np = None
+        try:
+            self.check()
+        finally:
+            forecast_grid.np = numpy
+
+    def test_uneven_slots_and_single_slot(self):
+        grid = ForecastGrid([6, 18], "linear")
+        curve = [float(p) for p in grid.curve([0.0, 1.0])]
+        self.assertAlmostEqual(curve[12], 0.5)
+        self.assertAlmostEqual(curve[0], 0.5)
+        self.assertAlmostEqual(curve[3], 0.25)
+        self.assertEqual([float(p) for p in ForecastGrid([12], "linear").curve([0.4])], [0.4] * 24)
+
+    def test_curve_cache_is_bounded_lru(self):
+        grid = ForecastGrid(SLOTS, "linear", cache_size=2)
+        first = grid.curve(PROBABILITIES)
+        self.assertIs(grid.curve(list(PROBABILITIES)), first)
+        grid.curve([0.5] * 8)
+        grid.curve(PROBABILITIES)
+        grid.curve([0.2] * 8)
+        self.assertIn(tuple(PROBABILITIES), grid._curves)
+        self.assertNotIn((0.5,) * 8, grid._curves)
+
+    def test_batches_larger_than_the_cache(self):
+        grid = ForecastGrid(SLOTS, "step", cache_size=4)
+        rows = [[i / 100] * 8 for i in range(10)] * 2
+        curves = grid.curves(rows)
+        self.assertEqual([float(curve[5]) for curve in curves], [row[0] for row in rows])
+        self.assertEqual(len(grid._curves), 4)
+
+    def test_shared_across_threads(self):
+        grid = ForecastGrid(SLOTS, "linear", cache_size=8)
+        errors = []
+
+        def work(offset):
+            try:
+                for i in range(200):
+                    row = [(offset + i) % 50 / 100] * 8
+                    self.assertAlmostEqual(float(grid.curve(row)[7]), row[0])
+                    self.assertEqual(len(grid.curves([row, [0.5] * 8])), 2)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=work, args=(n * 7,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_invalid_arguments(self):
+        for args in ((SLOTS, "cubic"), (SLOTS, "linear", 0), (SLOTS, "linear", 1.5), ([], "linear"),
+                     ([3, 0], "linear"), ([0, 24], "linear")):
+            with self.assertRaises(ValueError):
+                ForecastGrid(*args)
+        grid = ForecastGrid(SLOTS)
+        for hour in (-1, 24, "1", None):
+            with self.assertRaises(ValueError):
+                grid.index(hour)
+
+    @unittest.skipIf(forecast_grid.np is None, "numpy not installed")
+    def test_numpy_arrays(self):
+        np = forecast_grid.np
+        grid = ForecastGrid(SLOTS, "linear", steps_per_hour=4)
+        curves = grid.curves([PROBABILITIES, [0.5] * 8])
+        self.assertEqual(curves.shape, (2, 96))
+        self.assertFalse(grid.curve(PROBABILITIES).flags.writeable)
+        np.testing.assert_array_equal(grid.index(np.array([0.0, 0.125, 1.5, 23.9])), [0, 1, 6, 0])
+        with self.assertRaises(ValueError):
+            grid.index(np.array([1.0, np.nan]))
+        self.assertEqual(grid.curves([]).shape, (0, 96))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+from forecast_rules import ForecastRules
+
+RAIN = [(None, None, "dry"), (">=", 0.5, "wet")]
+TEMPERATURE = [(None, None, "{city}: {temp}")]
+
+
+class TestForecastRules(unittest.TestCase):
+    def test_operators_set_which_band_owns_the_threshold(self):
+        rules = ForecastRules(
+            rain_levels=[(None, None, "a"), (">=", 0.5, "b"), (">", 0.7, "c")],
+            temperature_levels=[(None, None, "cold"), (">", 0, "warm")],
+        )
+        self.assertEqual([rules.rain_level(p) for p in (0.49, 0.5, 0.7, 0.71)], ["a", "b", "b", "c"])
+        self.assertEqual([rules.format_temperature("X", t) for t in (-1, 0, 0.0, 1e-9)], ["cold", "cold", "cold", "warm"])
+
+    def test_templates_are_prebuilt(self):
+        rules = ForecastRules(RAIN, TEMPERATURE, rain_template="{{{level!r}}} {city} {time:02d} {percent:.0f}%",
+                              temperature_unavailable="No data for {city}")
+        self.assertEqual(rules.format_rain("Rome", 3, 0.5), "{'wet'} Rome 03 50%")
+        self.assertEqual(rules.format_temperature("Rome", 21.5), "Rome: 21.5")
+        self.assertEqual(rules.format_temperature("Rome", None), "No data for Rome")
+        rules = ForecastRules(RAIN, [(None, None, "{temp:+.1f} in {city!r:>8}")], rain_template="{time}h {level!s:^5}")
+        self.assertEqual(rules.format_rain("Rome", 6, 0.5), "6h  wet ")
+        self.assertEqual(rules.format_temperature("Rome", 3), "+3.0 in   'Rome'")
+
+    def test_invalid_tables_are_rejected(self):
+        for levels in ([], [(">=", 0, "a")], [(None, None, "a"), ("<", 0.5, "b")],
+                       [(None, None, "a"), (">=", 0.5, "b"), (">=", 0.5, "c")],
+                       [(None, None, "a"), (">", 0.5, "b"), (">=", 0.5, "c")],
+                       [(None, None, "a"), (">=", float("nan"), "b")], [(None, None)]):
+            with self.assertRaises(ValueError, msg=levels):
+                ForecastRules(levels, TEMPERATURE)
+        with self.assertRaises(TypeError):
+            ForecastRules([(None, None, "a"), (">=", "0.5", "b")], TEMPERATURE)
+        with self.assertRaises(TypeError):
+            ForecastRules([(None, None, 1)], TEMPERATURE)
+
+    def test_invalid_templates_are_rejected(self):
+        for template in ("{town}", "{city.upper}", "{}", "{0}", "{percent:d}", "{level:d}", "{city", "{city:{time}}",
+                         "{city!x}", "{level!z}"):
+            with self.assertRaises(ValueError, msg=template):
+                ForecastRules(RAIN, TEMPERATURE, rain_template=template)
+        # Temperatures may be ints or floats, so an int-only spec fails up front rather than per request
+        for template in ("{level}", "{temp:d}", "{city!q}"):
+            with self.assertRaises(ValueError, msg=template):
+                ForecastRules(RAIN, [(None, None, template)])
+        with self.assertRaises(TypeError):
+            ForecastRules(RAIN, [(None, None, None)])
+
+    def test_pickles_as_its_definition(self):
+        import pickle
+        rules = ForecastRules(RAIN, TEMPERATURE, rain_template="{level} {city}", temperature_bands=["any"])
+        copy = pickle.loads(pickle.dumps(rules))
+        self.assertEqual(copy.format_rain("Rome", 3, 0.7), "wet Rome")
+        self.assertEqual(copy.temperature_band(5), "any")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from unittest.mock import MagicMock
+
+from instrumentation import Histogram, Metrics
+from weather_processor import WeatherProcessor
+
+RAIN_STAGES = {"validate_city", "validate_hour", "fetch", "validate_probabilities", "slot_lookup", "categorize", "format",
+               "total"}
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.fetcher = MagicMock()
+        self.fetcher.get_chance_of_rain.return_value = [0.1] * 8
+        self.fetcher.get_current_temperature.return_value = 12
+        self.processor = WeatherProcessor(self.fetcher)
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(self.processor.metrics)
+        self.processor.get_rain_forecast("Oslo", 3)
+
+    def test_records_stages_calls_and_errors(self):
+        metrics = self.processor.enable_metrics()
+        expected = WeatherProcessor(self.fetcher).get_rain_forecast("Oslo", 3)
+        self.assertEqual(self.processor.get_rain_forecast("Oslo", 3), expected)
+        self.processor.get_city_temperature_info("Oslo")
+        with self.assertRaises(ValueError):
+            self.processor.get_rain_forecast("Oslo", 24)
+        with self.assertRaises(TypeError):
+            self.processor.get_city_temperature_info(5)
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["calls"], {"get_rain_forecast": 2, "get_city_temperature_info": 2})
+        self.assertEqual(snapshot["errors"], {"get_rain_forecast": {"ValueError": 1},
+                                              "get_city_temperature_info": {"TypeError": 1}})
+        stages = snapshot["stages"]["get_rain_forecast"]
+        self.assertEqual(set(stages), RAIN_STAGES)
+        self.assertEqual((stages["total"]["count"], stages["format"]["count"]), (2, 1))
+        self.assertEqual(set(snapshot["stages"]["get_city_temperature_info"]),
+                         {"validate_city", "fetch", "validate_temperature", "categorize", "format", "total"})
+
+    def test_bulk_calls_count_per_item_errors(self):
+        metrics = self.processor.enable_metrics()
+        self.processor.get_rain_forecasts([("Oslo", 3), ("", 3), ("Oslo", "3")])
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["calls"], {"get_rain_forecasts": 1})
+        self.assertEqual(snapshot["errors"]["get_rain_forecasts"], {"ValueError": 1, "TypeError": 1})
+
+    def test_toggle_at_runtime(self):
+        metrics = self.processor.enable_metrics()
+        self.processor.get_rain_forecast("Oslo", 3)
+        self.processor.disable_metrics()
+        self.processor.get_rain_forecast("Oslo", 3)
+        self.processor.enable_metrics(metrics)
+        self.processor.get_rain_forecast("Oslo", 3)
+        self.assertEqual(metrics.snapshot()["calls"], {"get_rain_forecast": 2})
+
+    def test_hook_sees_every_call(self):
+        calls = []
+        self.processor.enable_metrics(Metrics(hook=lambda *args: calls.append(args)))
+        self.processor.get_city_temperature_info("Oslo")
+        method, stages, total, errors = calls[0]
+        self.assertEqual((method, errors), ("get_city_temperature_info", ()))
+        self.assertEqual([name for name, _ in stages],
+                         ["validate_city", "fetch", "validate_temperature", "categorize", "format"])
+        self.assertGreaterEqual(total, sum(seconds for _, seconds in stages))
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram((0.001, 0.01))
+        for seconds in (0.0005, 0.001, 0.005, 2):
+            histogram.observe(seconds)
+        self.assertEqual(histogram.cumulative(), [(0.001, 2), (0.01, 3), (float("inf"), 4)])
+
+    def test_prometheus_export(self):
+        metrics = self.processor.enable_metrics(Metrics(buckets=(0.5,)))
+        self.processor.get_rain_forecast("Oslo", 3)
+        with self.assertRaises(TypeError):
+            self.processor.get_rain_forecast(1, 3)
+        text = metrics.to_prometheus()
+        self.assertIn('weather_processor_calls_total{method="get_rain_forecast"} 2\n', text)
+        self.assertIn('weather_processor_errors_total{method="get_rain_forecast",type="TypeError"} 1\n', text)
+        self.assertIn("# TYPE weather_processor_stage_seconds histogram\n", text)
+        self.assertIn('weather_processor_stage_seconds_bucket{method="get_rain_forecast",stage="fetch",le="+Inf"} 1\n',
+                      text)
+        self.assertIn('weather_processor_stage_seconds_count{method="get_rain_forecast",stage="total"} 2\n', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
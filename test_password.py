@@ -1,5 +1,5 @@
 import unittest
-from password import is_strong_password
+from password import check_passwords, is_strong_password
 class TestIsStrongPassword(unittest.TestCase):
     def test_short_password(self):
         result = is_strong_password("A1@b")
@@ -31,5 +31,25 @@ class TestIsStrongPassword(unittest.TestCase):
         self.assertEqual(result, [])
 
 
+class TestCheckPasswords(unittest.TestCase):
+    CORPUS = [
+        "", "A1@b", "abc1@def", "ABC123@#", "Abcdef@#", "Abcdef12", "Abcdef1@",
+        "password", "P@ssw0rd", "ÁÉÍÓÚáéíóú1!", "Ωmega_2024", "١٢٣٤٥٦٧٨aA#", "        ", "Tr0ub4dor&3x",
+        "correct horse battery staple",
+    ]
+
+    def test_matches_is_strong_password(self):
+        self.assertEqual(list(check_passwords(self.CORPUS)), [is_strong_password(p) for p in self.CORPUS])
+
+    def test_streams_from_generator(self):
+        results = check_passwords(p for p in ["Abcdef1@", "short"])
+        self.assertEqual(next(results), [])
+        self.assertIn("Password is too short. You need at least 8 characters", next(results))
+
+    def test_process_pool(self):
+        corpus = self.CORPUS * 20
+        self.assertEqual(list(check_passwords(corpus, processes=2, chunksize=7)), [is_strong_password(p) for p in corpus])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,174 @@
+import threading
+import time
+import unittest
+
+from refreshing_fetcher import LocalWeatherSource, RefreshingFetcher
+from weather_processor import WeatherProcessor
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FailingSource(LocalWeatherSource):
+    def __init__(self):
+        super().__init__()
+        self.failing = False
+
+    def get_chance_of_rain(self, city):
+        if self.failing:
+            raise Exception("Upstream timeout")
+        return super().get_chance_of_rain(city)
+
+    def get_city_temperature_info(self, city):
+        if self.failing:
+            raise Exception("Upstream timeout")
+        return super().get_city_temperature_info(city)
+
+
+class TestRefreshingFetcher(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.source = LocalWeatherSource()
+        self.fetcher = RefreshingFetcher(self.source, interval=60, workers=1, clock=self.clock)
+
+    def test_first_lookup_loads_then_serves_from_memory(self):
+        self.assertEqual(self.fetcher.get_current_temperature("Oslo"), -5)
+        fetches = self.source.fetches
+        for _ in range(5):
+            self.fetcher.get_current_temperature("OSLO")
+        self.assertEqual(self.source.fetches, fetches)
+        with self.assertRaisesRegex(Exception, "Unknown city"):
+            self.fetcher.get_chance_of_rain("Oslo")
+        with self.assertRaisesRegex(Exception, "Unknown city"):
+            self.fetcher.get_chance_of_rain("Atlantis")
+        with self.assertRaisesRegex(Exception, "Invalid city"):
+            self.fetcher.get_chance_of_rain("")
+
+    def test_spellings_share_one_entry(self):
+        self.source.set_city("São Paulo", 25, [0.5] * 8)
+        self.source.add_alias("SP", "São Paulo")
+        for city in ("São Paulo", "sao paulo", " SAO  PAULO", "sp"):
+            self.assertEqual(self.fetcher.get_current_temperature(city), 25)
+        # One load: a temperature and a rain fetch
+        self.assertEqual(self.source.fetches, 2)
+        self.assertEqual(self.fetcher.freshness("SP").accesses, 3)
+
+    def test_concurrent_first_lookups_share_one_load(self):
+        source = LocalWeatherSource(latency=0.1)
+        fetcher = RefreshingFetcher(source, interval=60, workers=1, clock=self.clock)
+        results = []
+
+        def lookup():
+            try:
+                results.append(fetcher.get_current_temperature("London"))
+            except Exception as error:
+                results.append(error)
+
+        threads = [threading.Thread(target=lookup) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [source.get_current_temperature("London")] * 3)
+        self.assertEqual(fetcher.refreshes, 1)
+
+    def test_serves_stale_data_until_refreshed(self):
+        self.fetcher.warm(["London"])
+        self.source.set_city("London", temperature=25)
+        self.clock.now = 61
+        self.assertEqual(self.fetcher.get_current_temperature("london"), 20)
+        self.assertTrue(self.fetcher.freshness("london").stale)
+        self.assertEqual(self.fetcher.refresh_due(), 1)
+        self.assertEqual(self.fetcher.get_current_temperature("london"), 25)
+        freshness = self.fetcher.freshness("london")
+        self.assertEqual((freshness.age, freshness.stale, freshness.accesses), (0, False, 1))
+        self.assertIsNone(self.fetcher.freshness("paris"))
+
+    def test_hot_cities_are_refreshed_first(self):
+        for city in ("a", "b", "c"):
+            self.source.set_city(city, temperature=1)
+        fetcher = RefreshingFetcher(self.source, interval=60, batch_size=1, workers=1, clock=self.clock)
+        fetcher.warm(["a", "b", "c"])
+        for city, lookups in (("a", 1), ("b", 5), ("c", 3)):
+            for _ in range(lookups):
+                fetcher.get_current_temperature(city)
+        self.clock.now = 60
+        order = []
+        while fetcher.refresh_due():
+            order += [f.city for f in fetcher.freshness_report() if not f.stale and f.city not in order]
+        self.assertEqual(order, ["b", "c", "a"])
+
+    def test_failed_refresh_keeps_data_and_backs_off(self):
+        source = FailingSource()
+        fetcher = RefreshingFetcher(source, interval=60, retry_interval=10, workers=1, clock=self.clock)
+        fetcher.warm(["London"])
+        source.failing = True
+        self.clock.now = 60
+        fetcher.refresh_due()
+        self.assertEqual(fetcher.get_current_temperature("london"), 20)
+        self.assertEqual(fetcher.freshness("london").error, "Upstream timeout; Upstream timeout")
+        self.assertEqual(fetcher.refresh_due(), 0)
+        source.failing = False
+        self.clock.now = 70
+        self.assertEqual(fetcher.refresh_due(), 1)
+        self.assertIsNone(fetcher.freshness("london").error)
+        self.assertEqual((fetcher.refreshes, fetcher.failures), (2, 1))
+
+    def test_missing_cities_back_off(self):
+        fetcher = RefreshingFetcher(self.source, interval=60, miss_ttl=10, workers=1, clock=self.clock)
+        for _ in range(5):
+            with self.assertRaisesRegex(Exception, "City not found"):
+                fetcher.get_current_temperature("Atlantis")
+        # One load: a temperature and a rain fetch
+        self.assertEqual(self.source.fetches, 2)
+        self.clock.now = 10
+        with self.assertRaises(Exception):
+            fetcher.get_current_temperature("atlantis")
+        self.assertEqual(self.source.fetches, 4)
+        # The second miss waits twice as long
+        self.clock.now = 29
+        with self.assertRaises(Exception):
+            fetcher.get_current_temperature("Atlantis")
+        self.assertEqual(self.source.fetches, 4)
+        self.source.set_city("Atlantis", temperature=30)
+        self.clock.now = 30
+        self.assertEqual(fetcher.get_current_temperature("Atlantis"), 30)
+        self.assertEqual(fetcher._missing, {})
+
+    def test_stop_shuts_down_the_refresh_workers(self):
+        for city in ("a", "b", "c"):
+            self.source.set_city(city, temperature=1)
+        fetcher = RefreshingFetcher(self.source, interval=60, workers=2, clock=self.clock)
+        before = threading.active_count()
+        fetcher.warm(["a", "b", "c"])
+        fetcher.stop()
+        self.assertEqual(threading.active_count(), before)
+        # Workers start again on demand
+        fetcher.warm(["a", "b"])
+        fetcher.stop()
+        self.assertEqual(fetcher.refreshes, 5)
+
+    def test_scheduler_refreshes_in_background(self):
+        source = LocalWeatherSource(latency=0.1)
+        fetcher = RefreshingFetcher(source, interval=0.05)
+        processor = WeatherProcessor(fetcher)
+        fetcher.warm(["London"])
+        with fetcher:
+            source.set_city("London", probabilities=[0.9] * 8)
+            deadline = time.monotonic() + 5
+            while "high" not in processor.get_rain_forecast("London", 12) and time.monotonic() < deadline:
+                start = time.perf_counter()
+                processor.get_rain_forecast("London", 12)
+                # The request path never waits on the source's latency
+                self.assertLess(time.perf_counter() - start, source.latency)
+        self.assertIn("high", processor.get_rain_forecast("London", 12))
+        self.assertFalse(any(t.name == "weather-refresh" for t in threading.enumerate()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import threading
+import unittest
+
+from forecast_rules import ForecastRules
+from sharded_processor import ShardedWeatherProcessor, shard_of
+from weather_fetcher import WeatherFetcher
+from weather_processor import WeatherProcessor
+from weather_store import ColumnarWeatherStore
+
+
+def make_fetcher():
+    fetcher = WeatherFetcher(aliases={"Londres": "London"})
+    for i in range(60):
+        fetcher.temperatures[f"city{i}"] = i - 20
+        fetcher.rain_probabilities[f"city{i}"] = [(i + slot) % 10 / 10 for slot in range(8)]
+    fetcher.rain_probabilities["broken"] = [0.5, 0.5]
+    return fetcher
+
+
+def same(a, b):
+    """Results match, comparing exceptions by type and message."""
+    if isinstance(a, Exception) or isinstance(b, Exception):
+        return type(a) is type(b) and str(a) == str(b)
+    return a == b
+
+
+class TestShardedWeatherProcessor(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.fetcher = make_fetcher()
+        cls.reference = WeatherProcessor(cls.fetcher)
+        cls.processor = ShardedWeatherProcessor(cls.fetcher, workers=3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.processor.close()
+
+    def test_shard_of_is_stable(self):
+        # CRC-32, so every process (and every run) agrees
+        self.assertEqual(shard_of("london", 1000), 165566181 % 1000)
+        self.assertEqual(shard_of("london", 1), 0)
+
+    def test_data_is_partitioned(self):
+        self.assertEqual(len(self.processor.shard_sizes), 3)
+        self.assertEqual(sum(self.processor.shard_sizes), 63)
+        self.assertTrue(all(self.processor.shard_sizes))
+
+    def test_single_calls_match_in_process_results(self):
+        for city in ("London", "Oslo", "city7", "CITY42", "Londres"):
+            self.assertEqual(self.processor.get_city_temperature_info(city),
+                             self.reference.get_city_temperature_info(city))
+            self.assertEqual(self.processor.get_temperature_result(city), self.reference.get_temperature_result(city))
+        for hour in range(24):
+            self.assertEqual(self.processor.get_rain_forecast("city13", hour),
+                             self.reference.get_rain_forecast("city13", hour))
+        self.assertEqual(self.processor.get_rain_result("LONDRES", 8), self.reference.get_rain_result("LONDRES", 8))
+
+    def test_single_call_errors_are_raised(self):
+        for call in (lambda p: p.get_rain_forecast("Atlantis", 3), lambda p: p.get_rain_forecast("", 3),
+                     lambda p: p.get_rain_forecast(None, 3), lambda p: p.get_rain_forecast("city1", 24),
+                     lambda p: p.get_rain_forecast("broken", 3), lambda p: p.get_city_temperature_info(["oslo"])):
+            with self.assertRaises(Exception) as expected:
+                call(self.reference)
+            with self.assertRaises(type(expected.exception)) as actual:
+                call(self.processor)
+            self.assertEqual(str(actual.exception), str(expected.exception))
+
+    def test_batches_match_in_process_results(self):
+        queries = [(f"City{i % 70}", i % 25) for i in range(300)] + [("", 1), (None, 2), ("broken", 3), ("Londres", 4)]
+        # Malformed items fail on their own, like WeatherProcessor's
+        queries += [("Oslo",), None, ("Oslo", 1, 2)]
+        for method in ("get_rain_forecasts", "get_rain_results"):
+            expected = getattr(self.reference, method)(queries)
+            actual = getattr(self.processor, method)(queries)
+            self.assertEqual(len(actual), len(expected))
+            for a, b in zip(actual, expected):
+                self.assertTrue(same(a, b), (a, b))
+
+        cities = [f"city{i}" for i in range(0, 80, 3)] + ["Oslo", None, " "]
+        pairs = [(self.processor.get_city_temperature_infos(cities), self.reference.get_city_temperature_info),
+                 (self.processor.get_temperature_results(cities), self.reference.get_temperature_result)]
+        for results, single in pairs:
+            for city, result in zip(cities, results):
+                try:
+                    expected = single(city)
+                except Exception as error:
+                    expected = error
+                self.assertTrue(same(result, expected), (city, result, expected))
+
+    def test_empty_batches(self):
+        self.assertEqual(self.processor.get_rain_forecasts([]), [])
+        self.assertEqual(self.processor.get_city_temperature_infos([]), [])
+
+    def test_concurrent_callers(self):
+        errors = []
+
+        def client(offset):
+            try:
+                for i in range(50):
+                    city = f"city{(offset + i) % 60}"
+                    if self.processor.get_city_temperature_info(city) != self.reference.get_city_temperature_info(city):
+                        errors.append(city)
+                    self.processor.get_rain_forecasts([(city, i % 24), ("city1", 5)])
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=client, args=(n * 7,)) for n in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+
+class TestShardedWeatherProcessorSetup(unittest.TestCase):
+    def test_store_rules_and_spawn(self):
+        store = ColumnarWeatherStore()
+        store.add("Zürich", 4, [0.9] * 8)
+        rules = ForecastRules([(None, None, "dry"), (">=", 0.5, "wet")], [(None, None, "{city}: {temp}")],
+                              rain_template="{level} in {city}")
+        # Spawned workers receive their shard and the rules by pickling
+        with ShardedWeatherProcessor(WeatherFetcher(store=store), workers=2, rules=rules,
+                                     start_method="spawn") as processor:
+            self.assertEqual(processor.get_rain_forecast("Zurich", 3), "wet in Zurich")
+            self.assertEqual(processor.get_city_temperature_info("ZÜRICH"), "ZÜRICH: 4")
+
+    def test_workers_do_not_fork_by_default(self):
+        # A forked worker would inherit the full dataset, not just its shard
+        with ShardedWeatherProcessor(WeatherFetcher(), workers=1) as processor:
+            self.assertIn(processor.start_method, ("forkserver", "spawn"))
+            self.assertIsInstance(processor.get_rain_forecasts([("Oslo", 1)])[0], Exception)
+
+    def test_closed_processor(self):
+        processor = ShardedWeatherProcessor(WeatherFetcher(), workers=1)
+        processor.close()
+        processor.close()
+        with self.assertRaises(ValueError):
+            processor.get_city_temperature_info("Oslo")
+
+    def test_invalid_worker_count(self):
+        for workers in (0, -1, 1.5):
+            with self.assertRaises(ValueError):
+                ShardedWeatherProcessor(WeatherFetcher(), workers=workers)
+
+
+if __name__ == "__main__":
+    unittest.main()
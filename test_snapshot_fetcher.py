@@ -0,0 +1,119 @@
+import threading
+import time
+import unittest
+
+from snapshot_fetcher import SnapshotFetcher
+from weather_fetcher import WeatherFetcher
+from weather_processor import WeatherProcessor
+
+CITIES = [f"city{i}" for i in range(50)]
+
+
+def generation_data(generation):
+    """Every value of every city encodes the generation it was written in."""
+    level = generation % 101
+    return ({city: level for city in CITIES},
+            {city: [level / 100] * 8 for city in CITIES})
+
+
+class TestSnapshotFetcher(unittest.TestCase):
+    def test_matches_weather_fetcher(self):
+        plain = WeatherFetcher()
+        fetcher = SnapshotFetcher.from_fetcher(plain)
+        self.assertEqual(fetcher.get_chance_of_rain("London"), plain.get_chance_of_rain("london"))
+        self.assertEqual(fetcher.get_current_temperature("OSLO"), -5)
+        for city, message in ((None, "Invalid city"), ("", "Invalid city"), ("Paris", "Unknown city")):
+            with self.assertRaisesRegex(Exception, message):
+                fetcher.get_chance_of_rain(city)
+        with self.assertRaisesRegex(Exception, "City not found"):
+            fetcher.get_current_temperature("Paris")
+
+    def test_lookups_normalize_like_weather_fetcher(self):
+        plain = WeatherFetcher(aliases={"NYC": "New York"})
+        plain.temperatures.update({"São Paulo": 25, "new york": 12})
+        fetcher = SnapshotFetcher.from_fetcher(plain)
+        for city in ("São Paulo", " London", "nyc", "SAO  PAULO"):
+            self.assertEqual(fetcher.get_current_temperature(city), plain.get_current_temperature(city))
+        self.assertEqual(fetcher.get_chance_of_rain(" London"), plain.get_chance_of_rain("london"))
+        fetcher.update(temperatures={"Zürich": 4}, remove=["SAO PAULO"])
+        self.assertEqual(fetcher.snapshot().get_current_temperature("zürich"), 4)
+        with self.assertRaisesRegex(Exception, "City not found"):
+            fetcher.get_current_temperature("São Paulo")
+
+    def test_views_are_immutable(self):
+        fetcher = SnapshotFetcher({"Oslo": 3}, {"Oslo": [0.5] * 8})
+        view = fetcher.snapshot()
+        fetcher.get_chance_of_rain("oslo")[0] = 1.0
+        self.assertEqual(view.get_chance_of_rain("oslo")[0], 0.5)
+        with self.assertRaises(TypeError):
+            view.temperatures["oslo"] = 40
+
+    def test_publish_and_update_swap_views(self):
+        fetcher = SnapshotFetcher({"Oslo": 3, "Rome": 20}, {"Oslo": [0.5] * 8})
+        old = fetcher.snapshot()
+        fetcher.update(temperatures={"Oslo": 4}, remove=["ROME"])
+        self.assertEqual((fetcher.version, fetcher.get_current_temperature("oslo")), (1, 4))
+        with self.assertRaises(Exception):
+            fetcher.get_current_temperature("rome")
+        self.assertEqual(old.get_current_temperature("rome"), 20)
+        fetcher.publish({"Lima": 18}, {})
+        self.assertEqual(dict(fetcher.snapshot().temperatures), {"lima": 18})
+
+    def test_invalid_data_keeps_current_view(self):
+        fetcher = SnapshotFetcher({"Oslo": 3}, {})
+        with self.assertRaises(ValueError):
+            fetcher.publish({"Oslo": 4}, {"Oslo": [2.0] * 8})
+        with self.assertRaises(TypeError):
+            fetcher.update(temperatures={"Oslo": "warm"})
+        self.assertEqual((fetcher.version, fetcher.get_current_temperature("oslo")), (0, 3))
+
+    def test_readers_never_see_half_updated_cities(self):
+        fetcher = SnapshotFetcher(*generation_data(0))
+        processor = WeatherProcessor(fetcher)
+        stop = threading.Event()
+        failures = []
+        reads = [0]
+
+        def reader(offset):
+            queries = [(city, 12) for city in CITIES]
+            while not stop.is_set():
+                view = fetcher.snapshot()
+                city = CITIES[(offset + reads[0]) % len(CITIES)]
+                probabilities = view.get_chance_of_rain(city)
+                temperature = view.get_current_temperature(city)
+                if set(probabilities) != {temperature / 100}:
+                    failures.append((city, temperature, probabilities))
+                # Unpinned lookups still return whole rows from a single view
+                if len(set(fetcher.get_chance_of_rain(city))) != 1:
+                    failures.append(city)
+                # A bulk call answers every city from the same view
+                forecasts = processor.get_rain_forecasts(queries)
+                if len({forecast.rsplit("(", 1)[1] for forecast in forecasts}) != 1:
+                    failures.append(forecasts)
+                reads[0] += 1
+
+        def writer(start):
+            generation = start
+            while not stop.is_set():
+                generation += 2
+                if generation % 4:
+                    fetcher.publish(*generation_data(generation))
+                else:
+                    fetcher.update(*generation_data(generation))
+
+        threads = [threading.Thread(target=reader, args=(i,)) for i in range(16)]
+        threads += [threading.Thread(target=writer, args=(i,)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.5)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(failures, [])
+        self.assertGreater(reads[0], 0)
+        self.assertGreater(fetcher.version, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
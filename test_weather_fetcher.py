@@ -71,6 +71,61 @@ class TestWeatherFetcher(unittest.TestCase):
         self.assertIsInstance(temp, (int, float))
 
 
+class TestWeatherFetcherCityNames(unittest.TestCase):
+    def setUp(self):
+        from weather_fetcher import WeatherFetcher
+        self.fetcher = WeatherFetcher(aliases={"Londres": "London", "Christiania": "Oslo"})
+
+    def test_lookups_ignore_case_accents_and_spacing(self):
+        self.fetcher.temperatures["sao paulo"] = 25
+        for name in ("São Paulo", "SAO PAULO", "  sao   paulo "):
+            self.assertEqual(self.fetcher.get_city_temperature_info(name), 25)
+
+    def test_keys_written_in_any_spelling_resolve(self):
+        self.fetcher.temperatures["zürich"] = 4
+        self.fetcher.temperatures["new  york"] = 12
+        self.fetcher.rain_probabilities["Zürich"] = [0.5] * 8
+        for name in ("Zürich", "zürich", "ZURICH"):
+            self.assertEqual(self.fetcher.get_city_temperature_info(name), 4)
+            self.assertEqual(self.fetcher.get_chance_of_rain(name), [0.5] * 8)
+        self.assertEqual(self.fetcher.get_city_temperature_info("new  york"), 12)
+        self.assertEqual(self.fetcher.get_city_temperature_info("New York"), 12)
+        self.assertEqual(self.fetcher.temperatures["Zürich"], 4)
+        self.assertIn("zurich", self.fetcher.temperatures)
+
+        self.fetcher.temperatures = {"Malmö": 7}
+        self.assertEqual(self.fetcher.get_city_temperature_info("malmö"), 7)
+        with self.assertRaises(ValueError):
+            self.fetcher.temperatures[" "] = 1
+
+    def test_aliases(self):
+        self.assertEqual(self.fetcher.get_city_temperature_info("Christiania"), -5)
+        self.assertEqual(self.fetcher.get_chance_of_rain("LONDRES"), self.fetcher.get_chance_of_rain("London"))
+        self.fetcher.add_alias("Kristiania", "Christiania")
+        self.assertEqual(self.fetcher.get_city_temperature_info("Kristiania"), -5)
+
+    def test_error_messages_are_unchanged(self):
+        cases = [
+            (self.fetcher.get_chance_of_rain, "Atlantis", "Unknown city"),
+            (self.fetcher.get_city_temperature_info, "Atlantis", "City not found"),
+            (self.fetcher.get_chance_of_rain, " ", "Invalid city"),
+            (self.fetcher.get_city_temperature_info, None, "Invalid city"),
+            (self.fetcher.get_chance_of_rain, ["london"], "Invalid city"),
+        ]
+        for method, city, message in cases:
+            with self.assertRaises(Exception) as context:
+                method(city)
+            self.assertEqual(str(context.exception), message)
+
+    def test_store_lookups_use_the_same_keys(self):
+        from weather_fetcher import WeatherFetcher
+        from weather_store import ColumnarWeatherStore
+        store = ColumnarWeatherStore()
+        store.add("Zürich", 4)
+        fetcher = WeatherFetcher(store=store, aliases={"ZRH": "Zurich"})
+        self.assertEqual(fetcher.get_city_temperature_info("ZURICH"), 4)
+        self.assertEqual(fetcher.get_city_temperature_info("zrh"), 4)
+
 
 if __name__ == "__main__":
     unittest.main()
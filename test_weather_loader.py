@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+import unittest
+
+from weather_fetcher import WeatherFetcher
+from weather_loader import load_weather
+from weather_store import ColumnarWeatherStore
+
+HEADER = "city,temperature," + ",".join(f"rain_{i}" for i in range(8)) + "\n"
+
+
+class TestLoadWeather(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def test_csv_file_into_fetcher_dicts(self):
+        path = self.write("cities.csv", HEADER
+                          + "Berlin,13,0.11,0.09,0.2,0.4,0.18,0.13,0.09,0.04\n"
+                          + "Cairo,31.5,,,,,,,,\n")
+        fetcher = WeatherFetcher()
+        report = load_weather(fetcher, path)
+        self.assertEqual((report.rows_loaded, report.rows_rejected), (2, 0))
+        self.assertEqual(fetcher.get_city_temperature_info("Berlin"), 13)
+        self.assertEqual(fetcher.get_chance_of_rain("berlin"), [0.11, 0.09, 0.2, 0.4, 0.18, 0.13, 0.09, 0.04])
+        self.assertEqual(fetcher.get_city_temperature_info("Cairo"), 31.5)
+        with self.assertRaises(Exception):
+            fetcher.get_chance_of_rain("Cairo")
+
+    def test_jsonl_generator_into_store(self):
+        def lines():
+            for i in range(1000):
+                yield json.dumps({"city": f"City{i}", "temperature": i % 40, "rain": [0.5] * 8}) + "\n"
+
+        fetcher = WeatherFetcher(store=ColumnarWeatherStore())
+        report = load_weather(fetcher, lines(), format="jsonl")
+        self.assertEqual(report.rows_loaded, 1000)
+        self.assertEqual(len(fetcher.store), 1000)
+        self.assertEqual(fetcher.get_city_temperature_info("city999"), 39)
+        self.assertGreater(report.rows_per_second, 0)
+
+    def test_bad_rows_are_collected(self):
+        path = self.write("cities.jsonl", "\n".join([
+            json.dumps({"city": "Good", "temperature": 1}),
+            json.dumps({"city": "Short", "rain": [0.1, 0.2]}),
+            "{not json",
+            json.dumps({"city": "High", "rain": [0.1] * 7 + [1.2]}),
+            json.dumps({"city": "", "temperature": 3}),
+            json.dumps({"city": "Warm", "temperature": "warm"}),
+            json.dumps({"city": "Empty"}),
+            json.dumps({"city": "Flags", "rain": [True] * 8}),
+        ]))
+        fetcher = WeatherFetcher()
+        report = load_weather(fetcher, path)
+        self.assertEqual((report.rows_loaded, report.rows_rejected), (1, 7))
+        self.assertEqual([line for line, _ in report.errors], [2, 3, 4, 5, 6, 7, 8])
+        self.assertIn("length invalid", report.errors[0][1])
+
+    def test_bad_rows_into_store_are_rejected_too(self):
+        fetcher = WeatherFetcher(store=ColumnarWeatherStore())
+        report = load_weather(fetcher, [HEADER, "Lima,abc,,,,,,,,\n", "Quito,12,0.1,0.1\n"], format="csv",
+                              on_error="skip")
+        self.assertEqual(report.rows_rejected, 2)
+        self.assertEqual(report.errors, [])
+        self.assertEqual(len(fetcher.store), 0)
+
+    def test_max_errors_bounds_collected_errors(self):
+        lines = (json.dumps({"city": f"C{i}"}) for i in range(50))
+        report = load_weather(WeatherFetcher(), lines, format="jsonl", max_errors=5)
+        self.assertEqual(report.rows_rejected, 50)
+        self.assertEqual(len(report.errors), 5)
+
+    def test_raise_mode_stops_at_first_bad_row(self):
+        fetcher = WeatherFetcher()
+        with self.assertRaisesRegex(ValueError, "Line 3"):
+            load_weather(fetcher, [HEADER, "Rome,20,,,,,,,,\n", "Nice,x,,,,,,,,\n"], format="csv", on_error="raise")
+        self.assertEqual(fetcher.get_city_temperature_info("Rome"), 20)
+
+    def test_wrong_csv_header(self):
+        with self.assertRaises(ValueError):
+            load_weather(WeatherFetcher(), ["name,temp\n"], format="csv")
+
+    def test_format_must_be_known(self):
+        with self.assertRaises(ValueError):
+            load_weather(WeatherFetcher(), [], format=None)
+        with self.assertRaises(ValueError):
+            load_weather(WeatherFetcher(), ["x"], on_error="ignore", format="csv")
+
+    def test_progress_callback(self):
+        seen = []
+        lines = (json.dumps({"city": f"C{i}", "temperature": 1}) for i in range(10))
+        load_weather(WeatherFetcher(), lines, format="jsonl", progress=lambda r: seen.append(r.rows_loaded),
+                     progress_every=4)
+        self.assertEqual(seen, [4, 8])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,10 @@
 import unittest
 from unittest.mock import MagicMock
-from weather_processor import WeatherProcessor
+import json
+
+from weather_processor import RainForecast, TemperatureInfo, WeatherProcessor
+from forecast_rules import ForecastRules
+from refreshing_fetcher import LocalWeatherSource
 from datetime import time
 
 
@@ -198,6 +202,247 @@ class TestWeatherProcessor(unittest.TestCase):
         processor = self.WeatherProcessor(self.mock_fetcher)
         with self.assertRaises(TypeError):
             processor._validate_temperature("warm")
+    def test_rain_forecasts_match_single_calls_in_input_order(self):
+        self.mock_fetcher.get_chance_of_rain.return_value = [0.1, 0.15, 0.85, 0.7, 0.1, 0.05, 0.02, 0.55]
+        processor = self.WeatherProcessor(self.mock_fetcher)
+        queries = [("Tokyo", 6), ("Paris", 21), ("Tokyo", 9), ("Tokyo", 6)]
+        expected = [processor.get_rain_forecast(city, hour) for city, hour in queries]
+        self.assertEqual(processor.get_rain_forecasts(queries), expected)
+
+    def test_rain_forecasts_fetch_each_city_once(self):
+        self.mock_fetcher.get_chance_of_rain.return_value = [0.1] * 8
+        processor = self.WeatherProcessor(self.mock_fetcher)
+        processor.get_rain_forecasts([("London", h) for h in range(24)] + [("LONDON", 3), ("Oslo", 0)])
+        self.assertEqual(self.mock_fetcher.get_chance_of_rain.call_count, 2)
+
+    def test_rain_forecasts_group_cities_by_the_fetchers_key(self):
+        fetcher = LocalWeatherSource()
+        fetcher.add_alias("Londres", "London")
+        processor = self.WeatherProcessor(fetcher)
+        processor.get_rain_forecasts([("London", 3), ("Londres", 6), (" london ", 9), ("LONDON", 12)])
+        processor.get_rain_probabilities(["London", "Londres", "LONDON "], [3, 6, 9])
+        self.assertEqual(fetcher.fetches, 2)
+
+    def test_rain_forecasts_report_errors_per_item(self):
+        def chance_of_rain(city):
+            if city == "Atlantis":
+                raise Exception("Unknown city")
+            return [0.1] * 8
+        self.mock_fetcher.get_chance_of_rain.side_effect = chance_of_rain
+        processor = self.WeatherProcessor(self.mock_fetcher)
+        results = processor.get_rain_forecasts([("London", 6), ("Atlantis", 6), ("London", 24), (None, 3), ("London", 9)])
+        self.assertIn("very low chance of rain", results[0])
+        self.assertIsInstance(results[1], Exception)
+        self.assertIsInstance(results[2], ValueError)
+        self.assertIsInstance(results[3], ValueError)
+        self.assertIn("around 9:00", results[4])
+
+    def test_malformed_queries_fail_per_item(self):
+        self.mock_fetcher.get_chance_of_rain.return_value = [0.1] * 8
+        processor = self.WeatherProcessor(self.mock_fetcher)
+        results = processor.get_rain_forecasts([("London", 6), None, ("London",), ("London", 6, 0), ("London", 9)])
+        self.assertIn("around 6:00", results[0])
+        self.assertIsInstance(results[1], TypeError)
+        self.assertIsInstance(results[2], ValueError)
+        self.assertIsInstance(results[3], ValueError)
+        self.assertIn("around 9:00", results[4])
+
+    def test_rain_forecasts_invalid_probabilities_fail_the_whole_city(self):
+        self.mock_fetcher.get_chance_of_rain.return_value = [0.1, 0.2, 0.3]
+        processor = self.WeatherProcessor(self.mock_fetcher)
+        results = processor.get_rain_forecasts([("Bad", 3), ("Bad", 6)])
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+
+    def test_rain_forecasts_empty(self):
+        processor = self.WeatherProcessor(self.mock_fetcher)
+        self.assertEqual(processor.get_rain_forecasts([]), [])
+
+    def test_closest_time_slot_table_matches_search(self):
+        processor = self.WeatherProcessor(self.mock_fetcher)
+        for hour in range(24):
+            self.assertEqual(processor._find_closest_time_slot(hour), processor._search_closest_time_slot(hour))
+        self.assertEqual(processor._find_closest_time_slot(23), (7, 21))
+
+    def test_closest_time_slot_ties_pick_earliest_slot(self):
+        processor = self.WeatherProcessor(self.mock_fetcher)
+        processor.time_slots = [0, 4, 8, 12, 16, 20, 22, 23]
+        self.assertEqual(processor._find_closest_time_slot(2), (0, 0))
+        self.assertEqual(processor._find_closest_time_slot(21), (5, 20))
+        for hour in range(24):
+            self.assertEqual(processor._find_closest_time_slot(hour), processor._search_closest_time_slot(hour))
+
+    def test_reconfigured_time_slots_rebuild_table(self):
+        self.mock_fetcher.get_chance_of_rain.return_value = [0.9, 0.1]
+        processor = self.WeatherProcessor(self.mock_fetcher)
+        processor.time_slots = [0, 12]
+        self.assertIn("around 12:00", processor.get_rain_forecast("Lima", 19))
+        self.assertIn("high chance of rain", processor.get_rain_forecast("Lima", 5))
+
+    def test_categorize_rain_probability_thresholds(self):
+        processor = self.WeatherProcessor(self.mock_fetcher)
+        expected = {0: "very low", 0.19: "very low", 0.2: "low", 0.49: "low", 0.5: "moderate",
+                    0.79: "moderate", 0.8: "high", 1: "high"}
+        for probability, level in expected.items():
+            self.assertEqual(processor._categorize_rain_probability(probability), level)
+
+    def test_overridden_thresholds_apply(self):
+        class StrictProcessor(self.WeatherProcessor):
+            HIGH_RAIN_PROBABILITY = 0.6
+
+        self.assertEqual(StrictProcessor(self.mock_fetcher)._categorize_rain_probability(0.7), "high")
+        processor = self.WeatherProcessor(self.mock_fetcher)
+        processor.LOW_RAIN_PROBABILITY = 0.1
+        self.assertEqual(processor._categorize_rain_probability(0.15), "low")
+        self.assertEqual(self.WeatherProcessor(self.mock_fetcher)._categorize_rain_probability(0.15), "very low")
+        # Defaults are compiled once per set of thresholds
+        self.assertIs(self.WeatherProcessor(self.mock_fetcher).rules, self.WeatherProcessor(None).rules)
+
+    def test_temperature_boundaries_are_normal(self):
+        processor = self.WeatherProcessor(self.mock_fetcher)
+        for temp in (0, 0.0, 30, 30.0):
+            self.mock_fetcher.get_current_temperature.return_value = temp
+            self.assertEqual(processor.get_city_temperature_info("Oslo"), f"The temperature in Oslo is {temp}°C")
+        self.mock_fetcher.get_current_temperature.return_value = 30.1
+        self.assertEqual(processor.get_city_temperature_info("Oslo"), "It's hot in Oslo: 30.1°C")
+
+    def test_custom_rules_apply_to_single_and_bulk_calls(self):
+        rules = ForecastRules(
+            rain_levels=[(None, None, "slight"), (">", 0.6, "strong")],
+            temperature_levels=[(None, None, "{city} is cold ({temp})"), (">=", 10, "{city} is mild ({temp})")],
+            rain_template="{city} {time}h: {level} ({percent:.1f}%)",
+        )
+        self.mock_fetcher.get_chance_of_rain.return_value = [0.6, 0.61, 0, 0, 0, 0, 0, 0]
+        self.mock_fetcher.get_current_temperature.return_value = 9.5
+        processor = self.WeatherProcessor(self.mock_fetcher, rules=rules)
+        self.assertEqual(processor.get_rain_forecast("Bergen", 0), "Bergen 0h: slight (60.0%)")
+        self.assertEqual(processor.get_rain_forecasts([("Bergen", 0), ("Bergen", 3)]),
+                         ["Bergen 0h: slight (60.0%)", "Bergen 3h: strong (61.0%)"])
+        self.assertEqual(processor._categorize_rain_probability(0.7), "strong")
+        self.assertEqual(processor.get_city_temperature_info("Bergen"), "Bergen is cold (9.5)")
+
+    def test_rain_result_is_structured(self):
+        self.mock_fetcher.get_chance_of_rain.return_value = [0.1, 0.15, 0.85, 0.7, 0.1, 0.05, 0.02, 0.55]
+        processor = self.WeatherProcessor(self.mock_fetcher)
+        result = processor.get_rain_result("Tokyo", 7)
+        self.assertEqual(result, RainForecast("Tokyo", 6, 0.85, "high"))
+        self.assertEqual(processor.format_result(result), processor.get_rain_forecast("Tokyo", 7))
+        self.assertEqual(json.loads(json.dumps(result._asdict()))["category"], "high")
+
+    def test_rain_results_match_bulk_forecasts(self):
+        self.mock_fetcher.get_chance_of_rain.return_value = [0.3] * 8
+        processor = self.WeatherProcessor(self.mock_fetcher)
+        queries = [("Tokyo", 6), ("", 3), ("Paris", 22)]
+        results = processor.get_rain_results(queries)
+        self.assertEqual(results[0], RainForecast("Tokyo", 6, 0.3, "low"))
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(results[2].slot_hour, 21)
+        messages = processor.get_rain_forecasts(queries)
+        self.assertEqual([processor.format_result(results[0]), processor.format_result(results[2])],
+                         [messages[0], messages[2]])
+
+    def test_messages_are_formatted_results(self):
+        self.mock_fetcher.get_chance_of_rain.return_value = [0.3] * 8
+        self.mock_fetcher.get_current_temperature.return_value = 31
+        processor = self.WeatherProcessor(self.mock_fetcher)
+        processor.format_result = lambda result: f"formatted {result.city}"
+        self.assertEqual(processor.get_rain_forecast("Tokyo", 6), "formatted Tokyo")
+        self.assertEqual(processor.get_city_temperature_info("Lima"), "formatted Lima")
+        # Queries may be lists; repeated ones share one result
+        self.assertEqual(processor.get_rain_forecasts([["Tokyo", 6], ("Tokyo", 6), ("TOKYO", 6)]),
+                         ["formatted Tokyo", "formatted Tokyo", "formatted TOKYO"])
+
+    def test_temperature_result_is_structured(self):
+        processor = self.WeatherProcessor(self.mock_fetcher)
+        for temp, band in ((-5, "freezing"), (0, "normal"), (30.5, "hot"), (None, None)):
+            self.mock_fetcher.get_current_temperature.return_value = temp
+            result = processor.get_temperature_result("Oslo")
+            self.assertEqual(result, TemperatureInfo("Oslo", temp, band))
+            self.assertEqual(processor.format_result(result), processor.get_city_temperature_info("Oslo"))
+        with self.assertRaises(TypeError):
+            processor.format_result(("Oslo", 5, "normal"))
+
+
+class TestWeatherProcessorInterpolation(unittest.TestCase):
+    RAIN = {
+        "london": [0.1, 0.4, 0.7, 1.0, 0.5, 0.2, 0.0, 0.3],
+        "tokyo": [0.5] * 8,
+    }
+
+    def setUp(self):
+        self.fetcher = MagicMock()
+        self.fetcher.get_chance_of_rain.side_effect = self.rain
+
+    def rain(self, city):
+        if city.lower() not in self.RAIN:
+            raise Exception("Unknown city")
+        return self.RAIN[city.lower()]
+
+    def test_nearest_slot_stays_the_default(self):
+        processor = WeatherProcessor(self.fetcher)
+        self.assertEqual(processor.get_rain_result("London", 4), RainForecast("London", 3, 0.4, "low"))
+
+    def test_linear_and_step(self):
+        linear = WeatherProcessor(self.fetcher, interpolation="linear")
+        self.assertEqual(linear.get_rain_result("London", 4), RainForecast("London", 4, 0.5, "moderate"))
+        result = linear.get_rain_result("London", 23)
+        self.assertAlmostEqual(result.probability, 0.3 - 0.4 / 3)
+        self.assertEqual(linear.get_rain_forecast("London", 4), linear.format_result(linear.get_rain_result("London", 4)))
+        self.assertIn("around 4:00 (50% probability)", linear.get_rain_forecast("London", 4))
+        step = WeatherProcessor(self.fetcher, interpolation="step")
+        self.assertEqual(step.get_rain_result("London", 5), RainForecast("London", 5, 0.4, "low"))
+        with self.assertRaises(ValueError):
+            WeatherProcessor(self.fetcher, interpolation="cubic")
+
+    def test_bulk_and_instrumented_calls_match_single_calls(self):
+        processor = WeatherProcessor(self.fetcher, interpolation="linear")
+        queries = [("London", 4), ("Tokyo", 22), ("Nowhere", 1), ("LONDON", 23)]
+        expected = [processor.get_rain_result("London", 4), processor.get_rain_result("Tokyo", 22),
+                    None, processor.get_rain_result("LONDON", 23)]
+        results = processor.get_rain_results(queries)
+        self.assertIsInstance(results[2], Exception)
+        self.assertEqual(results[:2] + results[3:], expected[:2] + expected[3:])
+        processor.enable_metrics()
+        self.assertEqual(processor.get_rain_result("London", 4), expected[0])
+        self.assertIn("slot_lookup", processor.metrics.snapshot()["stages"]["get_rain_result"])
+
+    def test_curves_and_points(self):
+        processor = WeatherProcessor(self.fetcher, interpolation="linear")
+        curves = processor.get_rain_curves(["London", "Tokyo", "london"], steps_per_hour=2)
+        self.assertEqual([len(curve) for curve in curves], [48, 48, 48])
+        self.assertAlmostEqual(float(curves[0][3]), 0.25)
+        self.assertEqual(list(curves[2]), list(curves[0]))
+        points = processor.get_rain_probabilities(["London", "Tokyo", "London"], [1.5, 7.25, 22.5])
+        self.assertEqual([round(float(p), 9) for p in points], [0.25, 0.5, 0.2])
+        self.assertEqual(self.fetcher.get_chance_of_rain.call_count, 4)
+        nearest = WeatherProcessor(self.fetcher)
+        self.assertEqual([float(p) for p in nearest.get_rain_curves(["London"])[0]][:4], [0.1, 0.1, 0.4, 0.4])
+        with self.assertRaises(Exception):
+            processor.get_rain_probabilities(["London", "Nowhere"], [1, 2])
+        with self.assertRaises(ValueError):
+            processor.get_rain_probabilities(["London"], [24])
+        with self.assertRaises(ValueError):
+            processor.get_rain_probabilities(["London"], [1, 2])
+
+    def test_more_distinct_forecasts_than_the_grid_cache(self):
+        fetcher = MagicMock()
+        fetcher.get_chance_of_rain.side_effect = lambda city: [int(city[4:]) / 1100] * 8
+        processor = WeatherProcessor(fetcher, interpolation="linear")
+        cities = [f"city{i}" for i in range(1100)]
+        curves = processor.get_rain_curves(cities)
+        self.assertEqual([round(float(curve[13]) * 1100) for curve in curves], list(range(1100)))
+        points = processor.get_rain_probabilities(cities, [12.5] * 1100)
+        self.assertEqual([round(float(p) * 1100) for p in points], list(range(1100)))
+        # Points are interpolated directly, without a curve per city
+        self.assertEqual(len(processor._grid("linear", 60)._curves), 0)
+
+    def test_reconfigured_time_slots_rebuild_grids(self):
+        processor = WeatherProcessor(self.fetcher, interpolation="linear")
+        processor.get_rain_result("London", 4)
+        processor.time_slots = [0, 12]
+        self.RAIN = {"london": [0.0, 1.0]}
+        self.assertEqual(processor.get_rain_result("London", 6).probability, 0.5)
+        self.assertEqual(processor.get_rain_result("London", 18).probability, 0.5)
+
 # - Set the return_value of get_current_temperature for different test scenarios.
 # - Set the return_value of get_chance_of_rain for rain forecast scenarios.
 
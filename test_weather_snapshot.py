@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+
+from weather_fetcher import WeatherFetcher
+from weather_processor import WeatherProcessor
+from weather_snapshot import open_snapshot, save_snapshot
+from weather_store import ColumnarWeatherStore
+
+
+class TestWeatherSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "weather.snap")
+
+    def open(self):
+        store = open_snapshot(self.path)
+        self.addCleanup(store.close)
+        return store
+
+    def test_round_trip_of_default_fetcher(self):
+        self.assertEqual(save_snapshot(WeatherFetcher(), self.path), 2)
+        fetcher = WeatherFetcher(store=self.open())
+        self.assertEqual(fetcher.get_city_temperature_info("Oslo"), -5)
+        self.assertEqual(fetcher.get_city_temperature_info("LONDON"), 20)
+        for stored, original in zip(fetcher.get_chance_of_rain("London"), WeatherFetcher().get_chance_of_rain("London")):
+            self.assertAlmostEqual(stored, original, places=6)
+        with self.assertRaises(Exception):
+            fetcher.get_chance_of_rain("Oslo")
+        with self.assertRaises(Exception):
+            fetcher.get_city_temperature_info("Atlantis")
+
+    def test_processor_output_matches_dict_backed_fetcher(self):
+        save_snapshot(WeatherFetcher(), self.path)
+        processor = WeatherProcessor(WeatherFetcher(store=self.open()))
+        reference = WeatherProcessor(WeatherFetcher())
+        for hour in range(24):
+            self.assertEqual(processor.get_rain_forecast("London", hour), reference.get_rain_forecast("London", hour))
+        self.assertEqual(processor.get_city_temperature_info("Oslo"), reference.get_city_temperature_info("Oslo"))
+
+    def test_fractional_temperatures_read_back_exactly(self):
+        source = WeatherFetcher()
+        source.temperatures["lima"] = 21.3
+        save_snapshot(source, self.path)
+        fetcher = WeatherFetcher(store=self.open())
+        self.assertEqual(fetcher.get_current_temperature("Lima"), 21.3)
+        self.assertEqual(WeatherProcessor(fetcher).get_city_temperature_info("Lima"),
+                         WeatherProcessor(source).get_city_temperature_info("Lima"))
+
+    def test_store_source_and_binary_search(self):
+        store = ColumnarWeatherStore()
+        for i in range(500):
+            store.add(f"City{i}", i - 250, [i % 10 / 10] * 8)
+        store.add("São Paulo", 25.5)
+        store.add("Москва", -3)
+        save_snapshot(store, self.path)
+        snapshot = self.open()
+        self.assertEqual(len(snapshot), 502)
+        self.assertEqual(snapshot.cities(), sorted(snapshot.cities(), key=str.encode))
+        for i in range(0, 500, 37):
+            self.assertEqual(snapshot.get_temperature(f"city{i}"), i - 250)
+            self.assertAlmostEqual(snapshot.get_rain(f"city{i}")[3], i % 10 / 10, places=6)
+        # Keys are normalize_city() names: accents stripped, non-Latin scripts kept
+        self.assertEqual(snapshot.get_temperature("sao paulo"), 25.5)
+        self.assertIsNone(snapshot.get_rain("sao paulo"))
+        self.assertEqual(snapshot.get_temperature("москва"), -3)
+        self.assertIn("São Paulo", snapshot)
+        self.assertIsNone(snapshot.get_temperature("city5000"))
+        self.assertIn("CITY7", snapshot)
+
+    def test_invalid_data_is_rejected_on_save(self):
+        fetcher = WeatherFetcher()
+        fetcher.rain_probabilities["bad"] = [0.1, 2.0]
+        with self.assertRaises(ValueError):
+            save_snapshot(fetcher, self.path)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_empty_snapshot(self):
+        save_snapshot(ColumnarWeatherStore(), self.path)
+        snapshot = self.open()
+        self.assertEqual(len(snapshot), 0)
+        self.assertIsNone(snapshot.get_rain("london"))
+
+    def test_rejects_foreign_and_truncated_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a snapshot at all, definitely not" * 2)
+        with self.assertRaisesRegex(ValueError, "Not a weather snapshot"):
+            open_snapshot(self.path)
+        save_snapshot(WeatherFetcher(), self.path)
+        with open(self.path, "r+b") as f:
+            f.truncate(os.path.getsize(self.path) - 4)
+        with self.assertRaisesRegex(ValueError, "Truncated"):
+            open_snapshot(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import math
+import unittest
+
+import weather_store
+from weather_fetcher import WeatherFetcher
+from weather_processor import WeatherProcessor
+from weather_store import ColumnarWeatherStore
+
+LONDON = [0.1, 0.2, 0.15, 0.25, 0.05, 0.12, 0.33, 0.41]
+TOKYO = [0.1, 0.15, 0.85, 0.7, 0.1, 0.05, 0.02, 0.01]
+
+
+class TestColumnarWeatherStore(unittest.TestCase):
+    def setUp(self):
+        self.store = ColumnarWeatherStore.from_dicts(
+            {"oslo": -5, "london": 20, "tokyo": 21.5},
+            {"london": LONDON, "tokyo": TOKYO},
+        )
+        self.fetcher = WeatherFetcher(store=self.store)
+
+    def test_fetcher_api_reads_from_store(self):
+        self.assertEqual(self.fetcher.get_city_temperature_info("Oslo"), -5)
+        self.assertIsInstance(self.fetcher.get_city_temperature_info("London"), int)
+        self.assertEqual(self.fetcher.get_city_temperature_info("TOKYO"), 21.5)
+        probabilities = self.fetcher.get_chance_of_rain("London")
+        self.assertIsInstance(probabilities, list)
+        for stored, original in zip(probabilities, LONDON):
+            self.assertAlmostEqual(stored, original, places=6)
+
+    def test_missing_data_raises_like_dicts(self):
+        with self.assertRaises(Exception):
+            self.fetcher.get_chance_of_rain("Oslo")
+        with self.assertRaises(Exception):
+            self.fetcher.get_city_temperature_info("Atlantis")
+        with self.assertRaises(Exception):
+            self.fetcher.get_chance_of_rain("")
+
+    def test_dicts_still_take_precedence(self):
+        self.fetcher.temperatures["oslo"] = 3
+        self.assertEqual(self.fetcher.get_city_temperature_info("Oslo"), 3)
+
+    def test_processor_output_matches_dict_backed_fetcher(self):
+        processor = WeatherProcessor(self.fetcher)
+        reference = WeatherProcessor(WeatherFetcher())
+        for hour in range(24):
+            self.assertEqual(processor.get_rain_forecast("London", hour), reference.get_rain_forecast("London", hour))
+        self.assertEqual(processor.get_city_temperature_info("Oslo"), reference.get_city_temperature_info("Oslo"))
+
+    def test_fractional_temperatures_read_back_exactly(self):
+        self.store.add("Lima", 21.3)
+        dicts = WeatherFetcher()
+        dicts.temperatures["lima"] = 21.3
+        self.assertEqual(self.fetcher.get_current_temperature("Lima"), 21.3)
+        self.assertEqual(WeatherProcessor(self.fetcher).get_city_temperature_info("Lima"),
+                         WeatherProcessor(dicts).get_city_temperature_info("Lima"))
+
+    def test_rows_are_validated_on_add(self):
+        with self.assertRaises(ValueError):
+            self.store.add("Lima", 18, [0.1, 0.2])
+        with self.assertRaises(ValueError):
+            self.store.add("Lima", 18, [0.1] * 7 + [1.5])
+        with self.assertRaises(TypeError):
+            self.store.add("Lima", "warm")
+        # The same rules as the loader's
+        for temperature, probabilities, error in ((float("nan"), None, ValueError), (float("inf"), None, ValueError),
+                                                  (True, None, TypeError), (None, [True] * 8, TypeError),
+                                                  (None, [float("nan")] * 8, ValueError)):
+            with self.assertRaises(error):
+                self.store.add("Lima", temperature, probabilities)
+        self.assertNotIn("Lima", self.store)
+
+    def test_add_replaces_existing_city(self):
+        self.store.add("London", 12, TOKYO)
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual(self.fetcher.get_city_temperature_info("london"), 12)
+        self.assertAlmostEqual(self.fetcher.get_chance_of_rain("London")[2], 0.85, places=6)
+
+    def test_bulk_accessors(self):
+        rain = self.store.get_chances_of_rain(["Tokyo", "London", "Oslo"])
+        self.assertAlmostEqual(float(rain[0][2]), 0.85, places=6)
+        self.assertAlmostEqual(float(rain[1][7]), 0.41, places=6)
+        self.assertTrue(all(math.isnan(p) for p in rain[2]))
+        temperatures = self.store.get_temperatures(["Oslo", "Tokyo"])
+        self.assertEqual([float(t) for t in temperatures], [-5.0, 21.5])
+        with self.assertRaises(KeyError):
+            self.store.get_temperatures(["Atlantis"])
+
+    def test_rain_matrix_shape(self):
+        matrix = self.store.rain_matrix()
+        self.assertEqual(tuple(matrix.shape), (3, weather_store.SLOTS))
+        del matrix
+
+
+@unittest.skipIf(weather_store.np is None, "numpy not installed")
+class TestColumnarWeatherStoreNumpy(unittest.TestCase):
+    def test_bulk_accessors_return_float_arrays(self):
+        store = ColumnarWeatherStore.from_dicts({"london": 20}, {"london": LONDON})
+        rain = store.get_chances_of_rain(["London", "london"])
+        self.assertEqual(rain.dtype, weather_store.np.float32)
+        self.assertEqual(rain.shape, (2, 8))
+        self.assertEqual(store.get_temperatures(["London"]).dtype, weather_store.np.float64)
+
+
+if __name__ == '__main__':
+    unittest.main()
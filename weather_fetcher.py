@@ -1,7 +1,30 @@
+from city_index import CityDict, CityIndex
+
+# Returned by internal lookups for cities with no data
+_MISSING = object()
+
+
 class WeatherFetcher:
 
 
-    def __init__(self):
+    def __init__(self, store=None, aliases=None):
+        """
+        store: optional ColumnarWeatherStore (or any store with get_rain/get_temperature)
+        consulted for cities missing from the dicts. A fetcher with a store starts
+        with empty dicts instead of the predefined cities.
+        aliases: optional {alias: city} table, e.g. {"NYC": "New York"}.
+
+        The dicts are CityDicts, keyed by normalize_city(name) however a key is
+        written, and lookups accept any spelling that normalizes to the same
+        key ("São Paulo", "sao paulo", "SAO PAULO"). Assigning a plain dict to
+        temperatures or rain_probabilities normalizes its keys the same way.
+        """
+        self.store = store
+        self.index = CityIndex(aliases)
+        if store is not None:
+            self.temperatures = {}
+            self.rain_probabilities = {}
+            return
         # Predefine city data for test coverage
         self.temperatures = {
             "oslo": -5,
@@ -11,20 +34,66 @@ class WeatherFetcher:
             "london": [0.1, 0.2, 0.15, 0.25, 0.05, 0.12, 0.33, 0.41],
         }
 
-    
+    @property
+    def temperatures(self):
+        return self._temperatures
+
+    @temperatures.setter
+    def temperatures(self, temperatures):
+        self._temperatures = temperatures if isinstance(temperatures, CityDict) else CityDict(temperatures)
+
+    @property
+    def rain_probabilities(self):
+        return self._rain_probabilities
+
+    @rain_probabilities.setter
+    def rain_probabilities(self, rain_probabilities):
+        self._rain_probabilities = (rain_probabilities if isinstance(rain_probabilities, CityDict)
+                                    else CityDict(rain_probabilities))
+
+    def add_alias(self, alias, city):
+        """Makes lookups of alias return city's data."""
+        self.index.add_alias(alias, city)
 
     def get_chance_of_rain(self, city):
-        if not isinstance(city, str) or not city.strip():
-            raise Exception("Invalid city")
-        if city.lower() in self.rain_probabilities:
-            return self.rain_probabilities[city.lower()]
-        else: 
-            raise Exception("Unknown city")
+        key = self.index.key(city)
+        # The key is already normalized, so skip CityDict.get
+        probabilities = dict.get(self._rain_probabilities, key, _MISSING)
+        if probabilities is _MISSING:
+            if key is None:
+                raise Exception("Invalid city")
+            probabilities = self._find_rain(key)
+            if probabilities is _MISSING:
+                raise Exception("Unknown city")
+        return probabilities
 
     def get_city_temperature_info(self, city):
-        if not isinstance(city, str) or not city.strip():
-            raise Exception("Invalid city")
-        if city.lower() in self.temperatures:
-            return self.temperatures[city.lower()]
-        raise Exception("City not found")
+        key = self.index.key(city)
+        temperature = dict.get(self._temperatures, key, _MISSING)
+        if temperature is _MISSING:
+            if key is None:
+                raise Exception("Invalid city")
+            temperature = self._find_temperature(key)
+            if temperature is _MISSING:
+                raise Exception("City not found")
+        return temperature
+
+    def get_current_temperature(self, city):
+        # Name used by WeatherProcessor
+        return self.get_city_temperature_info(city)
+
+    # ========== STORE FALLBACK ==========
+
+    def _find_rain(self, key):
+        """Returns the store's probabilities for a key missing from the dict, or _MISSING."""
+        if self.store is None:
+            return _MISSING
+        probabilities = self.store.get_rain(key)
+        return _MISSING if probabilities is None else probabilities
 
+    def _find_temperature(self, key):
+        """Returns the store's temperature for a key missing from the dict, or _MISSING."""
+        if self.store is None:
+            return _MISSING
+        temperature = self.store.get_temperature(key)
+        return _MISSING if temperature is None else temperature
@@ -0,0 +1,182 @@
+import csv
+import json
+import os
+import time
+
+from city_index import normalize_city
+from weather_store import SLOTS, validate_city_data
+
+CSV_HEADER = ["city", "temperature"] + [f"rain_{i}" for i in range(SLOTS)]
+
+
+class LoadReport:
+    """Outcome of a load: row counts, sampled errors and throughput."""
+
+    def __init__(self):
+        self.rows_loaded = 0
+        self.rows_rejected = 0
+        # (line number, message) for the first max_errors bad rows
+        self.errors = []
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        rows = self.rows_loaded + self.rows_rejected
+        return rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __repr__(self):
+        return (f"LoadReport(rows_loaded={self.rows_loaded}, rows_rejected={self.rows_rejected}, "
+                f"rows_per_second={self.rows_per_second:.0f})")
+
+
+def load_weather(fetcher, source, format=None, on_error="collect", max_errors=100,
+                 progress=None, progress_every=100_000):
+    """
+    Streams city weather rows from a CSV or JSONL source into a WeatherFetcher.
+    Rows go into fetcher.store when it has one, otherwise into its dicts.
+
+    source: a file path, or any iterable of text lines (e.g. a generator).
+    format: "csv" or "jsonl"; inferred from a path's extension when None.
+    on_error: "raise" stops at the first bad row, "skip" only counts bad rows,
+    "collect" also keeps the first max_errors of them in report.errors.
+    progress: optional callable receiving the LoadReport every progress_every rows.
+
+    Only one row is held in memory at a time.
+    """
+    if on_error not in ("raise", "skip", "collect"):
+        raise ValueError(f"Invalid on_error: {on_error}")
+    format = _resolve_format(source, format)
+    add = _make_sink(fetcher)
+    report = LoadReport()
+    start = time.perf_counter()
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf-8", newline="") as lines:
+            _load_rows(iter_weather_rows(lines, format), add, report, on_error, max_errors,
+                       progress, progress_every, start)
+    else:
+        _load_rows(iter_weather_rows(source, format), add, report, on_error, max_errors,
+                   progress, progress_every, start)
+
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def iter_weather_rows(lines, format):
+    """
+    Parses text lines lazily into (line number, row) pairs, where row is
+    (city, temperature, probabilities) or the ValueError/TypeError that line raised.
+    """
+    if format == "csv":
+        reader = csv.reader(lines)
+        header = next(reader, None)
+        if header is not None and [h.strip() for h in header] != CSV_HEADER:
+            raise ValueError(f"CSV header must be: {','.join(CSV_HEADER)}")
+        for fields in reader:
+            if not fields:
+                continue
+            yield reader.line_num, _parse(_parse_csv_fields, fields)
+    elif format == "jsonl":
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            yield line_number, _parse(_parse_json_line, line)
+    else:
+        raise ValueError(f"Unsupported format: {format}")
+
+
+def _load_rows(rows, add, report, on_error, max_errors, progress, progress_every, start):
+    for line_number, row in rows:
+        if not isinstance(row, Exception):
+            try:
+                add(*row)
+            except (ValueError, TypeError) as error:
+                row = error
+        if isinstance(row, Exception):
+            if on_error == "raise":
+                raise ValueError(f"Line {line_number}: {row}") from row
+            report.rows_rejected += 1
+            if on_error == "collect" and len(report.errors) < max_errors:
+                report.errors.append((line_number, str(row)))
+        else:
+            report.rows_loaded += 1
+
+        if progress is not None and (report.rows_loaded + report.rows_rejected) % progress_every == 0:
+            report.elapsed = time.perf_counter() - start
+            progress(report)
+
+
+def _parse(parser, raw):
+    try:
+        return parser(raw)
+    except (ValueError, TypeError) as error:
+        return error
+
+
+def _parse_csv_fields(fields):
+    if len(fields) != len(CSV_HEADER):
+        raise ValueError(f"Expected {len(CSV_HEADER)} fields, got {len(fields)}")
+    city, temperature, probabilities = fields[0], fields[1].strip(), fields[2:]
+    temperature = _parse_number(temperature, "Temperature") if temperature else None
+    if all(not p.strip() for p in probabilities):
+        probabilities = None
+    else:
+        probabilities = [_parse_number(p, "Probability", as_float=True) for p in probabilities]
+    return _check_row(city, temperature, probabilities)
+
+
+def _parse_json_line(line):
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as error:
+        raise ValueError(f"Invalid JSON: {error.msg}") from None
+    if not isinstance(record, dict):
+        raise TypeError("Each line must be a JSON object")
+    return _check_row(record.get("city"), record.get("temperature"), record.get("rain"))
+
+
+def _parse_number(text, name, as_float=False):
+    if not as_float:
+        try:
+            return int(text)
+        except ValueError:
+            pass
+    try:
+        return float(text)
+    except ValueError:
+        raise ValueError(f"{name} is not a number: {text!r}") from None
+
+
+def _check_row(city, temperature, probabilities):
+    """Applies the store's rules to one parsed row, which must also hold some data."""
+    validate_city_data(city, temperature, probabilities)
+    if temperature is None and probabilities is None:
+        raise ValueError("Row has no temperature or rain data")
+    return city, temperature, probabilities
+
+
+def _resolve_format(source, format):
+    if format is not None:
+        return format
+    if isinstance(source, (str, os.PathLike)):
+        extension = os.path.splitext(os.fspath(source))[1].lower()
+        if extension == ".csv":
+            return "csv"
+        if extension in (".jsonl", ".ndjson"):
+            return "jsonl"
+    raise ValueError("Cannot infer format; pass format='csv' or format='jsonl'")
+
+
+def _make_sink(fetcher):
+    store = getattr(fetcher, "store", None)
+    if store is not None:
+        return store.add
+
+    def add(city, temperature, probabilities):
+        key = normalize_city(city)
+        if temperature is not None:
+            fetcher.temperatures[key] = temperature
+        if probabilities is not None:
+            fetcher.rain_probabilities[key] = probabilities
+
+    return add
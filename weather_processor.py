@@ -1,5 +1,53 @@
+from time import perf_counter
+from typing import NamedTuple, Optional, Union
+
+from city_index import city_index_of
+from forecast_grid import ForecastGrid, np
+from forecast_rules import ForecastRules
+from instrumentation import NULL_TIMER, Metrics, StageTimer
+
+
+def validate_rain_probabilities(probabilities, slot_count):
+    """
+    Validates a list of rain probabilities, one per time slot.
+    Shared by WeatherProcessor and by the loaders that check data up front.
+    """
+    if probabilities is None:
+        raise ValueError("Rain probabilities not available")
+    if not isinstance(probabilities, list):
+        raise TypeError("Probabilities must be a list")
+    if len(probabilities) != slot_count:
+        raise ValueError(f"Probabilities length invalid, expected {slot_count}")
+    for i, p in enumerate(probabilities):
+        if not (isinstance(p, float) or isinstance(p, int)):
+            raise TypeError(f"Probability at index {i} is not a number")
+        if p < 0 or p > 1:
+            raise ValueError(f"Probability at index {i} out of bounds (must be between 0 and 1)")
+
+
+class ValidatedRainProbabilities(list):
+    """A probabilities list that already passed validate_rain_probabilities."""
+
+
+class RainForecast(NamedTuple):
+    """Structured rain forecast; WeatherProcessor.format_result builds its message."""
+    city: str
+    # Hour of the time slot the forecast was taken from; the requested hour when interpolating
+    slot_hour: int
+    probability: float
+    category: str
+
+
+class TemperatureInfo(NamedTuple):
+    """Structured temperature; temperature and band are None when the data is missing."""
+    city: str
+    temperature: Optional[Union[int, float]]
+    band: Optional[str]
+
+
 class WeatherProcessor:
-    # Constants for rain forecast probability thresholds
+    # Constants for rain forecast probability thresholds, used by the default rules.
+    # Override them on a subclass or instance before its first forecast, or pass rules=.
     HIGH_RAIN_PROBABILITY = 0.8
     MODERATE_RAIN_PROBABILITY = 0.5
     LOW_RAIN_PROBABILITY = 0.2
@@ -11,10 +59,52 @@ class WeatherProcessor:
         if not isinstance(temp, (int, float)):
             raise TypeError("Temperature must be a number")
 
-    def __init__(self, fetcher):
+    # Interpolation modes; None keeps the nearest time slot
+    INTERPOLATIONS = ("linear", "step")
+
+    def __init__(self, fetcher, rules=None, metrics=None, interpolation=None):
+        """
+        interpolation: "linear" or "step" to interpolate rain probabilities
+        between the time slots (see forecast_grid) instead of answering with
+        the nearest slot's. Forecasts then report the requested hour.
+        """
+        if interpolation is not None and interpolation not in self.INTERPOLATIONS:
+            raise ValueError(f"Interpolation must be one of {', '.join(self.INTERPOLATIONS)} or None")
         self.fetcher = fetcher
+        self.interpolation = interpolation
+        # Instrumentation is off while this is None; see enable_metrics()
+        self.metrics = metrics
         # Time slots: 0AM, 3AM, 6AM, 9AM, 12PM, 3PM, 6PM, 9PM
         self.time_slots = [0, 3, 6, 9, 12, 15, 18, 21]
+        # Compiled ForecastRules used by both single and bulk calls; None builds the defaults
+        self.rules = rules
+
+    @property
+    def rules(self):
+        rules = self._rules
+        if rules is None:
+            # Built on first use, so thresholds overridden on a subclass or instance apply
+            rules = self._rules = default_rules(
+                self.LOW_RAIN_PROBABILITY, self.MODERATE_RAIN_PROBABILITY, self.HIGH_RAIN_PROBABILITY)
+        return rules
+
+    @rules.setter
+    def rules(self, rules):
+        """Assigning None goes back to the default rules, rebuilt from the current thresholds."""
+        self._rules = rules
+
+    @property
+    def time_slots(self):
+        return self._time_slots
+
+    @time_slots.setter
+    def time_slots(self, slots):
+        """Reassigning the slots rebuilds the hour-to-slot lookup table and drops the grids."""
+        self._time_slots = slots
+        self._slot_table = [self._search_closest_time_slot(hour) for hour in range(24)] if slots else []
+        # (method, steps per hour) -> ForecastGrid
+        self._grids = {}
+        self._hourly_grid = self._grid(self.interpolation, 1) if self.interpolation and slots else None
 
     # ========== VALIDATION METHODS ==========
     # All validation is separated into dedicated methods for consistency and reusability
@@ -37,17 +127,10 @@ class WeatherProcessor:
 
     def _validate_rain_probabilities(self, probabilities):
         """Validates that probabilities list is valid."""
-        if probabilities is None:
-            raise ValueError("Rain probabilities not available")
-        if not isinstance(probabilities, list):
-            raise TypeError("Probabilities must be a list")
-        if len(probabilities) != len(self.time_slots):
-            raise ValueError(f"Probabilities length invalid, expected {len(self.time_slots)}")
-        for i, p in enumerate(probabilities):
-            if not (isinstance(p, float) or isinstance(p, int)):
-                raise TypeError(f"Probability at index {i} is not a number")
-            if p < 0 or p > 1:
-                raise ValueError(f"Probability at index {i} out of bounds (must be between 0 and 1)")
+        # Stores check their rows once at load time
+        if type(probabilities) is ValidatedRainProbabilities and len(probabilities) == len(self.time_slots):
+            return
+        validate_rain_probabilities(probabilities, len(self.time_slots))
 
     def _validate_temperature(self, temp):
         """Validates that temperature is a number (if not None)."""
@@ -58,71 +141,344 @@ class WeatherProcessor:
     # Business logic is cleanly separated from validation
     
     def _find_closest_time_slot(self, hour):
-        """Finds the closest time slot to the given hour."""
+        """Finds the closest time slot to the given hour using the precomputed table."""
+        if 0 <= hour < len(self._slot_table):
+            return self._slot_table[hour]
+        return self._search_closest_time_slot(hour)
+
+    def _search_closest_time_slot(self, hour):
+        """Scans all time slots for the closest one (first slot wins on ties)."""
         closest_index = min(
             range(len(self.time_slots)), 
             key=lambda i: abs(self.time_slots[i] - hour)
         )
         return closest_index, self.time_slots[closest_index]
 
+    def _grid(self, method, steps_per_hour):
+        """Returns the ForecastGrid for the current time slots, building it on first use."""
+        key = (method, steps_per_hour)
+        grid = self._grids.get(key)
+        if grid is None:
+            grid = self._grids[key] = ForecastGrid(self.time_slots, method, steps_per_hour)
+        return grid
+
+    def _rain_at(self, probabilities, hour):
+        """
+        Returns (slot hour, probability) for an hour from validated probabilities:
+        the nearest time slot's, or with interpolation the hour's own.
+        Every rain path, single, bulk, async and instrumented, resolves hours here.
+        """
+        if self._hourly_grid is not None:
+            return hour, float(self._hourly_grid.curve(probabilities)[hour])
+        closest_index, closest_time = self._find_closest_time_slot(hour)
+        return closest_time, probabilities[closest_index]
+
     def _categorize_rain_probability(self, probability):
         """Categorizes a probability value into a forecast level."""
-        if probability >= self.HIGH_RAIN_PROBABILITY:
-            return "high"
-        elif probability >= self.MODERATE_RAIN_PROBABILITY:
-            return "moderate"
-        elif probability >= self.LOW_RAIN_PROBABILITY:
-            return "low"
-        else:
-            return "very low"
-
-    def _format_temperature_message(self, city, temp):
-        """Formats temperature information into a message."""
-        if temp < 0:
-            return f"It's freezing in {city}: {temp}°C"
-        elif temp > 30:
-            return f"It's hot in {city}: {temp}°C"
-        else:
-            return f"The temperature in {city} is {temp}°C"
+        return self.rules.rain_level(probability)
 
-    # ========== PUBLIC API METHODS ==========
-    # Public methods validate inputs first, then delegate to business logic
-    
-    def get_rain_forecast(self, city, hour):
+    def _group_queries(self, queries, results):
         """
-        Gets rain forecast for a city at a specific hour.
-        Finds the closest time slot and returns a forecast based on the probability.
-        Raises Exception on invalid input as per test_weather_processor.py.
+        Validates (city, hour) queries and groups their indexes by city.
+        Invalid queries get their exception stored in results and are left out.
+        """
+        index = city_index_of(self.fetcher)
+        groups = {}
+        for i, query in enumerate(queries):
+            try:
+                # A malformed item fails on its own, like any other invalid query
+                city, hour = query
+                self._validate_city(city)
+                self._validate_hour(hour)
+            except Exception as error:
+                results[i] = error
+                continue
+            # The fetcher's key, so "London" and "LONDON" share one fetch
+            key = index.key(city)
+            if key not in groups:
+                groups[key] = (city, [])
+            groups[key][1].append(i)
+        return groups
+
+    def _resolve_queries(self, queries, indexes, probabilities, results, text=True):
         """
+        Validates one city's fetched probabilities and resolves every query for it,
+        into messages or, with text=False, RainForecast results.
+        If the probabilities are invalid, each of the city's queries gets the error.
+        """
+        try:
+            self._validate_rain_probabilities(probabilities)
+        except Exception as error:
+            for i in indexes:
+                results[i] = error
+            return
+        rain_level = self.rules.rain_level
+        format_result = self.format_result
+        # (city, hour) -> result, so repeated queries share one
+        resolved = {}
+        for i in indexes:
+            city, hour = queries[i]
+            # A tuple even when the query came in as a list
+            query = (city, hour)
+            result = resolved.get(query)
+            if result is None:
+                slot_hour, probability = self._rain_at(probabilities, hour)
+                result = RainForecast(city, slot_hour, probability, rain_level(probability))
+                if text:
+                    result = format_result(result)
+                resolved[query] = result
+            results[i] = result
+
+    def _rain_result(self, city, hour, timer=NULL_TIMER):
+        """The single-call rain pipeline, lapping each stage on the timer."""
         # Validate all inputs upfront (fail fast)
         self._validate_city(city)
+        timer.lap("validate_city")
         self._validate_hour(hour)
-        
+        timer.lap("validate_hour")
+
         # Fetch data
         probabilities = self.fetcher.get_chance_of_rain(city)
+        timer.lap("fetch")
+        return self._build_rain_result(city, hour, probabilities, timer)
+
+    def _build_rain_result(self, city, hour, probabilities, timer=NULL_TIMER):
+        """Validates fetched probabilities and turns the one for the hour into a RainForecast."""
         self._validate_rain_probabilities(probabilities)
+        timer.lap("validate_probabilities")
 
         # Business logic (validation complete)
-        closest_index, closest_time = self._find_closest_time_slot(hour)
-        probability = probabilities[closest_index]
-        forecast = self._categorize_rain_probability(probability)
+        slot_hour, probability = self._rain_at(probabilities, hour)
+        timer.lap("slot_lookup")
+        result = RainForecast(city, slot_hour, probability, self.rules.rain_level(probability))
+        timer.lap("categorize")
+        return result
 
-        return f"There's a {forecast} chance of rain in {city} around {closest_time}:00 ({probability*100:.0f}% probability)."
-    
-    def get_city_temperature_info(self, city):
-        """
-        Gets temperature information for a city.
-        Returns a formatted message describing the temperature.
-        """
+    def _temperature_result(self, city, timer=NULL_TIMER):
+        """The single-call temperature pipeline, lapping each stage on the timer."""
         # Validate input upfront
         self._validate_city(city)
-        
+        timer.lap("validate_city")
+
         # Fetch data
         temp = self.fetcher.get_current_temperature(city)
+        timer.lap("fetch")
+        return self._build_temperature_result(city, temp, timer)
+
+    def _build_temperature_result(self, city, temp, timer=NULL_TIMER):
+        """Validates a fetched temperature and turns it into a TemperatureInfo."""
         self._validate_temperature(temp)
-        
-        # Business logic (validation complete)
-        if temp is None:
-            return f"Temperature data for {city} not available."
-        
-        return self._format_temperature_message(city, temp)
\ No newline at end of file
+        timer.lap("validate_temperature")
+
+        # Business logic (validation complete); a missing temperature has no band
+        band = self.rules.temperature_band(temp) if temp is not None else None
+        result = TemperatureInfo(city, temp, band)
+        timer.lap("categorize")
+        return result
+
+    def _rain_batch(self, queries, text):
+        """Shared body of get_rain_forecasts and get_rain_results."""
+        metrics = self.metrics
+        if metrics is not None:
+            start = perf_counter()
+        queries = list(queries)
+        results = [None] * len(queries)
+        groups = self._group_queries(queries, results)
+
+        # Fetchers with copy-on-write snapshots answer the whole batch from one view
+        fetcher = self.fetcher
+        if hasattr(type(fetcher), "snapshot"):
+            fetcher = fetcher.snapshot()
+
+        for city, indexes in groups.values():
+            try:
+                probabilities = fetcher.get_chance_of_rain(city)
+            except Exception as error:
+                for i in indexes:
+                    results[i] = error
+                continue
+            self._resolve_queries(queries, indexes, probabilities, results, text)
+
+        if metrics is not None:
+            errors = [result for result in results if isinstance(result, Exception)]
+            method = "get_rain_forecasts" if text else "get_rain_results"
+            metrics.record(method, [], perf_counter() - start, errors)
+        return results
+
+    # ========== PUBLIC API METHODS ==========
+    # Public methods validate inputs first, then delegate to business logic.
+    # The get_*_result methods return structured results, and the message-returning
+    # methods are format_result() of them.
+
+    def get_rain_result(self, city, hour):
+        """
+        Gets the rain forecast for a city at a specific hour as a RainForecast,
+        without building the message. Raises like get_rain_forecast.
+        """
+        if self.metrics is not None:
+            return self._measure("get_rain_result", self._rain_result, (city, hour))
+        return self._rain_result(city, hour)
+
+    def get_rain_forecast(self, city, hour):
+        """
+        Gets rain forecast for a city at a specific hour.
+        Finds the closest time slot and returns a forecast based on the probability.
+        Raises Exception on invalid input as per test_weather_processor.py.
+        """
+        if self.metrics is not None:
+            return self._measure("get_rain_forecast", self._rain_result, (city, hour), text=True)
+        return self.format_result(self.get_rain_result(city, hour))
+
+    def get_rain_results(self, queries):
+        """
+        Like get_rain_forecasts, but each successful query yields a RainForecast,
+        ready for JSON or array serialization without building any message.
+        """
+        return self._rain_batch(queries, text=False)
+
+    def get_rain_forecasts(self, queries):
+        """
+        Gets rain forecasts for many (city, hour) queries in one call.
+        Queries are grouped by city so each city is fetched and validated once.
+        Returns a list in input order holding, for each query, either the
+        forecast message or the exception that query raised.
+        """
+        return self._rain_batch(queries, text=True)
+
+    def get_rain_curves(self, cities, steps_per_hour=1):
+        """
+        Gets each city's rain probability over the whole day, steps_per_hour
+        points per hour from 0:00, as a len(cities) x (24 * steps_per_hour)
+        array (a list of lists without numpy). Uses this processor's
+        interpolation, or the nearest time slot when it has none.
+        Raises the first error any city raises.
+        """
+        rows, row_of = self._fetch_rain_rows(cities)
+        curves = self._grid(self.interpolation or "nearest", steps_per_hour).curves(rows)
+        if np is None:
+            return [curves[row] for row in row_of]
+        return curves[row_of]
+
+    def get_rain_probabilities(self, cities, hours, steps_per_hour=60):
+        """
+        Gets the rain probability for many (city, time) points in one call:
+        cities[i] at hours[i], where hours are fractional hours in [0, 24)
+        rounded to 1/steps_per_hour. Returns a float array (a list without
+        numpy). Each point is interpolated on its own from its city's slots,
+        so no whole-day curves are built however many cities there are.
+        Raises the first error any city or hour raises.
+        """
+        cities = list(cities)
+        if len(cities) != len(hours):
+            raise ValueError("cities and hours must have the same length")
+        rows, row_of = self._fetch_rain_rows(cities)
+        return self._grid(self.interpolation or "nearest", steps_per_hour).values(rows, row_of, hours)
+
+    def _fetch_rain_rows(self, cities):
+        """
+        Fetches and validates the probabilities of each distinct city once.
+        Returns (rows, row_of): the probabilities per distinct city and, for
+        each city given, the index of its row.
+        """
+        fetcher = self.fetcher
+        index = city_index_of(fetcher)
+        if hasattr(type(fetcher), "snapshot"):
+            fetcher = fetcher.snapshot()
+        rows, row_of, seen = [], [], {}
+        for city in cities:
+            self._validate_city(city)
+            key = index.key(city)
+            row = seen.get(key)
+            if row is None:
+                probabilities = fetcher.get_chance_of_rain(city)
+                self._validate_rain_probabilities(probabilities)
+                row = seen[key] = len(rows)
+                rows.append(probabilities)
+            row_of.append(row)
+        return rows, row_of
+
+    def get_temperature_result(self, city):
+        """
+        Gets the temperature for a city as a TemperatureInfo, without building the message.
+        Raises like get_city_temperature_info.
+        """
+        if self.metrics is not None:
+            return self._measure("get_temperature_result", self._temperature_result, (city,))
+        return self._temperature_result(city)
+
+    def get_city_temperature_info(self, city):
+        """
+        Gets temperature information for a city.
+        Returns a formatted message describing the temperature.
+        """
+        if self.metrics is not None:
+            return self._measure("get_city_temperature_info", self._temperature_result, (city,), text=True)
+        return self.format_result(self.get_temperature_result(city))
+
+    def format_result(self, result):
+        """Formats a RainForecast or TemperatureInfo into its message with this processor's rules."""
+        if isinstance(result, RainForecast):
+            return self.rules.format_rain(result.city, result.slot_hour, result.probability)
+        if isinstance(result, TemperatureInfo):
+            return self.rules.format_temperature(result.city, result.temperature)
+        raise TypeError("Result must be a RainForecast or TemperatureInfo")
+
+    # ========== INSTRUMENTATION ==========
+    # Instrumented calls run the same pipelines as uninstrumented ones, with a real timer
+
+    def enable_metrics(self, metrics=None):
+        """Turns instrumentation on (with a new Metrics unless one is given) and returns the Metrics."""
+        self.metrics = metrics if metrics is not None else Metrics()
+        return self.metrics
+
+    def disable_metrics(self):
+        """Turns instrumentation off; the public methods go back to their uninstrumented path."""
+        self.metrics = None
+
+    def _measure(self, method, pipeline, args, text=False):
+        """Runs a single-call pipeline with a StageTimer and records it as method."""
+        metrics = self.metrics
+        timer = StageTimer()
+        try:
+            result = pipeline(*args, timer)
+            if text:
+                result = self.format_result(result)
+                timer.lap("format")
+        except Exception as error:
+            metrics.record(method, timer.stages, timer.total(), (error,))
+            raise
+        metrics.record(method, timer.stages, timer.total())
+        return result
+
+# (low, moderate, high) rain thresholds -> compiled default rules, shared by processors
+_DEFAULT_RULES = {}
+
+
+def default_rules(low, moderate, high):
+    """
+    Returns the behaviour WeatherProcessor has always had, with the given rain
+    thresholds: freezing below 0°C, hot above 30°C. Compiled once per thresholds.
+    """
+    key = (low, moderate, high)
+    rules = _DEFAULT_RULES.get(key)
+    if rules is None:
+        rules = _DEFAULT_RULES[key] = ForecastRules(
+            rain_levels=[
+                (None, None, "very low"),
+                (">=", low, "low"),
+                (">=", moderate, "moderate"),
+                (">=", high, "high"),
+            ],
+            temperature_levels=[
+                (None, None, "It's freezing in {city}: {temp}°C"),
+                (">=", 0, "The temperature in {city} is {temp}°C"),
+                (">", 30, "It's hot in {city}: {temp}°C"),
+            ],
+            temperature_bands=("freezing", "normal", "hot"),
+        )
+    return rules
+
+
+DEFAULT_RULES = default_rules(
+    WeatherProcessor.LOW_RAIN_PROBABILITY, WeatherProcessor.MODERATE_RAIN_PROBABILITY,
+    WeatherProcessor.HIGH_RAIN_PROBABILITY)
@@ -0,0 +1,179 @@
+import mmap
+import os
+import struct
+
+from city_index import normalize_city
+from weather_processor import ValidatedRainProbabilities, validate_rain_probabilities
+from weather_store import _HAS_RAIN, _HAS_TEMPERATURE, _INTEGER_TEMPERATURE, SLOTS
+
+# File layout (little-endian):
+#   header   magic, version, slots, count, index offset, names offset, records offset
+#   index    count + 1 uint32 offsets into the names blob, in sorted name order
+#   names    UTF-8 city keys, concatenated in byte order
+#   records  count fixed-width records: flags, temperature, SLOTS rain probabilities
+MAGIC = b"WXSNAP\0\0"
+VERSION = 2
+
+_HEADER = struct.Struct("<8sHHIQQQ")
+_OFFSET = struct.Struct("<I")
+# Temperatures are float64 so they read back exactly; probabilities are float32
+_RECORD = struct.Struct(f"<B7xd{SLOTS}f")
+
+
+def save_snapshot(source, path):
+    """
+    Writes a snapshot of a WeatherFetcher (its dicts and store) or of a store.
+    The file is written next to path and moved into place atomically.
+    Returns the number of cities written.
+    """
+    rows = _collect_rows(source)
+    keys = sorted(rows, key=lambda k: k.encode("utf-8"))
+
+    names = bytearray()
+    index = bytearray()
+    records = bytearray()
+    for key in keys:
+        index += _OFFSET.pack(len(names))
+        names += key.encode("utf-8")
+        temperature, probabilities = rows[key]
+        flags = 0
+        if temperature is not None:
+            flags |= _HAS_TEMPERATURE
+            if isinstance(temperature, int):
+                flags |= _INTEGER_TEMPERATURE
+        if probabilities is not None:
+            flags |= _HAS_RAIN
+        records += _RECORD.pack(flags, temperature or 0.0, *(probabilities or [0.0] * SLOTS))
+    index += _OFFSET.pack(len(names))
+
+    index_offset = _HEADER.size
+    names_offset = index_offset + len(index)
+    # Keep the records 8-byte aligned
+    records_offset = (names_offset + len(names) + 7) & ~7
+    header = _HEADER.pack(MAGIC, VERSION, SLOTS, len(keys), index_offset, names_offset, records_offset)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(index)
+        f.write(names)
+        f.write(bytes(records_offset - names_offset - len(names)))
+        f.write(records)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return len(keys)
+
+
+def open_snapshot(path):
+    """Maps a snapshot file into memory and returns a SnapshotStore for WeatherFetcher(store=...)."""
+    return SnapshotStore(path)
+
+
+class SnapshotStore:
+    """
+    Read-only store backed by a memory-mapped snapshot.
+    Opening only checks the header; lookups binary-search the name index
+    and unpack one record straight from the mapping.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError("Not a weather snapshot")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, slots, count, index_offset, names_offset, records_offset = _HEADER.unpack_from(self._mm)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError("Not a weather snapshot")
+        if version != VERSION or slots != SLOTS:
+            self._mm.close()
+            raise ValueError(f"Unsupported snapshot version {version}")
+        if records_offset + count * _RECORD.size != size:
+            self._mm.close()
+            raise ValueError("Truncated weather snapshot")
+        self._count = count
+        self._index_offset = index_offset
+        self._names_offset = names_offset
+        self._records_offset = records_offset
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, city):
+        key = normalize_city(city)
+        return key is not None and self._find(key) >= 0
+
+    def cities(self):
+        """Returns the city keys in index order."""
+        return [self._name(i).decode("utf-8") for i in range(self._count)]
+
+    def get_rain(self, key):
+        """Returns the probabilities for a normalize_city() key, or None."""
+        row = self._find(key)
+        if row < 0:
+            return None
+        record = _RECORD.unpack_from(self._mm, self._records_offset + row * _RECORD.size)
+        if not record[0] & _HAS_RAIN:
+            return None
+        return ValidatedRainProbabilities(record[2:])
+
+    def get_temperature(self, key):
+        """Returns the temperature for a normalize_city() key, or None."""
+        row = self._find(key)
+        if row < 0:
+            return None
+        flags, temperature = _RECORD.unpack_from(self._mm, self._records_offset + row * _RECORD.size)[:2]
+        if not flags & _HAS_TEMPERATURE:
+            return None
+        return int(temperature) if flags & _INTEGER_TEMPERATURE else temperature
+
+    def _name(self, i):
+        start, end = struct.unpack_from("<II", self._mm, self._index_offset + i * _OFFSET.size)
+        return self._mm[self._names_offset + start:self._names_offset + end]
+
+    def _find(self, key):
+        """Binary search over the sorted names; returns the row or -1."""
+        target = key.encode("utf-8")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            name = self._name(mid)
+            if name == target:
+                return mid
+            if name < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return -1
+
+
+def _collect_rows(source):
+    """Gathers {key: (temperature, probabilities)} from a fetcher or a store."""
+    rows = {}
+    store = getattr(source, "store", source)
+    if store is not None and hasattr(store, "cities"):
+        for key in store.cities():
+            rows[key] = (store.get_temperature(key), store.get_rain(key))
+    for key, temperature in getattr(source, "temperatures", {}).items():
+        if temperature is not None and not isinstance(temperature, (int, float)):
+            raise TypeError(f"Temperature for {key} must be a number")
+        key = normalize_city(key)
+        rows[key] = (temperature, rows.get(key, (None, None))[1])
+    for key, probabilities in getattr(source, "rain_probabilities", {}).items():
+        validate_rain_probabilities(probabilities, SLOTS)
+        key = normalize_city(key)
+        rows[key] = (rows.get(key, (None, None))[0], probabilities)
+    return rows
@@ -0,0 +1,176 @@
+import math
+from array import array
+
+from city_index import normalize_city
+
+from weather_processor import ValidatedRainProbabilities, validate_rain_probabilities
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; bulk accessors fall back to lists
+    np = None
+
+# One rain probability per time slot: 0AM, 3AM, ..., 9PM
+SLOTS = 8
+
+# Row flags
+_HAS_TEMPERATURE = 1
+_HAS_RAIN = 2
+_INTEGER_TEMPERATURE = 4
+
+
+def validate_city_data(city, temperature, probabilities):
+    """
+    Checks one city's data before it is stored, with the WeatherProcessor
+    rules plus what stored data must also be: finite numbers, no bools.
+    Either value may be None when missing. Shared by every ingest path
+    (ColumnarWeatherStore.add and weather_loader).
+    """
+    if normalize_city(city) is None:
+        raise ValueError("Invalid city")
+    if temperature is not None:
+        if isinstance(temperature, bool) or not isinstance(temperature, (int, float)):
+            raise TypeError("Temperature must be a number")
+        if not math.isfinite(temperature):
+            raise ValueError("Temperature must be finite")
+    if probabilities is not None:
+        validate_rain_probabilities(probabilities, SLOTS)
+        for i, p in enumerate(probabilities):
+            if isinstance(p, bool):
+                raise TypeError(f"Probability at index {i} is not a number")
+            if not math.isfinite(p):
+                raise ValueError("Probabilities must be finite")
+
+
+class ColumnarWeatherStore:
+    """
+    Column-oriented city weather data for large catalogs.
+    Rain probabilities live in one contiguous float32 matrix (cities x SLOTS)
+    and temperatures in a float64 vector, both addressed through a city -> row index.
+    Rows are validated once when added, so reads skip validation.
+    Probabilities come back at float32 precision; temperatures come back exactly
+    as given, since they are printed in messages.
+    """
+
+    def __init__(self):
+        self._rows = {}
+        self._cities = []
+        self._rain = array("f")
+        self._temperatures = array("d")
+        self._flags = bytearray()
+
+    @classmethod
+    def from_dicts(cls, temperatures, rain_probabilities):
+        """Builds a store from the dicts WeatherFetcher keeps."""
+        store = cls()
+        for city in temperatures.keys() | rain_probabilities.keys():
+            store.add(city, temperatures.get(city), rain_probabilities.get(city))
+        return store
+
+    def __len__(self):
+        return len(self._cities)
+
+    def __contains__(self, city):
+        return normalize_city(city) in self._rows
+
+    def cities(self):
+        """Returns the city keys in row order."""
+        return list(self._cities)
+
+    def add(self, city, temperature=None, probabilities=None):
+        """
+        Adds or replaces a city's data. Either value may be None when missing.
+        Both are checked here with validate_city_data(), like loaded rows.
+        """
+        validate_city_data(city, temperature, probabilities)
+
+        flags = 0
+        if temperature is not None:
+            flags |= _HAS_TEMPERATURE
+            if isinstance(temperature, int):
+                flags |= _INTEGER_TEMPERATURE
+        if probabilities is not None:
+            flags |= _HAS_RAIN
+
+        key = normalize_city(city)
+        row = self._rows.get(key)
+        if row is None:
+            row = self._rows[key] = len(self._cities)
+            self._cities.append(key)
+            self._temperatures.append(0.0)
+            self._rain.extend([0.0] * SLOTS)
+            self._flags.append(0)
+        self._temperatures[row] = temperature if temperature is not None else 0.0
+        if probabilities is not None:
+            self._rain[row * SLOTS:(row + 1) * SLOTS] = array("f", probabilities)
+        self._flags[row] = flags
+
+    # ========== SINGLE LOOKUPS (keys already normalized) ==========
+
+    def get_rain(self, key):
+        """Returns the probabilities for a normalize_city() key, or None."""
+        row = self._rows.get(key)
+        if row is None or not self._flags[row] & _HAS_RAIN:
+            return None
+        start = row * SLOTS
+        return ValidatedRainProbabilities(self._rain[start:start + SLOTS])
+
+    def get_temperature(self, key):
+        """Returns the temperature for a normalize_city() key, or None."""
+        row = self._rows.get(key)
+        if row is None or not self._flags[row] & _HAS_TEMPERATURE:
+            return None
+        temperature = self._temperatures[row]
+        return int(temperature) if self._flags[row] & _INTEGER_TEMPERATURE else temperature
+
+    # ========== BULK ACCESSORS ==========
+
+    def rain_matrix(self):
+        """
+        Returns the whole cities x SLOTS float32 matrix without copying
+        (a numpy view, or a memoryview without numpy).
+        Release it before adding cities: the buffer cannot grow while viewed.
+        """
+        if np is not None:
+            return np.frombuffer(self._rain, dtype=np.float32).reshape(-1, SLOTS)
+        return memoryview(self._rain).cast("B").cast("f", (len(self._cities), SLOTS))
+
+    def get_chances_of_rain(self, cities):
+        """
+        Returns the probabilities of many cities as a len(cities) x SLOTS array
+        (a list of lists without numpy). Rows of cities without rain data are NaN.
+        Raises KeyError for unknown cities.
+        """
+        rows = self._row_indexes(cities)
+        if np is not None:
+            matrix = np.frombuffer(self._rain, dtype=np.float32).reshape(-1, SLOTS)
+            flags = np.frombuffer(self._flags, dtype=np.uint8)
+            out = matrix[rows]
+            out[(flags[rows] & _HAS_RAIN) == 0] = np.nan
+            return out
+        nan = float("nan")
+        return [
+            list(self._rain[row * SLOTS:(row + 1) * SLOTS]) if self._flags[row] & _HAS_RAIN else [nan] * SLOTS
+            for row in rows
+        ]
+
+    def get_temperatures(self, cities):
+        """
+        Returns the temperatures of many cities as a float64 array (a list without numpy).
+        Cities without a temperature are NaN. Raises KeyError for unknown cities.
+        """
+        rows = self._row_indexes(cities)
+        if np is not None:
+            temperatures = np.frombuffer(self._temperatures, dtype=np.float64)
+            flags = np.frombuffer(self._flags, dtype=np.uint8)
+            out = temperatures[rows]
+            out[(flags[rows] & _HAS_TEMPERATURE) == 0] = np.nan
+            return out
+        return [self._temperatures[row] if self._flags[row] & _HAS_TEMPERATURE else float("nan") for row in rows]
+
+    def _row_indexes(self, cities):
+        rows = self._rows
+        try:
+            return [rows[normalize_city(city)] for city in cities]
+        except KeyError as error:
+            raise KeyError(f"Unknown city: {error.args[0]}") from None